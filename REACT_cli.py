@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+REACT without the GUI: reads Gaussian output files (in parallel) and prints or exports the energies of every state
+relative to the first one, computed as in the Analyse window (see mods/EnergyAnalysis.py). Qt is never imported, so
+this runs on machines without a display.
+
+Every output file is one state, in the order given (output files in a directory are sorted by name):
+
+    python REACT_cli.py reactant.out ts.out product.out --unit kcal
+    python REACT_cli.py path/to/outputs --unit kj --absolute --csv energies.csv
+
+Frequencies and solvation are taken from the same output file when it has them, as when the Analyse window is
+opened. Other files can be given per state with --freq, --solvent and --big (one file per state, in the same order).
+"""
+import argparse
+import contextlib
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from mods.EnergyAnalysis import (
+    UNITS, included_files, state_energies, relative_energies, absolute_energy_lines, relative_energy_lines
+)
+from mods.GaussianFile import OutputFile
+from mods.ParseCache import ParseCache
+from mods.State import State, FILE_TYPES
+
+# Extensions of output files, see State.FILE_TYPES:
+OUTPUT_EXTENSIONS = [extension for extension, file_type in FILE_TYPES.items() if file_type is OutputFile]
+
+# Columns of csv export: name, (term, subterm) of state_energies or name in relative_energies
+ABSOLUTE_COLUMNS = [
+    ("E(elec)", (0, None)),
+    ("corr(G)", (1, "dG")),
+    ("corr(H)", (1, "dH")),
+    ("corr(E)", (1, "dE")),
+    ("E(solv)", (2, None)),
+    ("E(big)", (3, None)),
+]
+RELATIVE_COLUMNS = ["main", "ddG", "ddH", "ddE", "dG", "dH", "dE", "ddSolv", "dSolv", "big"]
+
+
+def output_filepaths(paths):
+    """
+    :param paths: output files and directories
+    :return: list of output filepaths, directories replaced by their output files sorted by name
+    """
+    filepaths = list()
+    for path in paths:
+        if os.path.isdir(path):
+            filepaths.extend(
+                os.path.join(path, filename)
+                for filename in sorted(os.listdir(path))
+                if filename.split(".")[-1] in OUTPUT_EXTENSIONS
+            )
+        else:
+            filepaths.append(path)
+    return filepaths
+
+
+def read_files(filepaths, workers=None, cache_dir=None):
+    """
+    Read output files, in parallel with more than one worker
+    :param workers: number of processes reading files (None: number of CPUs)
+    :param cache_dir: directory of ParseCache, None to read all files
+    :return: State with all files that could be read
+    """
+    parse_cache = ParseCache(cache_dir) if cache_dir else None
+    state = State(SimpleNamespace(parse_cache=parse_cache))
+
+    filepaths = list(dict.fromkeys(filepaths))
+    errors = list()
+    if workers == 1 or len(filepaths) < 2:
+        for _ in state.add_files(filepaths, errors=errors):
+            pass
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for _ in state.add_files(filepaths, executor, errors=errors):
+                pass
+
+    for filepath, error in errors:
+        print(f"Could not read {filepath}: {error}")
+
+    if parse_cache:
+        parse_cache.flush()
+        for error in parse_cache.errors:
+            print(error)
+    return state
+
+
+def state_files(filepaths, state, freq=None, solvent=None, big=None):
+    """
+    :param filepaths: main output file of every state
+    :param state: State with all files
+    :param freq: frequency file of every state, None to use the main file when it has frequencies
+    :param solvent: solvation file of every state, None to use the main file when it has solvent
+    :param big: big basis file of every state, or None
+    :return: dict {state: {term: filepath}} (see EnergyAnalysis.included_files), states from 1
+    """
+    files = dict()
+    for i, filepath in enumerate(filepaths):
+        files[i + 1] = included_files(filepath, state.get_molecule_object(filepath))
+        for term, term_files in [(1, freq), (2, solvent), (3, big)]:
+            if term_files:
+                files[i + 1][term] = term_files[i]
+    return files
+
+
+def write_csv(csv_path, files, energies, rel_ene, unit=1.0):
+    """
+    One row per state with file, energy terms and relative energies (see ABSOLUTE_COLUMNS and RELATIVE_COLUMNS)
+    """
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["state", "file"] + [name for name, _ in ABSOLUTE_COLUMNS] + RELATIVE_COLUMNS)
+
+        for state in sorted(energies.keys()):
+            row = [state, files[state][0]]
+            for name, (term, subterm) in ABSOLUTE_COLUMNS:
+                value = energies[state][term]
+                if value and subterm:
+                    value = value[subterm]
+                row.append("%.8f" % (value * unit) if value else "")
+            for name in RELATIVE_COLUMNS:
+                value = rel_ene[state].get(name)
+                row.append("%.8f" % (value * unit) if value is not None else "")
+            writer.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Energies of Gaussian output files relative to the first, as in the REACT Analyse window."
+    )
+    parser.add_argument("paths", nargs="+", help="output files (one state each) or directories of output files")
+    parser.add_argument(
+        "--unit", choices=sorted(UNITS.keys()), default="hartree", help="energy unit (default: hartree)"
+    )
+    parser.add_argument("--freq", nargs="+", metavar="FILE", help="frequency output file of every state")
+    parser.add_argument("--solvent", nargs="+", metavar="FILE", help="solvation output file of every state")
+    parser.add_argument("--big", nargs="+", metavar="FILE", help="big basis output file of every state")
+    parser.add_argument("--absolute", action="store_true", help="also print energy terms of every state")
+    parser.add_argument("--csv", metavar="FILE", help="export energies of all states to csv file")
+    parser.add_argument("--workers", type=int, help="processes reading files (default: number of CPUs)")
+    parser.add_argument("--cache", metavar="DIR", help="parse cache directory (fex. workdir/.react_cache)")
+    args = parser.parse_args(argv)
+
+    filepaths = output_filepaths(args.paths)
+    if not filepaths:
+        parser.error("no output files found")
+    for option in ["freq", "solvent", "big"]:
+        if getattr(args, option) and len(getattr(args, option)) != len(filepaths):
+            parser.error(f"--{option} needs one file per state ({len(filepaths)})")
+
+    extra_files = (args.freq or []) + (args.solvent or []) + (args.big or [])
+    # Messages from reading files are kept out of the tables:
+    with contextlib.redirect_stdout(sys.stderr):
+        state = read_files(filepaths + extra_files, args.workers, args.cache)
+
+    not_read = [filepath for filepath in filepaths + extra_files if filepath not in state.files]
+    if not_read:
+        print(f"No energies without all files, not read: {', '.join(not_read)}", file=sys.stderr)
+        return 1
+
+    files = state_files(filepaths, state, args.freq, args.solvent, args.big)
+    energies = {n: state_energies(files[n], state.get_molecule_object) for n in files}
+    if not energies[1][0]:
+        print(f"No energy found in {filepaths[0]} (state 1)", file=sys.stderr)
+        return 1
+
+    rel_ene = relative_energies(energies)
+    unit = UNITS[args.unit]
+
+    print("State  File")
+    for n in sorted(files.keys()):
+        print("%5d  %s" % (n, files[n][0]))
+    print()
+    print("\n".join(relative_energy_lines(rel_ene, unit)))
+
+    if args.absolute:
+        for n in sorted(energies.keys()):
+            print(f"\nState {n}")
+            print("\n".join(absolute_energy_lines(energies[n], unit)))
+
+    if args.csv:
+        write_csv(args.csv, files, energies, rel_ene, unit)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
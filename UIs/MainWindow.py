@@ -635,10 +635,13 @@ class Ui_MainWindow(object):
         self.progressBar.setTextVisible(False)
         self.progressBar.setObjectName("progressBar")
         self.gridLayout_4.addWidget(self.progressBar, 0, 1, 1, 1)
+        self.button_cancel_load = QtWidgets.QPushButton(self.frame_3)
+        self.button_cancel_load.setObjectName("button_cancel_load")
+        self.gridLayout_4.addWidget(self.button_cancel_load, 0, 2, 1, 1)
         spacerItem1 = QtWidgets.QSpacerItem(
             40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum
         )
-        self.gridLayout_4.addItem(spacerItem1, 0, 2, 1, 1)
+        self.gridLayout_4.addItem(spacerItem1, 0, 3, 1, 1)
         self.button_power_off = QtWidgets.QPushButton(self.frame_3)
         self.button_power_off.setMinimumSize(QtCore.QSize(24, 24))
         self.button_power_off.setMaximumSize(QtCore.QSize(24, 24))
@@ -653,7 +656,7 @@ class Ui_MainWindow(object):
         self.button_power_off.setIconSize(QtCore.QSize(24, 24))
         self.button_power_off.setFlat(True)
         self.button_power_off.setObjectName("button_power_off")
-        self.gridLayout_4.addWidget(self.button_power_off, 0, 3, 1, 1)
+        self.gridLayout_4.addWidget(self.button_power_off, 0, 4, 1, 1)
         self.verticalLayout_4.addLayout(self.gridLayout_4)
         self.gridLayout.addWidget(self.frame_3, 2, 0, 1, 3)
         self.frame_2 = QtWidgets.QFrame(self.centralwidget)
@@ -975,6 +978,7 @@ class Ui_MainWindow(object):
             _translate("MainWindow", "Analyse calculation")
         )
         self.button_plotter.setText(_translate("MainWindow", "Plotter"))
+        self.button_cancel_load.setText(_translate("MainWindow", "Cancel"))
         self.label_2.setText(_translate("MainWindow", "Project:"))
         self.label_projectname.setText(_translate("MainWindow", "new_project"))
         self.label_3.setText(_translate("MainWindow", "States"))
@@ -107,4 +107,4 @@ class Ui_SplashScreen(object):
         self.label_description.setText(_translate("SplashScreen", "<html><head/><body><p>Relative Energies Automated Calculation inTerface</p></body></html>"))
         self.label_loading.setText(_translate("SplashScreen", "loading..."))
         self.label_credits.setText(_translate("SplashScreen", "<html><head/><body><p><span style=\" font-weight:600;\">Created by</span> Barge &amp; Isaksen</p></body></html>"))
-import UIs.icons_rc
+# import UIs.icons_rc  (registered by mods.IconResources.register_icons)
@@ -3,6 +3,7 @@ from PyQt5.QtCore import Qt
 from UIs.AnalyseWindow import Ui_AnalyseWindow
 import mods.common_functions as cf
 from mods.ReactPlot import SpectrumIR, PlotEnergyDiagram
+from mods.EnergyAnalysis import state_energies, relative_energies, absolute_energy_lines, relative_energy_lines
 
 
 class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
@@ -84,8 +85,8 @@ class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
 
     def animate_frequency(self):
         """
-        Takes current output file, creates temporary xyz files - loads it to pymol and creates movie for
-        selected frequency. Temporary xyz files, can be stored if selected by user under settings.
+        Takes current output file, loads all frames of the selected frequency to pymol (from memory) and creates movie.
+        All frames are written to one xyz file in workdir if selected by user.
         :return:
         """
         view_pymol = False
@@ -121,26 +122,24 @@ class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
         # Get vibration scaling:
         scale = self.ui.lcdNumber_scale.value() / 100.
 
-        # Get list with Molecule objects for vibrational displacement:
+        # Get Geometries with all frames of vibrational displacement:
         mol_vibs = mol_obj.displacement_animation(freq=frq, steps=10, scale=scale)
+        if not mol_vibs and not mol_obj.output_available:
+            self.react.append_text(f"Normal modes not available: {g_file} not found")
+            return
+        if not mol_vibs:
+            self.react.append_text("No molecule found...")
+            return
 
-        # Load files to pymol, and/or write xyz files.
-        i = 0
-        base_name = "%s/%s" % ( self.react.settings.workdir, g_file.split("/")[-1].split(".")[0])
-        for mol in mol_vibs:
-            xyz_path = "%s_tmp%03d.xyz" % (base_name, i)
-            cf.write_file(mol.formatted_xyz, xyz_path)
-            i += 1
-            if view_pymol:
-                self.pymol.load_structure(xyz_path, delete_after=delete_files)
-                self.pymol.pymol_cmd("group state_%d, %s" % (state, xyz_path))
+        title = "%s %s" % (g_file.split("/")[-1], frq)
+        if not delete_files:
+            # All frames in one xyz file:
+            base_name = "%s/%s" % ( self.react.settings.workdir, g_file.split("/")[-1].split(".")[0])
+            mol_vibs.write_xyz_trajectory("%s_w%s.xyz" % (base_name, frq), title=title)
 
         if view_pymol:
-            # Make animation
-            # join_states moviename, mol*, 0 (the 0 assumes identical input objects so bonds can vary)
-            self.pymol.pymol_cmd("delete w_%s" % frq)
-            self.pymol.pymol_cmd("join_states w_%s, %s*, 0" % (frq, base_name.split("/")[-1]))
-            self.pymol.pymol_cmd("delete %s_tmp*" % base_name.split("/")[-1])
+            # Make animation, one object with a state per frame:
+            self.pymol.load_trajectory("w_%s" % frq, mol_vibs.atom_names, mol_vibs.trajectory, title)
             self.pymol.pymol_cmd("group state_%d, w_%s" % (state, frq))
             self.pymol.highlight(name="w_%s" % frq, group="state_%d" % state)
             self.pymol.pymol_cmd("set movie_fps, 40")
@@ -238,77 +237,16 @@ class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
         self.energies = dict()
         for state in self.react.included_files.keys():
             state = int(state)
-            if state not in self.energies.keys():
-                self.energies[state] = {0: None, 1: None, 2: None, 3: None}
-
-            for term in self.react.included_files[state].keys():
-                # Check if state term has file (file length for now)
-                if len(self.react.included_files[state][term]) > 2:
-                    filepath = self.react.included_files[state][term]
-                    #state_object = self.react.states[state - 1]
-                    mol_obj = self.react.states[state - 1].get_molecule_object(filepath)
-                    # Include 3 corrections from frequency calculation
-                    if term == 1:
-                        self.energies[state][term] = dict()
-
-                        self.energies[state][term]["dG"] = mol_obj.thermal_dg
-                        self.energies[state][term]["dH"] = mol_obj.thermal_dh
-                        self.energies[state][term]["dE"] = mol_obj.thermal_de
-
-                    else:
-                        #self.energies[state][term] = state_object.get_energy(filepath)
-                        self.energies[state][term] = mol_obj.energy
-                else:
-                    self.energies[state][term] = None
+            self.energies[state] = state_energies(
+                self.react.included_files[state], self.react.states[state - 1].get_molecule_object
+            )
 
     def get_relative_energies(self):
         """
-
-        :return:
+        :return: energies of all states relative to state 1, see EnergyAnalysis.relative_energies
         """
-        de = dict()
         self.update_energies()
-        for state in sorted(self.energies.keys()):
-            de[state] = dict()
-            for term in self.energies[state].keys():
-                # main or big basis:
-                if self.energies[state][term] and self.energies[1][term]:
-                    if term == 0:
-                        de[state]["main"] = self.energies[state][term] - self.energies[1][term]
-                    # Frequencies = compute gibbs, enthalpy, energy in addition ...
-                    elif term == 1:
-                        # Relative thermal corrections to Gibbs, Enthalpy and Energy:
-                        de[state]["ddG"] = self.energies[state][term]["dG"] - self.energies[1][term]["dG"]
-                        de[state]["ddH"] = self.energies[state][term]["dH"] - self.energies[1][term]["dH"]
-                        de[state]["ddE"] = self.energies[state][term]["dE"] - self.energies[1][term]["dE"]
-
-                        # Gibbs, Enthalpy and Energy with thermal corrections:
-                        de[state]["dG"] = de[state]["main"] + de[state]["ddG"]
-                        de[state]["dH"] = de[state]["main"] + de[state]["ddH"]
-                        de[state]["dE"] = de[state]["main"] + de[state]["ddE"]
-
-                    # Solvation correction:
-                    elif term == 2:
-                        solv_1 = self.energies[1][2] - self.energies[1][0]
-                        solv_state = self.energies[state][2] - self.energies[state][0]
-                        de[state]["ddSolv"] = solv_state - solv_1
-                        de[state]["dSolv"] = solv_state
-
-                        # Update Gibbs, Enthalpy and Energy with solvation correction:
-                        if "dG" in de[state].keys():
-                            for delta in ["dG", "dH", "dE"]:
-                                de[state][delta] += de[state]["ddSolv"]
-
-                    # Big basis correction:
-                    elif term == 3:
-                        de[state]["big"] = self.energies[state][term] - self.energies[1][term]
-
-                        # Update Gibbs, Enthalpy and Energy with using big basis:
-                        if "dG" in de[state].keys():
-                            for delta in ["dG", "dH", "dE"]:
-                                de[state][delta] += (de[state]["big"] - de[state]["main"])
-
-        return de
+        return relative_energies(self.energies)
 
     def update_absolute_values(self):
         """
@@ -318,34 +256,16 @@ class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
         self.ui.text_state_values.clear()
 
         self.update_energies()
-        D = cf.unicode_symbols["Delta"]
-        d = cf.unicode_symbols["delta"]
-
-        symb = {0: "E(elec)", 1: {"dG": d+"G ", "dH": d+"H ", "dE": d+"E "}, 2: "E(solv)", 3: "E(big)"}
-
         state = self.react.tabWidget.currentIndex() + 1
-        energies = self.energies[state]
-        for term in sorted(energies.keys()):
-            if energies[term]:
-                if term == 1:
-                    # Get thermal corrections:
-                    for subterm in sorted(energies[term].keys()):
-                        ene = energies[term][subterm] * self.unit
-                        self.ui.text_state_values.appendPlainText("%8s %16.6f" % (symb[term][subterm], ene))
-                else:
-                    ene = energies[term] * self.unit
-                    self.ui.text_state_values.appendPlainText("%8s %16.6f" % (symb[term], ene))
-
-                # Calculate solvation energy:
-                if term == 2:
-                    de_solv = (energies[2] - energies[0]) * self.unit
-                    self.ui.text_state_values.appendPlainText("%8s %16.6f" % (D+"E(solv)", de_solv))
+        for line in absolute_energy_lines(self.energies[state], self.unit):
+            self.ui.text_state_values.appendPlainText(line)
 
         # If frequencies, insert them to list_frequencies:
         self.insert_frequencies(state)
 
     def insert_frequencies(self, state):
         self.ui.list_frequencies.clear()
+        self.set_normal_modes_available(state)
         if self.energies[state][1]:
             insert_index = 0
             frequencies = self.react.states[state - 1].get_frequencies(str(self.react.included_files[state][1]))
@@ -357,6 +277,18 @@ class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
             # select the first frequency:
             self.ui.list_frequencies.setCurrentRow(1)
 
+    def set_normal_modes_available(self, state):
+        """
+        Frequencies can only be animated if normal modes can be read (fex. not from a project snapshot without the
+        output file, see OutputFile.output_available)
+        """
+        freq_file = str(self.react.included_files[state][1])
+        file_object = self.react.states[state - 1].get_molecule_object(freq_file) if freq_file else None
+        available = getattr(file_object, "output_available", True)
+
+        self.ui.button_frq_pymol.setEnabled(available)
+        self.ui.button_frq_pymol.setToolTip("" if available else f"Normal modes not available: {freq_file} not found")
+
     def update_relative_values(self):
         """
 
@@ -371,83 +303,9 @@ class AnalyseCalc(QtWidgets.QMainWindow, Ui_AnalyseWindow):
 
         rel_ene = self.get_relative_energies()
 
-        # Generate the relevant header:
-        D = cf.unicode_symbols["Delta"]
-        d = cf.unicode_symbols["delta"]
-        Dd = D + d
-        DD = D + D
-
-        header = "State"
-
-        big = False
-        # Include big basis correction?
-        if "big" in rel_ene[1].keys():
-            big = True
-            header += "  %1sE(big)" % D
-        else:
-            header += " %1sE(main)" % D
-
-        # Include solvation correction?
-        solvation = False
-        if "ddSolv" in rel_ene[1].keys():
-            solvation = True
-            header += " %2sE(solv)" % Dd
-
-        # Include frequencies?
-        freq = False
-        if "dG" in rel_ene[1].keys():
-            freq = True
-            # only printing out Gibbs, to simplify table 
-            #header += "%8s %8s %8s %8s %8s %8s" % (Dd + "G", Dd + "H", Dd + "E", D + "G", D + "H", D + "E")
-            header += "%8s %8s" % (Dd + "G", D + "G")
-
-        self.ui.text_relative_values.appendPlainText(header)
-
         # insert relative energies to UI with correct unit:
-        for state in rel_ene.keys():
-            energies = "%5d" % state
-
-            # If big basis - put this first, so that everything connected to main comes after main.
-            dbig = 0
-            if big:
-                if "big" in rel_ene[state].keys():
-                    dbig = rel_ene[state]["big"] * self.unit
-                energies += "%9.2f" % dbig
-            # Electronic energies of main file:
-            else:
-                d_el = 0
-                if "main" in rel_ene[state].keys():
-                    d_el = rel_ene[state]["main"] * self.unit
-                energies += "%9.2f" % d_el
-
-            # Change in solvation energy:
-            dd_solv = 0
-            if solvation:
-                if "ddSolv" in rel_ene[state].keys():
-                    dd_solv = rel_ene[state]["ddSolv"] * self.unit
-                energies += "%10.2f" % dd_solv
-
-            # Insert corrections from frequency calculations and calculate ∆G, ∆H and ∆E:
-            if freq:
-                ddg = 0
-                dde = 0
-                ddh = 0
-                de = 0
-                dh = 0
-                dg = 0
-                if "dG" in rel_ene[state].keys():
-                    ddg = rel_ene[state]["ddG"] * self.unit
-                    dde = rel_ene[state]["ddE"] * self.unit
-                    ddh = rel_ene[state]["ddH"] * self.unit
-
-                    dg = rel_ene[state]["dG"] * self.unit
-                    de = rel_ene[state]["dE"] * self.unit
-                    dh = rel_ene[state]["dH"] * self.unit
-
-                #energies += "%8.2f %8.2f %8.2f %8.2f %8.2f %8.2f" % (ddg, ddh, dde, dg, dh, de)
-                energies += "%8.2f %8.2f" % (ddg, dg)
-
-            self.ui.text_relative_values.appendPlainText(energies)
+        for line in relative_energy_lines(rel_ene, self.unit):
+            self.ui.text_relative_values.appendPlainText(line)
 
     def update_checkboxes(self):
         """
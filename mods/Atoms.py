@@ -1,58 +1,170 @@
+# Element symbol, atomic mass and covalent radius (Angstrom) for every atom number.
+# Covalent radii: Cordero et al., Dalton Trans. 2008 (low spin Mn, Fe, Co) and Pyykkö & Atsumi, Chem. Eur. J. 2009
+# (Bk and heavier).
+ELEMENTS = {
+    1: ("H", 1.008, 0.31),
+    2: ("He", 4.0026, 0.28),
+    3: ("Li", 6.94, 1.28),
+    4: ("Be", 9.0122, 0.96),
+    5: ("B", 10.81, 0.84),
+    6: ("C", 12.011, 0.76),
+    7: ("N", 14.007, 0.71),
+    8: ("O", 15.999, 0.66),
+    9: ("F", 18.998, 0.57),
+    10: ("Ne", 20.180, 0.58),
+    11: ("Na", 22.990, 1.66),
+    12: ("Mg", 24.305, 1.41),
+    13: ("Al", 26.982, 1.21),
+    14: ("Si", 28.085, 1.11),
+    15: ("P", 30.974, 1.07),
+    16: ("S", 32.06, 1.05),
+    17: ("Cl", 35.45, 1.02),
+    18: ("Ar", 39.948, 1.06),
+    19: ("K", 39.098, 2.03),
+    20: ("Ca", 40.078, 1.76),
+    21: ("Sc", 44.956, 1.70),
+    22: ("Ti", 47.867, 1.60),
+    23: ("V", 50.942, 1.53),
+    24: ("Cr", 51.996, 1.39),
+    25: ("Mn", 54.938, 1.39),
+    26: ("Fe", 55.845, 1.32),
+    27: ("Co", 58.933, 1.26),
+    28: ("Ni", 58.693, 1.24),
+    29: ("Cu", 63.546, 1.32),
+    30: ("Zn", 65.38, 1.22),
+    31: ("Ga", 69.723, 1.22),
+    32: ("Ge", 72.630, 1.20),
+    33: ("As", 74.922, 1.19),
+    34: ("Se", 78.971, 1.20),
+    35: ("Br", 79.904, 1.20),
+    36: ("Kr", 83.798, 1.16),
+    37: ("Rb", 85.468, 2.20),
+    38: ("Sr", 87.62, 1.95),
+    39: ("Y", 88.906, 1.90),
+    40: ("Zr", 91.224, 1.75),
+    41: ("Nb", 92.906, 1.64),
+    42: ("Mo", 95.95, 1.54),
+    43: ("Tc", 98.0, 1.47),
+    44: ("Ru", 101.07, 1.46),
+    45: ("Rh", 102.91, 1.42),
+    46: ("Pd", 106.42, 1.39),
+    47: ("Ag", 107.87, 1.45),
+    48: ("Cd", 112.41, 1.44),
+    49: ("In", 114.82, 1.42),
+    50: ("Sn", 118.71, 1.39),
+    51: ("Sb", 121.76, 1.39),
+    52: ("Te", 127.60, 1.38),
+    53: ("I", 126.90, 1.39),
+    54: ("Xe", 131.29, 1.40),
+    55: ("Cs", 132.91, 2.44),
+    56: ("Ba", 137.33, 2.15),
+    57: ("La", 138.91, 2.07),
+    58: ("Ce", 140.12, 2.04),
+    59: ("Pr", 140.91, 2.03),
+    60: ("Nd", 144.24, 2.01),
+    61: ("Pm", 145.0, 1.99),
+    62: ("Sm", 150.36, 1.98),
+    63: ("Eu", 151.96, 1.98),
+    64: ("Gd", 157.25, 1.96),
+    65: ("Tb", 158.93, 1.94),
+    66: ("Dy", 162.50, 1.92),
+    67: ("Ho", 164.93, 1.92),
+    68: ("Er", 167.26, 1.89),
+    69: ("Tm", 168.93, 1.90),
+    70: ("Yb", 173.05, 1.87),
+    71: ("Lu", 174.97, 1.87),
+    72: ("Hf", 178.49, 1.75),
+    73: ("Ta", 180.95, 1.70),
+    74: ("W", 183.84, 1.62),
+    75: ("Re", 186.21, 1.51),
+    76: ("Os", 190.23, 1.44),
+    77: ("Ir", 192.22, 1.41),
+    78: ("Pt", 195.08, 1.36),
+    79: ("Au", 196.97, 1.36),
+    80: ("Hg", 200.59, 1.32),
+    81: ("Tl", 204.38, 1.45),
+    82: ("Pb", 207.2, 1.46),
+    83: ("Bi", 208.98, 1.48),
+    84: ("Po", 209.0, 1.40),
+    85: ("At", 210.0, 1.50),
+    86: ("Rn", 222.0, 1.50),
+    87: ("Fr", 223.0, 2.60),
+    88: ("Ra", 226.0, 2.21),
+    89: ("Ac", 227.0, 2.15),
+    90: ("Th", 232.04, 2.06),
+    91: ("Pa", 231.04, 2.00),
+    92: ("U", 238.03, 1.96),
+    93: ("Np", 237.0, 1.90),
+    94: ("Pu", 244.0, 1.87),
+    95: ("Am", 243.0, 1.80),
+    96: ("Cm", 247.0, 1.69),
+    97: ("Bk", 247.0, 1.68),
+    98: ("Cf", 251.0, 1.68),
+    99: ("Es", 252.0, 1.65),
+    100: ("Fm", 257.0, 1.67),
+    101: ("Md", 258.0, 1.73),
+    102: ("No", 259.0, 1.76),
+    103: ("Lr", 262.0, 1.61),
+    104: ("Rf", 267.0, 1.57),
+    105: ("Db", 268.0, 1.49),
+    106: ("Sg", 269.0, 1.43),
+    107: ("Bh", 270.0, 1.41),
+    108: ("Hs", 269.0, 1.34),
+    109: ("Mt", 278.0, 1.29),
+    110: ("Ds", 281.0, 1.28),
+    111: ("Rg", 282.0, 1.21),
+    112: ("Cn", 285.0, 1.22),
+    113: ("Nh", 286.0, 1.36),
+    114: ("Fl", 289.0, 1.43),
+    115: ("Mc", 290.0, 1.62),
+    116: ("Lv", 293.0, 1.75),
+    117: ("Ts", 294.0, 1.65),
+    118: ("Og", 294.0, 1.57),
+}
+
+# Atom number to atom dictionary
+ATOMNR_ATOM = {atomnr: element[0] for atomnr, element in ELEMENTS.items()}
+
+# Atom name to atom number dictionary
+ATOM_ATOMNR = {atom: atomnr for atomnr, atom in ATOMNR_ATOM.items()}
+
+# Atom number to atomic mass and covalent radius dictionaries
+ATOMNR_MASS = {atomnr: element[1] for atomnr, element in ELEMENTS.items()}
+ATOMNR_RADIUS = {atomnr: element[2] for atomnr, element in ELEMENTS.items()}
+
+
 class Atom:
     """
     Class to store information for atoms.
     Coordinates, mass, name, pdb name, type etc.
+    Element info is looked up in the shared element tables, and the pdb line is only made when asked for.
     """
 
-    def __init__(self, atom, x, y, z, index=None):
-        # Atom number to atom dictionary - only most common elements. Maybe complete at some point later ... maybe not.
-        self.atomnr_atom = {
-            1: "H",
-            2: "He",
-            3: "Li",
-            4: "Be",
-            5: "B",
-            6: "C",
-            7: "N",
-            8: "O",
-            9: "F",
-            10: "Ne",
-            11: "Na",
-            12: "Mg",
-            13: "Al",
-            14: "Si",
-            15: "P",
-            16: "S",
-            17: "Cl",
-            18: "Ar",
-            19: "K",
-            20: "Ca",
-            24: "Cr",
-            25: "Mn",
-            26: "Fe",
-            27: "Co",
-            28: "Ni",
-            29: "Cu",
-            30: "Zn",
-            34: "Se",
-            35: "Br",
-            36: "Kr",
-            53: "I",
-        }
-
-        # Atom name to atom number dictionary
-        self.atom_atomnr = {atom: atomnr for atomnr, atom in self.atomnr_atom.items()}
+    __slots__ = (
+        "_atom_nr",
+        "_atom_name",
+        "_x",
+        "_y",
+        "_z",
+        "center_number",
+        "_pdb_atom_nr",
+        "_pdb_atom_name",
+        "_residue_name",
+        "_residue_nr",
+        "_formatted_pdb_line",
+    )
+
+    # Shared by all atoms:
+    atomnr_atom = ATOMNR_ATOM
+    atom_atomnr = ATOM_ATOMNR
 
+    def __init__(self, atom, x, y, z, index=None):
         # atom can be passed to Atom class either as atomic number or atomic name:
         if atom.isdigit():
             self._atom_nr = int(atom)
-            self._atom_name = self.atomnr_atom[self.atom_nr]
+            self._atom_name = ATOMNR_ATOM[self._atom_nr]
         else:
-            try:
-                self._atom_nr = self.atom_atomnr[atom]
-            except KeyError:
-                self._atom_nr = None
-
+            self._atom_nr = ATOM_ATOMNR.get(atom)
             self._atom_name = atom
 
         self._x = float(x)
@@ -64,10 +176,10 @@ class Atom:
             self.center_number = index
             self._pdb_atom_nr = index
 
-        self._pdb_atom_name = self.atom_name
+        self._pdb_atom_name = self._atom_name
         self._residue_name = "UNK"
         self._residue_nr = 1
-        self._formatted_pdb_line = self.make_pdb_line()
+        self._formatted_pdb_line = None
 
     @property
     def x(self):
@@ -108,6 +220,8 @@ class Atom:
 
     @property
     def formatted_pdb_line(self):
+        if self._formatted_pdb_line is None:
+            self._formatted_pdb_line = self.make_pdb_line()
         return self._formatted_pdb_line
 
     @formatted_pdb_line.setter
@@ -122,6 +236,14 @@ class Atom:
     def atom_nr(self):
         return self._atom_nr
 
+    @property
+    def mass(self):
+        return ATOMNR_MASS.get(self._atom_nr)
+
+    @property
+    def covalent_radius(self):
+        return ATOMNR_RADIUS.get(self._atom_nr)
+
     @property
     def atom_index(self):
         return int(self.center_number)
@@ -172,12 +294,11 @@ class XYZAtom(Atom):
     Takes a line from a xyz file and creates an Atom object from it
     """
 
+    __slots__ = ()
+
     def __init__(self, atom_line=None, index=None):
         if atom_line:
-            atom = atom_line.split()[0]
-            x = float(atom_line.split()[1])
-            y = float(atom_line.split()[2])
-            z = float(atom_line.split()[3])
+            atom, x, y, z = atom_line.split()[:4]
             super(XYZAtom, self).__init__(atom, x, y, z, index)
 
 
@@ -190,20 +311,15 @@ class GaussianAtom(Atom):
      1          6           0       -3.809685    3.412407   -1.222092
     """
 
+    __slots__ = ()
+
     def __init__(self, atom_line=None):
         if atom_line:
-            # Gaussian atom attributes:
-            center_number = int(atom_line.split()[0])
-
-            _atomic_type = int(atom_line.split()[2])
+            # Gaussian atom attributes: center number, atomic number, atomic type, x, y, z
+            center_number, atom, _atomic_type, x_coordinate, y_coordinate, z_coordinate = atom_line.split()[:6]
 
-            # Atom class attributes:
-            atom = atom_line.split()[1]
-            x_coordinate = float(atom_line.split()[3])
-            y_coordinate = float(atom_line.split()[4])
-            z_coordinate = float(atom_line.split()[5])
             super(GaussianAtom, self).__init__(
-                atom, x_coordinate, y_coordinate, z_coordinate, center_number
+                atom, x_coordinate, y_coordinate, z_coordinate, int(center_number)
             )
 
         # atom = {index: int, name: C:str, X:float, Y:float, Z:float}
@@ -215,6 +331,8 @@ class PDBAtom(Atom):
     Takes a line from a pdb file at init
     """
 
+    __slots__ = ("res_name", "res_nr", "pdb_line")
+
     def __init__(self, atom_line=None):
         if atom_line:
             atom_index = int(atom_line[6:11])
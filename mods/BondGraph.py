@@ -0,0 +1,173 @@
+import numpy as np
+from mods.Atoms import ATOM_ATOMNR, ATOMNR_RADIUS
+from mods.NeighborSearch import NeighborSearch
+
+# Atoms are bonded if closer than the sum of their covalent radii + BOND_TOLERANCE (Angstrom):
+BOND_TOLERANCE = 0.45
+
+# Covalent radius of atoms with unknown element (carbon):
+DEFAULT_RADIUS = ATOMNR_RADIUS[6]
+
+
+def covalent_radii(atom_names):
+    """
+    :param atom_names: element symbols (fex. "C", "Cl" or "CL")
+    :return: numpy array with covalent radius of every atom (DEFAULT_RADIUS if element is not known)
+    """
+    radii = dict()
+    for name in set(atom_names):
+        atom_nr = ATOM_ATOMNR.get(name) or ATOM_ATOMNR.get(name.capitalize())
+        radii[name] = ATOMNR_RADIUS[atom_nr] if atom_nr else DEFAULT_RADIUS
+    return np.array([radii[name] for name in atom_names], dtype=np.float64)
+
+
+def connected_labels(atom_count, i, j):
+    """
+    Label every atom with the smallest atom number of its connected component. Labels of bonded atoms are hooked
+    together (the larger label to the smaller) and labels are followed to their root until no bond joins two labels,
+    all with numpy.
+    :param atom_count: number of atoms
+    :param i: atom numbers, first atom of every bond
+    :param j: atom numbers, second atom of every bond
+    :return: numpy array with label of every atom
+    """
+    labels = np.arange(atom_count)
+    while True:
+        label_i, label_j = labels[i], labels[j]
+        different = label_i != label_j
+        if not different.any():
+            return labels
+
+        low = np.minimum(label_i[different], label_j[different])
+        high = np.maximum(label_i[different], label_j[different])
+        np.minimum.at(labels, high, low)
+
+        while True:
+            root = labels[labels]
+            if np.array_equal(root, labels):
+                break
+            labels = root
+
+
+class BondGraph:
+    """
+    Bonds of a molecule from covalent radii and distances (see BOND_TOLERANCE), found with NeighborSearch.
+    Bonds are stored as adjacency lists in one array (CSR): neighbours of atom a are
+    self.adjacency[self.adjacency_start[a]:self.adjacency_start[a + 1]].
+    Atom numbers are positions (from 0) in coordinates.
+    """
+
+    def __init__(self, atom_names, coordinates, tolerance=BOND_TOLERANCE):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 3)
+        self.radii = covalent_radii([str(name) for name in atom_names])
+
+        if len(self.coordinates):
+            cutoff = 2 * self.radii.max() + tolerance
+            i, j, distances = NeighborSearch(self.coordinates, cell_size=cutoff).pairs(cutoff)
+            bonded = distances <= self.radii[i] + self.radii[j] + tolerance
+            i, j = i[bonded], j[bonded]
+        else:
+            i, j = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Bonds (i < j), sorted:
+        order = np.lexsort((j, i))
+        self.bonds = np.stack((i[order], j[order]), axis=1)
+
+        # Both directions of every bond, sorted by first atom:
+        first, second = np.concatenate((i, j)), np.concatenate((j, i))
+        order = np.lexsort((second, first))
+        self.adjacency = second[order]
+        self.adjacency_start = np.concatenate(([0], np.cumsum(np.bincount(first, minlength=self.atom_count))))
+
+        self._labels = None
+
+    @property
+    def atom_count(self):
+        return len(self.coordinates)
+
+    def neighbours(self, atom):
+        """
+        :param atom: atom number
+        :return: numpy array with atoms bonded to atom
+        """
+        return self.adjacency[self.adjacency_start[atom]:self.adjacency_start[atom + 1]]
+
+    @property
+    def degrees(self):
+        """
+        :return: number of bonds of every atom
+        """
+        return np.diff(self.adjacency_start)
+
+    def is_bonded(self, atom1, atom2):
+        return bool(np.any(self.neighbours(atom1) == atom2))
+
+    @property
+    def labels(self):
+        """
+        :return: numpy array with fragment label of every atom (smallest atom number in fragment)
+        """
+        if self._labels is None:
+            self._labels = connected_labels(self.atom_count, self.bonds[:, 0], self.bonds[:, 1])
+        return self._labels
+
+    @property
+    def fragments(self):
+        """
+        :return: list of numpy arrays with atoms of every fragment (connected atoms), in order of first atom
+        """
+        order = np.argsort(self.labels, kind="stable")
+        starts = np.flatnonzero(np.diff(self.labels[order])) + 1
+        return np.split(order, starts) if self.atom_count else list()
+
+    def fragment_of(self, atom):
+        """
+        :return: numpy array with all atoms connected to atom
+        """
+        return np.flatnonzero(self.labels == self.labels[atom])
+
+    def neighbours_of(self, atoms):
+        """
+        :param atoms: numpy array with atom numbers
+        :return: numpy array with atoms bonded to any of atoms (may include atoms)
+        """
+        starts, stops = self.adjacency_start[atoms], self.adjacency_start[atoms + 1]
+        counts = stops - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.unique(self.adjacency[np.repeat(starts, counts) + offsets])
+
+    def side(self, atom1, atom2):
+        """
+        Atoms on the atom2 side of the bond atom1-atom2, fex. the substituent moved together with atom2 when the bond
+        is scanned. Found breadth first, one shell of neighbours at a time.
+        :return: numpy array with atom2 and all atoms connected to atom2 without the bond, None if the bond is in a
+        ring (both sides are the same atoms)
+        """
+        visited = np.zeros(self.atom_count, dtype=bool)
+        visited[[atom1, atom2]] = True
+        shell = np.array([atom2])
+
+        neighbours = self.neighbours_of(shell)
+        neighbours = neighbours[neighbours != atom1]
+        while len(neighbours):
+            shell = neighbours[~visited[neighbours]]
+            visited[shell] = True
+            if not len(shell):
+                break
+            neighbours = self.neighbours_of(shell)
+            if np.any(neighbours == atom1):
+                return None
+
+        visited[atom1] = False
+        return np.flatnonzero(visited)
+
+    def sides(self, atom1, atom2):
+        """
+        :return: atoms on the atom1 side and atoms on the atom2 side of the bond atom1-atom2 (see self.side), None if
+        the bond is in a ring
+        """
+        side2 = self.side(atom1, atom2)
+        if side2 is None:
+            return None
+        side1 = self.fragment_of(atom1)
+        return np.setdiff1d(side1, side2), side2
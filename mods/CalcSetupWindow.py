@@ -16,16 +16,18 @@
 # with chemREACT. If not, see <https://www.gnu.org/licenses/>.
 #
 
-import os
-from os import path, mkdir, remove
-import glob
+from os import path
 import shutil
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import pyqtSlot, QTimer
 from UIs.SetupWindow import Ui_SetupWindow
 from mods.ScanBond import AtomBond
-from mods.common_functions import atom_distance, random_color, write_file
+from mods.InputTemplate import InputTemplate, FILENAME, input_lines_format
+from mods.common_functions import random_color, write_file
+from mods.NeighborSearch import distance
+from mods.BondGraph import BondGraph
 import copy
+import numpy as np
 
 
 class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
@@ -358,7 +360,7 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
 
         if len(atoms) == 2:
             # self.enable_scan(enable=True)
-            r = atom_distance(coordinates[0], coordinates[1])
+            r = distance(coordinates[0], coordinates[1])
             self.ui.spinbox_radius.setValue(r)
             self.ui.spinbox_curr_mv.setValue(r)
         # else:
@@ -536,35 +538,17 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
         except:
             pass
 
-        all_xyz = self.move_bond.scan_new_coordinates
-        last_xyz = all_xyz.popitem()
-
-        content = str(len(last_xyz[1])) + "\n" + last_xyz[0] + "\n"
-        for line in last_xyz[1]:
-            content += line + "\n"
-
-        filepath = self.settings.workdir + "/.move_tmp.xyz"
-        try:
-            remove(filepath)
-        except:
-            pass
-
-        with open(filepath, "w+") as f:
-            f.write(content)
-
-        self.react.pymol.load_structure(filepath, delete_after=True)
-        self.react.pymol.pymol_cmd(
-            "group state_%d, %s" % (1, filepath.split("/")[-1].split(".")[0])
+        # Only the last geometry is used, sent to pymol without writing a file:
+        self.react.pymol.load_trajectory(
+            "move_tmp",
+            self.move_bond.elements,
+            self.move_bond.trajectory[-1:],
+            titles=self.move_bond.scan_filenames[-1],
         )
+        self.react.pymol.pymol_cmd("group state_%d, %s" % (1, "move_tmp"))
 
         self.react.pymol.set_default_rep()
-        self.react.pymol.pymol_cmd(
-            "enable state_%d and %s" % (1, filepath.split("/")[-1].split(".")[0])
-        )
-        # self.react.file_to_pymol(self.settings.workdir + '/.move_tmp.xyz', state=1, set_defaults=True)
-
-        # if self.pymol:
-        #    self.react.add_file(self.settings.workdir + '/.move_tmp.xyz')
+        self.react.pymol.pymol_cmd("enable state_%d and %s" % (1, "move_tmp"))
 
     def save_geometry_to_file(self):
         bond_size = self.ui.spinbox_curr_mv.value()
@@ -593,8 +577,8 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
         except IndentationError:
             pass
 
-        all_xyz = self.move_bond.scan_new_coordinates
-        last_xyz = all_xyz.popitem()
+        # Only the last geometry is used:
+        last_xyz = (self.move_bond.scan_filenames[-1], self.move_bond.formatted_xyz(-1))
 
         content = str(len(last_xyz[1])) + "\n" + last_xyz[0] + "\n"
         for line in last_xyz[1]:
@@ -609,19 +593,13 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
 
     def update_scan(self):
         """
-        Remove all old files before making new ones
+        Show all geometries of the scan in pymol, old files in .scan_temp (written by earlier versions) are removed
         """
-        if not path.isdir(f"{self.settings.workdir}/.scan_temp"):
-            mkdir(f"{self.settings.workdir}/.scan_temp")
-        else:
-            tempfiles = glob.glob(f"{self.settings.workdir}/.scan_temp/*")
-            for f in tempfiles:
-                remove(f)
+        if path.isdir(f"{self.settings.workdir}/.scan_temp"):
+            shutil.rmtree(f"{self.settings.workdir}/.scan_temp", ignore_errors=True)
 
         try:
-            self.scan_bond.write_xyzfiles(self.settings.workdir + "/.scan_temp/")
             if self.pymol:
-                # read files to pymol obj
                 self.anmiate_bond_pymol()
         except AttributeError:
             pass
@@ -643,12 +621,10 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
         # name = name_split[0] + "_" + name_split[-1]
         # self.pymol.pymol_cmd(f"delete {name} and state_{self.state}")
         # self.react.file_to_pymol(filepath=self.mol_obj.filepath, state=1, set_defaults=True)
-        state = 1
-        self.pymol.pymol_cmd(f"delete scan")
-        for f in sorted(os.listdir(f"{self.settings.workdir}/.scan_temp")):
-            state += 1
-            _mol = f"{self.settings.workdir}/.scan_temp/{f}"
-            self.pymol.pymol_cmd(f"load {_mol},  scan, {state}")
+        # One state per geometry, replaces the old scan object:
+        self.pymol.load_trajectory(
+            "scan", self.scan_bond.elements, self.scan_bond.trajectory, titles=self.scan_bond.scan_filenames
+        )
         self.pymol.set_default_rep()
         self.pymol.pymol_cmd("set movie_fps, 10")
         self.pymol_animation = True
@@ -903,9 +879,11 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
 
         if self.atom_bonds:
             for bond, bond_obj in self.atom_bonds.items():
-                for filename, xyz in bond_obj.scan_new_coordinates.items():
+                for filename in bond_obj.scan_filenames:
                     self.ui.ComboBox_files.addItem(filename)
 
+                # Only the geometry shown is formatted:
+                xyz = bond_obj.formatted_xyz(-1)
                 self.ui.ComboBox_files.setCurrentText(filename)
                 file_content = self.make_input_content(
                     filename=filename, xyz=xyz, bond_obj=bond_obj
@@ -942,12 +920,13 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
                 pass
 
             for bond, bond_obj in self.atom_bonds.items():
-                for filename_scan, xyz in bond_obj.scan_new_coordinates.items():
-                    if filename_scan == filename:
-                        file_content = self.make_input_content(
-                            filename=filename, xyz=xyz, bond_obj=bond_obj
-                        )
-                        self.ui.text_preview.setPlainText(file_content)
+                filenames_scan = bond_obj.scan_filenames
+                if filename in filenames_scan:
+                    xyz = bond_obj.formatted_xyz(filenames_scan.index(filename))
+                    file_content = self.make_input_content(
+                        filename=filename, xyz=xyz, bond_obj=bond_obj
+                    )
+                    self.ui.text_preview.setPlainText(file_content)
 
     def update_charge(self):
         self.charge = self.ui.lineEdit_charge.text()
@@ -959,7 +938,7 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
         """
         Writes one or multiple inputfiles (found in self.multiplefiles)
         New files are loaded into react again using the exsisting add_files()
-        function in REACT.py
+        function in mods/MainWindow.py
         """
         files = []
         if self.IRC_files:
@@ -971,9 +950,12 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
                 files.append(filepath)
         elif self.atom_bonds:
             for bond, bond_obj in self.atom_bonds.items():
-                for filename_scan, xyz in bond_obj.scan_new_coordinates.items():
-                    content = self.make_input_content(
-                        filename=filename_scan, xyz=xyz, bond_obj=bond_obj
+                # Settings are read once for all files of the scan:
+                input_template = self.input_template(bond_obj=bond_obj)
+                geometry_format = input_lines_format(bond_obj.elements)
+                for filename_scan, coordinates in zip(bond_obj.scan_filenames, bond_obj.trajectory):
+                    content = input_template.render_geometry(
+                        filename_scan, bond_obj.elements, coordinates, geometry_format=geometry_format
                     )
                     filepath = self._make_file(filename_scan, content)
                     files.append(filepath)
@@ -982,7 +964,7 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
             filepath = self._make_file(self.filename, content)
             files.append(filepath)
 
-        # Add files separate to avoid issues relating to multithreading prosess in REACT.py
+        # Add files separate to avoid issues relating to multithreading prosess in mods/MainWindow.py
         for filepath in files:
             if filepath == None:
                 # Something happend (maybe user changed their mind and closed QfileDialog)
@@ -991,6 +973,25 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
             if self.ui.checkBox_cp_to_reactmain.isChecked():
                 self.react.add_file(filepath)
 
+    def make_grid_files(self, grid_scan):
+        """
+        Writes one inputfile for every point of a grid scan (see ScanGrid.GridScan) to the working directory, one at a
+        time, with a manifest of grid indices for ScanGrid.collect_grid_energies. Files are not added to REACT.
+        :param grid_scan: GridScan made from self.mol_obj.formatted_xyz
+        :return: path of manifest
+        """
+
+        input_template = self.input_template(modredundant=True)
+
+        def make_content(filename, xyz, restraints):
+            return input_template.render(filename, xyz, restraints) + "\n"
+
+        manifest_path = grid_scan.write_files(self.react.settings.workdir, make_content)
+        self.react.append_text(
+            f"{len(grid_scan)} inputfiles of grid scan {grid_scan.name} saved to: {self.react.settings.workdir}"
+        )
+        return manifest_path
+
     def _make_file(self, filename, file_content):
         """
         Private function. Makes sure that no files are overwritten, and
@@ -1016,21 +1017,31 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
         return new_filepath
 
     def make_input_content(
-        self, filename, extra_job_keywords=False, xyz=False, bond_obj=False
+        self, filename, extra_job_keywords=False, xyz=False, bond_obj=False, restraints=False
     ):
         """
         Make content (not file) for one Gaussian inputfile.
+        :param restraints: list of extra ModRedundant lines (fex. from GridScan.restraints)
         :return: str
-        The code is divided into the following parts: link0, route, molecule and restraint.
-        Each part prepares it's respective part as a string. named for ex. link0_str.
-        Finally, all sub-strings are jointed into one string, containing the whole file content
+        To make many files with the same settings, make the InputTemplate once with self.input_template instead.
         """
+        input_template = self.input_template(
+            extra_job_keywords=extra_job_keywords, bond_obj=bond_obj, modredundant=bool(restraints)
+        )
+        if not xyz:
+            xyz = self.mol_obj.formatted_xyz
 
-        # sub-strings that will be edited by their respective part
-        link0_str = ""
-        route_str = ""
-        molecule_str = ""
-        restraints_str = ""
+        return input_template.render(filename, xyz, restraints)
+
+    def input_template(self, extra_job_keywords=False, bond_obj=False, modredundant=False):
+        """
+        Make InputTemplate (see mods/InputTemplate.py) with all settings of the window, read from the widgets once.
+        :param modredundant: restraints are given for every file (fex. GridScan.restraints), add modredundant to Opt
+        :return: InputTemplate
+        The code is divided into the following parts: link0, route, molecule and restraint.
+        Each part prepares it's respective part, named for ex. link0_list or route_str.
+        Finally, all parts are given to InputTemplate, which puts together the content of every file
+        """
 
         ### This part creates prepares all link0 keyword by adding them first to the 'link0_list' ###
         ### It also adds "%" to the keyword if its missing                                        ###
@@ -1056,12 +1067,12 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
                         value = value + "GB"
                     link0_list.append("%mem=" + value)
                 elif checkbox.text() == "Chk":
-                    link0_list.append(f"%chk={filename}.chk")
+                    link0_list.append(f"%chk={FILENAME}.chk")
                 elif checkbox.text() == "OldChk":
                     if value:
                         link0_list.append(f"%oldchk={value}.chk")
                     else:
-                        link0_list.append(f"%oldchk={filename}_old.chk")
+                        link0_list.append(f"%oldchk={FILENAME}_old.chk")
 
         for item in [
             self.ui.list_link0.item(x).text() for x in range(self.ui.list_link0.count())
@@ -1071,7 +1082,6 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
                 item = "%" + item
             link0_list.append(item)
 
-        link0_str = "\n".join(link0_list)
 
         ### This part prepares all part of the route comment, by first adding them to route_list ###
         ### Then, all items  in route_list are joined into one str.                              ###
@@ -1084,7 +1094,7 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
             job_keywords.extend(extra_job_keywords)
 
         if self.job_type in ["Opt", "Opt (TS)"]:
-            if self.ui.list_freeze_atoms.count() > 0 or len(self.atom_bonds) > 0:
+            if self.ui.list_freeze_atoms.count() > 0 or len(self.atom_bonds) > 0 or modredundant:
                 job_keywords.append("modredundant")
 
         if self.job_type == "Opt (TS)":
@@ -1177,14 +1187,6 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
                                    Calculation setup. Will set it to 0.."
             )
             self.charge = "0"
-        if xyz:
-            molecule_str = f"{self.charge} {self.multiplicity}\n" + "\n".join(xyz)
-        else:
-            molecule_str = f"{self.charge} {self.multiplicity}\n" + "\n".join(
-                self.mol_obj.formatted_xyz
-            )
-
-        molecule_str = self.remove_extra_newline(molecule_str)
 
         ### This part prepares the restraints, if there are any ###
         restraints_list = []
@@ -1202,25 +1204,15 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
             else:
                 restraints_list.append(f"B {bond_obj.atom1_idx} {bond_obj.atom2_idx} F")
 
-        restraints_str = "\n".join(restraints_list)
-
-        return f"{link0_str}\n{route_str}\n\n{filename} {self.job_type}\n\n{molecule_str}\n\n{restraints_str}\n\n{eps}\n\n"
-
-    def remove_extra_newline(self, input_string):
-        """
-        To remedy some strange bug in make_input_content..
-        """
-
-        # Split the string into lines
-        lines = input_string.split("\n")
-
-        # Remove any empty lines
-        lines = [line for line in lines if line]
-
-        # Join the lines back together with newline characters
-        output_string = "\n".join(lines)
-
-        return output_string
+        return InputTemplate(
+            route_str,
+            charge=self.charge,
+            multiplicity=self.multiplicity,
+            link0=link0_list,
+            title=f"{FILENAME} {self.job_type}",
+            restraints=restraints_list,
+            additional=eps,
+        )
 
     def route_checkboxes_update(self, checkbox, lineEdit):
         if checkbox.isChecked():
@@ -1304,25 +1296,26 @@ class CalcSetupWindow(QtWidgets.QMainWindow, Ui_SetupWindow):
 
     def auto_freeze_atoms(self):
         """
-        Goes through PDB atoms and tries to figure out base on pdb atom names and distances what atoms
-        are terminal/chopped region atoms that should be frozen.
+        Goes through PDB atoms and tries to figure out base on pdb atom names and bonds what atoms
+        are terminal/chopped region atoms that should be frozen: atoms bonded to a C or N atom, that are not backbone
+        atoms (bonds from covalent radii, see BondGraph).
         """
         expected = ["CA", "C", "H", "N", "O"]
-        atoms = self.mol_obj.atoms
-        for atom in atoms:
-            pdb_name = atom.get_pdb_atom_name
-            if pdb_name in ["C", "N"]:
-                atoms.pop(0)
-                for next_atom in atoms:
-                    radius = atom_distance(
-                        atom.get_coordinate, next_atom.get_coordinate
-                    )
-                    if radius < 1.7:
-                        if next_atom.get_pdb_atom_name not in expected:
-                            atom_nr = next_atom.get_atom_index
-                            self.ui.list_freeze_atoms.insertItem(0, f"X {atom_nr} F")
-                            if self.pymol:
-                                self.pymol_spheres(atom_nr)
+        if hasattr(self.mol_obj, "pdb_atoms"):
+            pdb_names = self.mol_obj.pdb_atoms["name"]
+        else:
+            pdb_names = np.array([atom.pdb_atom_name for atom in self.mol_obj.atoms], dtype=str)
+
+        bonds = BondGraph(self.mol_obj.elements, self.mol_obj.coordinates).bonds
+        i, j = bonds[:, 0], bonds[:, 1]
+        # Both directions of every pair, C/N atom first:
+        terminal, neighbour = np.concatenate((i, j)), np.concatenate((j, i))
+        freeze = np.isin(pdb_names[terminal], ["C", "N"]) & ~np.isin(pdb_names[neighbour], expected)
+
+        for atom_nr in np.unique(self.mol_obj.atom_indices[neighbour[freeze]]).tolist():
+            self.ui.list_freeze_atoms.insertItem(0, f"X {atom_nr} F")
+            if self.pymol:
+                self.pymol_spheres(atom_nr)
 
     def add_item_to_list(self, Qtextinput, Qlist, job_list):
         """
@@ -0,0 +1,209 @@
+from mods.common_functions import unicode_symbols
+
+# Energy unit : factor from Hartree
+UNITS = {"hartree": 1.0, "kcal": 627.51, "kj": 2625.51}
+
+# Energy terms of a state, and the file of every term (see included_files):
+# 0: main (electronic energy), 1: thermal corrections from frequencies, 2: solvation, 3: big basis
+TERMS = {0: "main", 1: "frequencies", 2: "solvation", 3: "big basis"}
+
+
+def included_files(filepath, file_object):
+    """
+    Files of the energy terms of a state with one output file, as when the Analyse window is opened: the output file is
+    the main file, and also the frequency and solvation file if it has frequencies or solvent.
+    :param file_object: OutputFile (or FrequenciesOut) of filepath
+    :return: dict {term: filepath ("" if no file)}
+    """
+    files = {0: "", 1: "", 2: "", 3: ""}
+    files[0] = filepath
+    if file_object.frequencies:
+        files[1] = filepath
+    if file_object.solvent:
+        files[2] = filepath
+    return files
+
+
+def state_energies(files, get_file):
+    """
+    :param files: dict {term: filepath} (see included_files)
+    :param get_file: function, filepath --> file object (fex. State.get_molecule_object)
+    :return: dict {term: energy (Hartree) or None}, term 1 is a dict with thermal corrections {"dG", "dH", "dE"}
+    """
+    energies = {0: None, 1: None, 2: None, 3: None}
+
+    for term in files.keys():
+        # Check if state term has file (file length for now)
+        if len(files[term]) > 2:
+            mol_obj = get_file(files[term])
+            # Include 3 corrections from frequency calculation
+            if term == 1:
+                energies[term] = dict()
+
+                energies[term]["dG"] = mol_obj.thermal_dg
+                energies[term]["dH"] = mol_obj.thermal_dh
+                energies[term]["dE"] = mol_obj.thermal_de
+
+            else:
+                energies[term] = mol_obj.energy
+        else:
+            energies[term] = None
+
+    return energies
+
+
+def relative_energies(energies):
+    """
+    Energies of all states relative to state 1
+    :param energies: dict {state: state_energies}
+    :return: dict {state: {name: relative energy (Hartree)}}, with names "main", "ddG", "ddH", "ddE", "dG", "dH",
+    "dE", "ddSolv", "dSolv" and "big" for the terms found in both the state and state 1
+    """
+    de = dict()
+    for state in sorted(energies.keys()):
+        de[state] = dict()
+        for term in energies[state].keys():
+            # main or big basis:
+            if energies[state][term] and energies[1][term]:
+                if term == 0:
+                    de[state]["main"] = energies[state][term] - energies[1][term]
+                # Frequencies = compute gibbs, enthalpy, energy in addition ...
+                elif term == 1:
+                    # Relative thermal corrections to Gibbs, Enthalpy and Energy:
+                    de[state]["ddG"] = energies[state][term]["dG"] - energies[1][term]["dG"]
+                    de[state]["ddH"] = energies[state][term]["dH"] - energies[1][term]["dH"]
+                    de[state]["ddE"] = energies[state][term]["dE"] - energies[1][term]["dE"]
+
+                    # Gibbs, Enthalpy and Energy with thermal corrections:
+                    de[state]["dG"] = de[state]["main"] + de[state]["ddG"]
+                    de[state]["dH"] = de[state]["main"] + de[state]["ddH"]
+                    de[state]["dE"] = de[state]["main"] + de[state]["ddE"]
+
+                # Solvation correction:
+                elif term == 2:
+                    solv_1 = energies[1][2] - energies[1][0]
+                    solv_state = energies[state][2] - energies[state][0]
+                    de[state]["ddSolv"] = solv_state - solv_1
+                    de[state]["dSolv"] = solv_state
+
+                    # Update Gibbs, Enthalpy and Energy with solvation correction:
+                    if "dG" in de[state].keys():
+                        for delta in ["dG", "dH", "dE"]:
+                            de[state][delta] += de[state]["ddSolv"]
+
+                # Big basis correction:
+                elif term == 3:
+                    de[state]["big"] = energies[state][term] - energies[1][term]
+
+                    # Update Gibbs, Enthalpy and Energy with using big basis:
+                    if "dG" in de[state].keys():
+                        for delta in ["dG", "dH", "dE"]:
+                            de[state][delta] += (de[state]["big"] - de[state]["main"])
+
+    return de
+
+
+def absolute_energy_lines(energies, unit=1.0):
+    """
+    :param energies: state_energies of one state
+    :param unit: factor from Hartree (see UNITS)
+    :return: list of lines (str) with the energy terms of the state, as in the Analyse window
+    """
+    D = unicode_symbols["Delta"]
+    d = unicode_symbols["delta"]
+
+    symb = {0: "E(elec)", 1: {"dG": d+"G ", "dH": d+"H ", "dE": d+"E "}, 2: "E(solv)", 3: "E(big)"}
+
+    lines = list()
+    for term in sorted(energies.keys()):
+        if energies[term]:
+            if term == 1:
+                # Get thermal corrections:
+                for subterm in sorted(energies[term].keys()):
+                    ene = energies[term][subterm] * unit
+                    lines.append("%8s %16.6f" % (symb[term][subterm], ene))
+            else:
+                ene = energies[term] * unit
+                lines.append("%8s %16.6f" % (symb[term], ene))
+
+            # Calculate solvation energy:
+            if term == 2:
+                de_solv = (energies[2] - energies[0]) * unit
+                lines.append("%8s %16.6f" % (D+"E(solv)", de_solv))
+
+    return lines
+
+
+def relative_energy_lines(rel_ene, unit=1.0):
+    """
+    :param rel_ene: relative_energies
+    :param unit: factor from Hartree (see UNITS)
+    :return: list of lines (str), header and one line per state, as in the Analyse window
+    """
+    # Generate the relevant header:
+    D = unicode_symbols["Delta"]
+    d = unicode_symbols["delta"]
+    Dd = D + d
+
+    header = "State"
+
+    big = False
+    # Include big basis correction?
+    if "big" in rel_ene[1].keys():
+        big = True
+        header += "  %1sE(big)" % D
+    else:
+        header += " %1sE(main)" % D
+
+    # Include solvation correction?
+    solvation = False
+    if "ddSolv" in rel_ene[1].keys():
+        solvation = True
+        header += " %2sE(solv)" % Dd
+
+    # Include frequencies?
+    freq = False
+    if "dG" in rel_ene[1].keys():
+        freq = True
+        # only printing out Gibbs, to simplify table
+        header += "%8s %8s" % (Dd + "G", D + "G")
+
+    lines = [header]
+
+    # relative energies with correct unit:
+    for state in rel_ene.keys():
+        energies = "%5d" % state
+
+        # If big basis - put this first, so that everything connected to main comes after main.
+        dbig = 0
+        if big:
+            if "big" in rel_ene[state].keys():
+                dbig = rel_ene[state]["big"] * unit
+            energies += "%9.2f" % dbig
+        # Electronic energies of main file:
+        else:
+            d_el = 0
+            if "main" in rel_ene[state].keys():
+                d_el = rel_ene[state]["main"] * unit
+            energies += "%9.2f" % d_el
+
+        # Change in solvation energy:
+        dd_solv = 0
+        if solvation:
+            if "ddSolv" in rel_ene[state].keys():
+                dd_solv = rel_ene[state]["ddSolv"] * unit
+            energies += "%10.2f" % dd_solv
+
+        # Insert corrections from frequency calculations and calculate ∆G:
+        if freq:
+            ddg = 0
+            dg = 0
+            if "dG" in rel_ene[state].keys():
+                ddg = rel_ene[state]["ddG"] * unit
+                dg = rel_ene[state]["dG"] * unit
+
+            energies += "%8.2f %8.2f" % (ddg, dg)
+
+        lines.append(energies)
+
+    return lines
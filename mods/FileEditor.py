@@ -4,7 +4,10 @@ import os
 from UIs.FileEditorWindow import Ui_FileEditorWindow
 
 class FileEditor(QtWidgets.QMainWindow):
-    def __init__(self, parent, filepath, readonly=False):
+    def __init__(self, parent, filepath, readonly=False, key=None):
+        """
+        :param key: key of file in State if not filepath (fex. one frame of an xyz file, see State.frame_key)
+        """
         super().__init__(parent)
 
         self.react = parent
@@ -18,7 +21,7 @@ class FileEditor(QtWidgets.QMainWindow):
                                    file has been moved or deleted.")
             self.close
 
-        self.mol_obj = self.react.states[self.react.state_index].get_molecule_object(self.filepath)
+        self.mol_obj = self.react.states[self.react.state_index].get_molecule_object(key or self.filepath)
 
         self.setWindowTitle(self.filename)
 
@@ -1,6 +1,10 @@
-from mods.Atoms import GaussianAtom, Atom
+from mods.Atoms import Atom, ATOMNR_ATOM
 from mods.MoleculeFile import Geometries
 from mods.PropertiesFile import Properties
+import numpy as np
+import json
+import mmap
+import os
 import re
 
 
@@ -22,6 +26,96 @@ def strtobool(val):
         raise ValueError(f"invalid truth value {val!r}")
 
 
+# Where to get gaussian output value from line.split(int)
+# first key = Line to look for in output file
+# second key(s) are key names for assignment in g_outdata with tuple value giving index [0] and
+# type expected in line [1]
+G_READER = {
+    "Solvent": {"Solvent": (2, str), "Eps": (4, float)},
+    "SCF Done": {"SCF Done": (4, float)},
+    "Zero-point correction=": {"Zero-point correction": (2, float)},
+    "Thermal correction to Energy= ": {
+        "Thermal correction to Energy": (4, float)
+    },
+    "Thermal correction to Enthalpy": {
+        "Thermal correction to Enthalpy": (4, float)
+    },
+    "Thermal correction to Gibbs Free Energy": {
+        "Thermal correction to Gibbs Free Energy": (6, float)
+    },
+    "Maximum Force": {
+        "Maximum Force Value": (2, float),
+        "Maximum Force Threshold": (3, float),
+        "Maximum Force Converged?": (4, bool),
+    },
+    "RMS     Force": {
+        "RMS Force Value": (2, float),
+        "RMS Force Threshold": (3, float),
+        "RMS Force Converged?": (4, bool),
+    },
+    "Maximum Displacement": {
+        "Maximum Displacement Value": (2, float),
+        "Maximum Displacement Threshold": (3, float),
+        "Maximum Displacement Converged?": (4, bool),
+    },
+    "RMS     Displacement": {
+        "RMS Displacement Value": (2, float),
+        "RMS Displacement Threshold": (3, float),
+        "RMS Displacement Converged?": (4, bool),
+    },
+}
+
+# Values collected for every step of an optimization (scf_convergence) : line.split() index of value
+SCF_SERIES = {
+    "SCF Done": 4,
+    "Maximum Force": 2,
+    "RMS     Force": 2,
+    "Maximum Displacement": 2,
+    "RMS     Displacement": 2,
+}
+
+GAUSSIAN_VERSIONS = {"Gaussian(R) 16 program": 16, "Gaussian(R) 09 program": 9}
+
+# Gaussian 09 only gives coordinates in Standard orientation blocks, Gaussian 16 also in Input orientation blocks
+ORIENTATIONS = ("Input orientation:", "Standard orientation")
+ORIENTATIONS_VERSION = {9: ("Standard orientation",), 16: ORIENTATIONS}
+
+# Header of the normal mode table of a Frequencies block, and start of a Link1 job:
+MODE_TABLE = "Atom  AN      X      Y      Z"
+LINK1 = "Entering Link 1"
+
+# Values for every normal mode in the Frequencies blocks, line in output file : (name, line.split() index of first value)
+MODE_VALUES = {
+    "Frequencies --": ("frequencies", 2),
+    "Red. masses": ("reduced_masses", 3),
+    "Frc consts": ("force_constants", 3),
+    "IR Inten": ("ir_intensities", 3),
+}
+
+# Gaussian has finished (this link of) the job:
+TERMINATIONS = ("Normal termination", "Error termination")
+
+# Number of bytes before OutputReader.read_offset used to check that the file has only been appended to since last read
+TAIL_SIZE = 64
+
+# Attributes of Molecule/Geometries made when first used by OutputFile, if only the summary of the file has been read:
+GEOMETRY_ATTRIBUTES = ("_coordinates", "_trajectory", "_atom_names", "_atom_indices", "_atom_objects", "_iteration")
+
+# One regEx to find all terms of interest in a line (bytes) of the output file:
+OUTPUT_TERMS_REGEX = re.compile(
+    b"|".join(
+        re.escape(term.encode())
+        for term in list(G_READER)
+        + ["Multiplicity"]
+        + list(MODE_VALUES)
+        + list(ORIENTATIONS)
+        + list(GAUSSIAN_VERSIONS)
+        + [MODE_TABLE, LINK1]
+        + list(TERMINATIONS)
+    )
+)
+
+
 class InputFile(Properties):
     def __init__(self, filepath, new_file=False):
         # regEx pattern to reconize charge-multiplicity line. -?\d+ any digit any length, [13] = digit 1 or 3, \s*$ = any num of trailing whitespace
@@ -113,60 +207,594 @@ class InputFile(Properties):
         # return routecard[1:]
 
 
-class OutputFile(Properties):
+class OutputReader:
+    """
+    Reads a Gaussian output file in one single pass and collects everything REACT needs from it:
+    geometries (per optimisation step), g_outdata (given by G_READER), charge and multiplicity, the SCF/force
+    convergence series (SCF_SERIES) and frequencies with IR intensities.
+    All normal modes of the (last) frequency calculation are stored as one numpy array (n_modes, n_atoms, 3), with
+    frequencies, reduced masses, force constants and IR intensities (MODE_VALUES) as arrays in the same order.
+    OutputFile and FrequenciesOut are both made from the same reader, so the file is only read once.
+    Geometries are stored as one numpy array (n_geometries, n_atoms, 3), with the atomic number and center number of
+    the atoms shared by all geometries. If the atoms change within the file (fex. Link1 with another molecule), only
+    the geometries of the last molecule are kept.
+    read_summary stores the byte offset of every normal mode table, so that the normal modes can be read later by
+    seeking to the tables, without reading the whole file (see read_normal_modes).
+    Files of running jobs can be read again with update, which only reads the lines appended since last time.
+    With read_summary only the lines with terms of interest and the final geometry are read - everything but the
+    trajectory and normal modes.
+    """
+
     def __init__(self, filepath):
-        self._filepath = filepath
-        molecules = self.get_coordinates()
+        self.filepath = filepath
+
+        self.gaussian_version = False
+        # [geometry, atom, xyz] per geometry optimization step --> trajectory[-1] is the final geometry
+        self.trajectory = np.zeros((0, 0, 3))
+        # index in ORIENTATIONS of every geometry in the trajectory
+        self.orientations = np.zeros(0, dtype=np.int8)
+        self.atom_nrs = np.zeros(0, dtype=np.int16)
+        self.center_nrs = np.zeros(0, dtype=np.int32)
+        self.g_outdata = dict()
+        self.scf_convergence = {key: list() for key in SCF_SERIES}
+        # frequency : IR Intensity
+        self.freq_inten = dict()
+        # [mode, atom, xyz] displacements of all normal modes, and atomic numbers of the atoms in the normal modes
+        self.normal_modes = np.zeros((0, 0, 3))
+        self.mode_atom_nrs = np.zeros(0, dtype=np.int16)
+        # name : array with value for every normal mode, see MODE_VALUES
+        self.mode_values = {name: np.zeros(0) for name, _ in MODE_VALUES.values()}
+        # (byte offset, values of its Frequencies block) of every normal mode table of the last frequency calculation,
+        # found by read_summary (see read_normal_modes):
+        self.mode_tables = list()
+        self.charge = None
+        self.multiplicity = None
+        # Termination line after the last Link1 job
+        self.terminated = False
+
+        # Only lines with terms of interest have been read (see read_summary):
+        self.summary_only = False
+        self._found_geometry = False
+        # Offset of the last orientation block found by read_summary_lines, if not completely written yet:
+        self._pending_geometry = None
+
+        # Bytes read so far, and the last TAIL_SIZE of them:
+        self.read_offset = 0
+        self.tail = b""
+
+        # Parser state between lines:
+        self._orientations = ()
+        self._orientation = None
+        self._found_coordinates = False
+        self._get_coordinates = False
+        self._atom_lines = list()
+        self._geometries = list()
+        self._geometry_orientations = list()
+        self._block_offset = None
+        self._frequencies = None
+        # Values of the current Frequencies block until its normal mode table is read:
+        self._mode_block = None
+        self._found_modes = False
+        self._mode_lines = list()
+        self._mode_blocks = list()
+        self._new_frequency_job = True
+
+    def read(self):
+        """
+        Read the whole file (also if only the summary has been read)
+        :return: self
+        """
+        if self.summary_only:
+            self.__init__(self.filepath)
+        self.update()
+        return self
 
-        if not molecules:
-            self.faulty = True
-            molecules = None
-
-        super().__init__(filetype="Gaussian", filepath=filepath, geometries=molecules)
-
-        # Where to get gaussian output value from line.split(int)
-        # first key = Line to look for in output file
-        # second key(s) are key names for assignment in self.g_outdata with tuple value giving index [0] and
-        # type expected in line [1]
-        self.g_reader = {
-            "Solvent": {"Solvent": (2, str), "Eps": (4, float)},
-            "SCF Done": {"SCF Done": (4, float)},
-            "Zero-point correction=": {"Zero-point correction": (2, float)},
-            "Thermal correction to Energy= ": {
-                "Thermal correction to Energy": (4, float)
-            },
-            "Thermal correction to Enthalpy": {
-                "Thermal correction to Enthalpy": (4, float)
-            },
-            "Thermal correction to Gibbs Free Energy": {
-                "Thermal correction to Gibbs Free Energy": (6, float)
-            },
-            "Maximum Force": {
-                "Maximum Force Value": (2, float),
-                "Maximum Force Threshold": (3, float),
-                "Maximum Force Converged?": (4, bool),
-            },
-            "RMS     Force": {
-                "RMS Force Value": (2, float),
-                "RMS Force Threshold": (3, float),
-                "RMS Force Converged?": (4, bool),
-            },
-            "Maximum Displacement": {
-                "Maximum Displacement Value": (2, float),
-                "Maximum Displacement Threshold": (3, float),
-                "Maximum Displacement Converged?": (4, bool),
-            },
-            "RMS     Displacement": {
-                "RMS Displacement Value": (2, float),
-                "RMS Displacement Threshold": (3, float),
-                "RMS Displacement Converged?": (4, bool),
-            },
+    def update(self):
+        """
+        Read the lines appended to the file since last read (fex. by a running job). A last line without newline is
+        still being written, and is read next time. If the file has been changed before self.read_offset (truncated or
+        written again) everything is read again. A reader made by read_summary only reads the summary of the new lines.
+        :return: True if any lines were read
+        """
+        with open(self.filepath, "rb") as gout:
+            if self.read_offset and not self.is_appended(gout):
+                summary_only = self.summary_only
+                self.__init__(self.filepath)
+                self.summary_only = summary_only
+
+            if self.summary_only:
+                return self.read_summary_lines(gout)
+
+            offset = self.read_offset
+            gout.seek(offset)
+            for line in gout:
+                if not line.endswith(b"\n"):
+                    break
+                self.read_line(line, offset)
+                offset += len(line)
+
+            if offset == self.read_offset:
+                return False
+
+            gout.seek(max(offset - TAIL_SIZE, 0))
+            self.tail = gout.read(offset - gout.tell())
+            self.read_offset = offset
+
+        self.make_arrays()
+        return True
+
+    def is_appended(self, gout):
+        """
+        :param gout: output file opened in binary mode
+        :return: True if the file still has the bytes read until self.read_offset (checked with self.tail)
+        """
+        gout.seek(self.read_offset - len(self.tail))
+        return gout.read(len(self.tail)) == self.tail
+
+    def read_summary(self):
+        """
+        Read only the lines with terms of interest (everything but geometries and normal modes), found with one regEx
+        search of the whole file, so lines between them are never looked at, and the last orientation block (final
+        geometry). Lines appended later are read the same way by update, the rest is read with read.
+        :return: self
+        """
+        self.summary_only = True
+        # Normal mode tables are not read, only their offsets are stored (see read_term):
+        self._found_modes = False
+        self._mode_block = None
+        self.mode_tables = list()
+
+        with open(self.filepath, "rb") as gout:
+            self.read_summary_lines(gout)
+
+        return self
+
+    def read_summary_lines(self, gout):
+        """
+        Summary (see read_summary) of the lines after self.read_offset, the final geometry is replaced if any
+        orientation block is found in them
+        :param gout: output file opened in binary mode
+        :return: True if any lines were read
+        """
+        try:
+            mm = mmap.mmap(gout.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return False
+
+        with mm:
+            # A last line without newline is still being written:
+            offset = mm.rfind(b"\n") + 1
+            if offset <= self.read_offset:
+                return False
+
+            line_end = 0
+            for match in OUTPUT_TERMS_REGEX.finditer(mm, self.read_offset, offset):
+                # Only the first term of a line is used, as in read_line:
+                if match.start() < line_end:
+                    continue
+
+                line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                line_end = mm.find(b"\n", match.end()) + 1
+
+                self.read_term(match.group().decode(), mm[line_start:line_end], line_start)
+                if self._found_coordinates:
+                    self._found_geometry = True
+                    self._pending_geometry = self._block_offset
+                    self._found_coordinates = False
+
+            self.tail = mm[max(offset - TAIL_SIZE, 0):offset]
+            self.read_offset = offset
+
+        # The block is read again next time if it is still being written:
+        if self._pending_geometry is not None and self.read_geometry_at(self._pending_geometry):
+            self._pending_geometry = None
+            # Final geometry only:
+            self.trajectory = self.trajectory[-1:]
+            self.orientations = self.orientations[-1:]
+
+        return True
+
+    def read_geometry_at(self, offset):
+        """
+        Read one orientation block and add it to self.trajectory
+        :param offset: byte offset of orientation block (fex. self._block_offset)
+        :return: True if the whole block has been read (not if it is still being written)
+        """
+        with open(self.filepath, "rb") as gout:
+            gout.seek(offset)
+            for line in gout:
+                if not line.endswith(b"\n"):
+                    break
+                self.read_line(line, offset)
+                offset += len(line)
+                if not self._found_coordinates:
+                    break
+
+        added = bool(self._geometries)
+        self._found_coordinates = False
+        self._get_coordinates = False
+        self._atom_lines = list()
+        self.make_arrays()
+        return added
+
+    def read_line(self, line, offset=None):
+        """
+        Process one line of the output file. Atom lines of orientation blocks are handled first, since that is where
+        most lines of an optimization are - all other lines are matched against every term of interest with one regEx
+        search, and only decoded and split when they match.
+        :param line: bytes
+        :param offset: byte offset of line in the file
+        """
+        if self._found_coordinates:
+            line_split = line.split()
+            if line_split and line_split[0].isdigit():
+                self._get_coordinates = True
+                self._atom_lines.append(line_split)
+                return
+            elif self._get_coordinates:
+                self._found_coordinates = False
+                self._get_coordinates = False
+                self.add_geometry()
+                return
+
+        if self._found_modes:
+            line_split = line.split()
+            if len(line_split) > 4 and line_split[0].isdigit():
+                self._mode_lines.append(line_split)
+                return
+            self._found_modes = False
+            self.add_normal_modes()
+
+        match = OUTPUT_TERMS_REGEX.search(line)
+        if match:
+            self.read_term(match.group().decode(), line, offset)
+
+    def read_term(self, term, line, offset=None):
+        """
+        Process a line with a term of interest
+        :param term: first term of OUTPUT_TERMS_REGEX found in line
+        :param line: bytes
+        :param offset: byte offset of line in the file
+        """
+        line = line.decode(errors="replace")
+
+        if term == LINK1:
+            self.terminated = False
+            self._new_frequency_job = True
+        elif term == MODE_TABLE and self._mode_block:
+            if self.summary_only:
+                # Only the offset of the table, the last frequency calculation is kept (see add_normal_modes):
+                if self._new_frequency_job:
+                    self._new_frequency_job = False
+                    self.mode_tables = list()
+                self.mode_tables.append((offset, self._mode_block))
+                self._mode_block = None
+            else:
+                self._found_modes = True
+                self._mode_lines = list()
+        elif term in ORIENTATIONS:
+            if term in self._orientations:
+                self._found_coordinates = True
+                self._orientation = ORIENTATIONS.index(term)
+                self._block_offset = offset
+                self._atom_lines = list()
+        elif term in G_READER:
+            line_split = line.split()
+            for out_name, (split_int, type_) in G_READER[term].items():
+                if type_ is bool:
+                    self.g_outdata[out_name] = bool(strtobool(line_split[split_int]))
+                else:
+                    self.g_outdata[out_name] = type_(line_split[split_int])
+            if term in SCF_SERIES:
+                self.scf_convergence[term].append(float(line_split[SCF_SERIES[term]]))
+        elif term == "Multiplicity":
+            line_split = line.split()
+            self.charge = line_split[2]
+            self.multiplicity = line_split[5]
+        elif term in MODE_VALUES:
+            line_split = line.split()
+            name, split_int = MODE_VALUES[term]
+
+            if term == "Frequencies --":
+                self._frequencies = [float(i) for i in line_split[2:5]]
+                # High precision modes (Frequencies ---) are not in the normal mode tables:
+                self._mode_block = dict() if line_split[1] == "--" else None
+            elif term == "IR Inten" and self._frequencies:
+                intensities = [float(i) for i in line_split[3:6]]
+                self.freq_inten.update(zip(self._frequencies, intensities))
+                self._frequencies = None
+
+            if self._mode_block is not None:
+                self._mode_block[name] = [float(i) for i in line_split[split_int:]]
+        elif term in TERMINATIONS:
+            self.terminated = True
+        elif term in GAUSSIAN_VERSIONS and not self.gaussian_version:
+            self.gaussian_version = GAUSSIAN_VERSIONS[term]
+            self._orientations = ORIENTATIONS_VERSION[self.gaussian_version]
+
+    def add_geometry(self):
+        """
+        Store coordinates of the orientation block just read. Atom lines are: center number, atomic number,
+        atomic type, x, y, z
+        """
+        center_nrs = np.array([atom_line[0] for atom_line in self._atom_lines], dtype=np.int32)
+        atom_nrs = np.array([atom_line[1] for atom_line in self._atom_lines], dtype=np.int16)
+
+        # New molecule, previous geometries can not be in the same trajectory:
+        if not (np.array_equal(atom_nrs, self.atom_nrs) and np.array_equal(center_nrs, self.center_nrs)):
+            self._geometries = list()
+            self._geometry_orientations = list()
+            self.trajectory = np.zeros((0, len(atom_nrs), 3))
+            self.orientations = np.zeros(0, dtype=np.int8)
+            self.atom_nrs = atom_nrs
+            self.center_nrs = center_nrs
+
+        self._geometries.append(np.array([atom_line[3:6] for atom_line in self._atom_lines], dtype=np.float64))
+        self._geometry_orientations.append(self._orientation)
+        self._atom_lines = list()
+
+    def add_normal_modes(self):
+        """
+        Store the normal mode table just read, with the values of its Frequencies block. Table lines are: atom,
+        atomic number, x, y, z for every normal mode of the block
+        """
+        n_modes = len(self._mode_block["frequencies"])
+        atom_nrs = np.array([mode_line[1] for mode_line in self._mode_lines], dtype=np.int16)
+        displacements = np.array([mode_line[2:2 + 3 * n_modes] for mode_line in self._mode_lines], dtype=np.float64)
+
+        # Only the last frequency calculation (fex. Link1 jobs) is kept:
+        if self._new_frequency_job:
+            self._new_frequency_job = False
+            self._mode_blocks = list()
+            self.normal_modes = np.zeros((0, len(atom_nrs), 3))
+            self.mode_values = {name: np.zeros(0) for name, _ in MODE_VALUES.values()}
+
+        self.mode_atom_nrs = atom_nrs
+        # [atom, mode, xyz] --> [mode, atom, xyz]
+        self._mode_blocks.append((self._mode_block, displacements.reshape(len(atom_nrs), n_modes, 3).swapaxes(0, 1)))
+        self._mode_block = None
+        self._mode_lines = list()
+
+    def make_arrays(self):
+        """
+        Add geometries and normal modes read since last call to self.trajectory and self.normal_modes
+        """
+        if self._geometries:
+            self.trajectory = np.concatenate((self.trajectory, np.array(self._geometries)))
+            self.orientations = np.concatenate(
+                (self.orientations, np.array(self._geometry_orientations, dtype=np.int8))
+            )
+            self._geometries = list()
+            self._geometry_orientations = list()
+
+        if self._mode_blocks:
+            self.normal_modes = np.concatenate([self.normal_modes] + [modes for _, modes in self._mode_blocks])
+            for name, _ in MODE_VALUES.values():
+                block_values = [mode_block.get(name, [np.nan] * len(modes)) for mode_block, modes in self._mode_blocks]
+                self.mode_values[name] = np.concatenate([self.mode_values[name]] + block_values)
+            self._mode_blocks = list()
+
+    def read_normal_modes(self):
+        """
+        Read the normal mode tables found by read_summary (self.mode_tables) with mmap, seeking from table to table
+        instead of reading the whole file
+        :return: True if all tables were read, False if there are none or the file has changed since read_summary
+        """
+        if not self.mode_tables:
+            return False
+
+        self._new_frequency_job = True
+        with open(self.filepath, "rb") as gout:
+            with mmap.mmap(gout.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset, mode_block in self.mode_tables:
+                    mm.seek(offset)
+                    if MODE_TABLE.encode() not in mm.readline():
+                        self._mode_blocks = list()
+                        return False
+
+                    # Table lines are: atom, atomic number, x, y, z for every normal mode of the block
+                    self._mode_block = mode_block
+                    self._mode_lines = list()
+                    for line in iter(mm.readline, b""):
+                        line_split = line.split()
+                        if len(line_split) <= 4 or not line_split[0].isdigit():
+                            break
+                        self._mode_lines.append(line_split)
+                    self.add_normal_modes()
+
+        self.make_arrays()
+        return True
+
+    def mode_index(self, frequency):
+        """
+        :param frequency: frequency (float or str) as in self.freq_inten
+        :return: index of normal mode with frequency in self.normal_modes, or None if not found
+        """
+        indexes = np.flatnonzero(self.mode_values["frequencies"] == float(frequency))
+        if not len(indexes):
+            return None
+        return int(indexes[0])
+
+    def get_normal_mode(self, index):
+        """
+        :param index: index of normal mode (see mode_index)
+        :return: numpy array (n_atoms, 3) with displacements of normal mode
+        """
+        return self.normal_modes[index]
+
+    def get_trajectory(self, one_orientation=False):
+        """
+        :param one_orientation: only geometries in the same orientation as the final geometry (Gaussian 16 prints both
+        Input orientation and Standard orientation for every step)
+        :return: numpy array (n_geometries, n_atoms, 3)
+        """
+        if one_orientation and len(self.orientations):
+            return self.trajectory[self.orientations == self.orientations[-1]]
+        return self.trajectory
+
+    @property
+    def atom_names(self):
+        return [ATOMNR_ATOM[atom_nr] for atom_nr in self.atom_nrs.tolist()]
+
+    @property
+    def has_geometry(self):
+        """
+        :return: True if the file has any geometry (an orientation block, if only the summary has been read)
+        """
+        if self.summary_only:
+            return self._found_geometry
+        return len(self.trajectory) > 0
+
+    def get_arrays(self, summary_only=False):
+        """
+        Everything read from the output file as numpy arrays (and one json string for the rest), fex. to store with
+        numpy.savez.
+        :param summary_only: only what read_summary reads (final geometry and normal mode table offsets)
+        :return: dict {name: numpy array}
+        """
+        summary_only = summary_only or self.summary_only
+        arrays = {
+            "trajectory": self.trajectory,
+            "orientations": self.orientations,
+            "atom_nrs": self.atom_nrs,
+            "center_nrs": self.center_nrs,
+            "frequencies": np.array(list(self.freq_inten.keys()), dtype=np.float64),
+            "ir_intensities": np.array(list(self.freq_inten.values()), dtype=np.float64),
+            "info": np.array(
+                json.dumps(
+                    {
+                        "gaussian_version": self.gaussian_version,
+                        "g_outdata": self.g_outdata,
+                        "charge": self.charge,
+                        "multiplicity": self.multiplicity,
+                        "terminated": self.terminated,
+                        "read_offset": self.read_offset,
+                        "summary_only": summary_only,
+                        "has_geometry": self.has_geometry,
+                        "mode_tables": self.mode_tables,
+                        "pending_geometry": self._pending_geometry,
+                    }
+                )
+            ),
+            "tail": np.frombuffer(self.tail, dtype=np.uint8),
+            "normal_modes": self.normal_modes,
+            "mode_atom_nrs": self.mode_atom_nrs,
         }
+        for i, key in enumerate(SCF_SERIES):
+            arrays["scf_%d" % i] = np.array(self.scf_convergence[key], dtype=np.float64)
+        for name, values in self.mode_values.items():
+            arrays["mode_%s" % name] = values
+
+        # Never any normal modes in a summary (fex. in project snapshots), they are read with the whole file:
+        if summary_only:
+            arrays["trajectory"] = self.trajectory[-1:]
+            arrays["orientations"] = self.orientations[-1:]
+            arrays["normal_modes"] = np.zeros((0, 0, 3))
+            arrays["mode_atom_nrs"] = np.zeros(0, dtype=np.int16)
+            for name in self.mode_values:
+                arrays["mode_%s" % name] = np.zeros(0)
+
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, filepath, arrays, summary_only=False):
+        """
+        Make OutputReader from arrays made by get_arrays, without reading the output file.
+        :param filepath: path to output file the arrays were made from
+        :param arrays: dict (or numpy NpzFile) {name: numpy array}
+        :param summary_only: skip geometries and normal modes (not even loaded from a NpzFile), as read_summary
+        :return: OutputReader
+        """
+        reader = cls(filepath)
+
+        info = json.loads(str(arrays["info"]))
+        reader.gaussian_version = info["gaussian_version"]
+        reader.g_outdata = info["g_outdata"]
+        reader.charge = info["charge"]
+        reader.multiplicity = info["multiplicity"]
+        reader.terminated = info["terminated"]
+        reader.read_offset = info["read_offset"]
+        reader.tail = arrays["tail"].tobytes()
+        if reader.gaussian_version:
+            reader._orientations = ORIENTATIONS_VERSION[reader.gaussian_version]
+
+        reader.freq_inten = dict(zip(arrays["frequencies"].tolist(), arrays["ir_intensities"].tolist()))
+        for i, key in enumerate(SCF_SERIES):
+            reader.scf_convergence[key] = arrays["scf_%d" % i].tolist()
+
+        reader.atom_nrs = arrays["atom_nrs"]
+        reader.center_nrs = arrays["center_nrs"]
+
+        if summary_only or info["summary_only"]:
+            reader.summary_only = True
+            reader._found_geometry = info["has_geometry"]
+            # Final geometry only (copied, so that the whole trajectory is not kept in memory):
+            reader.trajectory = arrays["trajectory"][-1:].copy()
+            reader.orientations = arrays["orientations"][-1:].copy()
+            # Not in project snapshots from older versions of REACT:
+            reader.mode_tables = [(offset, mode_block) for offset, mode_block in info.get("mode_tables", [])]
+            reader._pending_geometry = info.get("pending_geometry")
+            # New tables read by update belong to the same frequency calculation, until the next Link1:
+            reader._new_frequency_job = not reader.mode_tables
+            return reader
+
+        reader.trajectory = arrays["trajectory"]
+        reader.orientations = arrays["orientations"]
+        reader.normal_modes = arrays["normal_modes"]
+        reader.mode_atom_nrs = arrays["mode_atom_nrs"]
+        for name in reader.mode_values:
+            reader.mode_values[name] = arrays["mode_%s" % name]
+
+        return reader
+
+
+class OutputFile(Properties):
+    def __init__(self, filepath, output_reader=None, one_orientation=False, read_output=None):
+        """
+        :param output_reader: OutputReader already read for filepath (fex. from ParseCache). If only the summary has
+        been read (OutputReader.read_summary), geometries and normal modes are read when first used (see load_output)
+        :param one_orientation: keep geometries of one orientation only, see OutputReader.get_trajectory
+        :param read_output: function reading the whole output file, filepath --> OutputReader (fex. from ParseCache)
+        """
+        self._filepath = filepath
+        self._one_orientation = one_orientation
+        self._read_output = read_output
+
+        # Everything is read from the output file in one go. A reader can be passed on to avoid reading twice.
+        if not output_reader:
+            output_reader = self.read_output(filepath)
+        self.output_reader = output_reader
+
+        if output_reader.summary_only:
+            # Final geometry only (if read), the rest is made by self.load_output when first used:
+            molecules = self.get_coordinates(one_orientation) if len(output_reader.trajectory) else None
+            self.faulty = not output_reader.has_geometry
+        else:
+            molecules = self.get_coordinates(one_orientation)
+            if not len(molecules):
+                self.faulty = True
+                molecules = None
+
+        super().__init__(
+            filetype="Gaussian",
+            filepath=filepath,
+            geometries=molecules,
+            atom_names=self.output_reader.atom_names,
+            atom_indices=self.output_reader.center_nrs,
+        )
+
+        # The trajectory is read from the whole output file when first used (see __getattr__):
+        if output_reader.summary_only and molecules is not None:
+            del self._trajectory
+
+        # Where to get gaussian output value from line.split(int), see G_READER
+        self.g_reader = G_READER
 
         # This will store data from output file given by self.g_reader
         self.g_outdata = dict()
 
-        # Read output on init to get key job details
+        # Get key job details from the output reader
         self.read_gaussianfile()
 
         # Setters in Properties:
@@ -181,34 +809,68 @@ class OutputFile(Properties):
             self.energy = self.get_energy()
             self.scf_convergence = self.get_scf_convergence()
 
-    def read_gaussianfile(self):
+    def __getattr__(self, name):
+        """
+        Only called for attributes not found - geometries not made yet are made from the whole output file
+        """
+        output_reader = self.__dict__.get("output_reader")
+        if name in GEOMETRY_ATTRIBUTES and output_reader and output_reader.summary_only and not self.faulty:
+            self.load_output()
+            return getattr(self, name)
+        raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+
+    def read_output(self, filepath):
+        """
+        :return: OutputReader with the whole output file read
         """
-        Reads through Gaussian output file and assigns values to self.g_outdata using self.g_reader, and assigns values to self.job_details
+        if self._read_output:
+            return self._read_output(filepath)
+        return OutputReader(filepath).read()
+
+    @property
+    def output_available(self):
         """
-        DFT_out = self._filepath
+        :return: False if only the summary has been read and the output file is not found (fex. opened from a project
+        snapshot, see ProjectSnapshot), then only the final geometry is available and no normal modes
+        """
+        return not self.output_reader.summary_only or os.path.exists(self.filepath)
 
-        print(f"in read_gaussian, this is path={self._filepath}")
+    def load_output(self):
+        """
+        Read the whole output file and make geometries, if only the summary of the file has been read
+        """
+        if not self.output_reader.summary_only:
+            return
 
-        # found_all_jobdetails = False
+        # Without the output file, final geometry only (see self.output_available):
+        if self.output_available:
+            self.output_reader = self.read_output(self.filepath)
 
-        with open(DFT_out) as f:
-            for line in f:
-                if "Multiplicity" in line:
-                    tmp = line.split()
-                    self.charge = tmp[2]
-                    self._multiplicity = tmp[5]
+        molecules = self.get_coordinates(self._one_orientation)
+        if not len(molecules):
+            self.faulty = True
+            return
+
+        # Resets charge and multiplicity (see read_gaussianfile):
+        Geometries.__init__(
+            self,
+            molecules=molecules,
+            filepath=self.filepath,
+            atom_names=self.output_reader.atom_names,
+            atom_indices=self.output_reader.center_nrs,
+        )
+        self.read_gaussianfile()
 
-                # Check if line contains any self.g_reader keys:
-                if any(g_key in line for g_key in self.g_reader.keys()):
-                    g_key = [term for term in self.g_reader.keys() if term in line][0]
-                    for out_name in self.g_reader[g_key].keys():
-                        split_int, type_ = self.g_reader[g_key][out_name][0:2]
-                        if type_ is bool:
-                            line_value = bool(strtobool(line.split()[split_int]))
-                        else:
-                            line_value = type_(line.split()[split_int])
+    def read_gaussianfile(self):
+        """
+        Assigns values read from the Gaussian output file to self.g_outdata (using self.g_reader), self.charge and
+        self.multiplicity
+        """
+        self.g_outdata.update(self.output_reader.g_outdata)
 
-                        self.g_outdata[out_name] = line_value
+        if self.output_reader.multiplicity:
+            self.charge = self.output_reader.charge
+            self._multiplicity = self.output_reader.multiplicity
 
     def is_converged(self):
         """
@@ -238,86 +900,25 @@ class OutputFile(Properties):
 
     def get_scf_convergence(self):
         """
-        Reads output file and returns all SCF Done energies
+        All SCF Done energies and convergence values from the output file
         :return: energies, MaximumForce, RMS Force, Maximum Displacement, RMS Displacement
         """
-        scf_data = {
-            "SCF Done": list(),
-            "Maximum Force": list(),
-            "RMS     Force": list(),
-            "Maximum Displacement": list(),
-            "RMS     Displacement": list(),
-        }
-
-        with open(self.filepath) as out:
-            for line in out:
-                if any(g_key in line for g_key in scf_data.keys()):
-                    g_key = [term for term in scf_data.keys() if term in line][0]
-                    split_int = 2
-                    if g_key == "SCF Done":
-                        split_int = 4
-                    scf_data[g_key].append(float(line.split()[split_int]))
+        return self.output_reader.scf_convergence
 
-        return scf_data
-
-    def get_coordinates(self):
+    def get_coordinates(self, one_orientation=False):
         """
-        Extract xyz from a gaussian output file and creates GaussianAtom objects
+        Coordinates of all geometries in the output file
 
-        :return: iter_atoms = [ [iteration 1], [iteration 2], .... ] where [iteration 1] = [GaussianAtom1, ....]
+        :return: numpy array (n_geometries, n_atoms, 3)
         """
-        # list with GaussianAtom objects per geometry optimization --> iter_atoms[-1] is the final atom coordinates
-        iter_atoms = list()
+        return self.output_reader.get_trajectory(one_orientation)
 
-        atoms = list()
-        with open(self.filepath, "r") as gout:
-            gaussian_v = False
-            found_coordinates = False
-            get_coordinates = False
-
-            for line in gout:
-                if not gaussian_v:
-                    if "Gaussian(R) 16 program" in line:
-                        gaussian_v = 16
-                        continue
-                    elif "Gaussian(R) 09 program" in line:
-                        gaussian_v = 9
-                        continue
-                    else:
-                        continue
-                elif gaussian_v == 9:
-                    if found_coordinates and line.split()[0].isdigit():
-                        get_coordinates = True
-
-                    if get_coordinates:
-                        if not line.split()[0].isdigit():
-                            found_coordinates = False
-                            get_coordinates = False
-
-                            iter_atoms.append(atoms)
-                        else:
-                            atoms.append(GaussianAtom(line))
-
-                    if "Standard orientation" in line:
-                        found_coordinates = True
-                        atoms = list()
-                elif gaussian_v == 16:
-                    if found_coordinates and line.split()[0].isdigit():
-                        get_coordinates = True
-
-                    if get_coordinates:
-                        if not line.split()[0].isdigit():
-                            found_coordinates = False
-                            get_coordinates = False
-
-                            iter_atoms.append(atoms)
-                        else:
-                            atoms.append(GaussianAtom(line))
-
-                    if "Input orientation:" in line or "Standard orientation" in line:
-                        found_coordinates = True
-                        atoms = list()
-        return iter_atoms
+    @property
+    def running(self):
+        """
+        :return: True if the job has not terminated (yet) - the output file is still being written
+        """
+        return not self.output_reader.terminated
 
     def has_solvent(self):
         """
@@ -336,10 +937,12 @@ class OutputFile(Properties):
 
 
 class FrequenciesOut(OutputFile):
-    def __init__(self, filepath):
-        super().__init__(filepath=filepath)
+    def __init__(self, filepath, output_reader=None, one_orientation=False, read_output=None):
+        super().__init__(
+            filepath=filepath, output_reader=output_reader, one_orientation=one_orientation, read_output=read_output
+        )
 
-        # Read output file from Gaussian to get Properties self.freq_inte and self.freq_displacement dicts
+        # Get frequencies from the output reader to Properties self.freq_inten dict
         self.read_frequencies()
 
         # Properties setters:
@@ -350,23 +953,11 @@ class FrequenciesOut(OutputFile):
 
     def read_frequencies(self):
         """
-        Read Gaussian outpufile and store frequencies to self.freq[freq] = IR intensity (KM/Mole)
+        Store frequencies from the Gaussian output file to self.freq[freq] = IR intensity (KM/Mole)
         self.freq_inten is dict in parent class Properties
         :return:
         """
-        found_freq = False
-
-        with open(self.filepath, "r") as frq:
-            for line in frq:
-                if "Frequencies" in line:
-                    found_freq = True
-                    freq = [float(i) for i in line.split()[2:5]]
-
-                if found_freq:
-                    if "IR Inten" in line:
-                        intensities = [float(i) for i in line.split()[3:6]]
-                        self.freq_inten.update(zip(freq, intensities))
-                        found_freq = False
+        self.freq_inten.update(self.output_reader.freq_inten)
 
     def get_displacement(self, frequency):
         """
@@ -378,38 +969,31 @@ class FrequenciesOut(OutputFile):
         if frequency in self.freq_displacement.keys():
             return self.freq_displacement[frequency]
 
-        # Gaussian file specific extraction of frequency:
-
-        found_frequency = False
-        found_displacement = False
-        g_atoms = list()
-
-        index_range = {0: (2, 5), 1: (5, 8), 2: (8, 11)}
-
-        with open(self.filepath, "r") as frq:
-            for line in frq:
-                if "Frequencies" in line:
-                    current_frqs = line.split()[2:5]
-                    if frequency in current_frqs:
-                        frq_index = current_frqs.index(frequency)
-                        found_frequency = True
+        # Normal modes are read when first used:
+        if not len(self.output_reader.normal_modes):
+            self.read_normal_modes()
+        mode_index = self.output_reader.mode_index(frequency)
+        if mode_index is None:
+            return None
 
-                if found_displacement:
-                    if len(line.split()) > 5:
-                        coord_start, coord_end = index_range[frq_index][:]
-                        g_line = "%s 0 %s" % (
-                            " ".join((line.split()[0:2])),
-                            " ".join(line.split()[coord_start:coord_end]),
-                        )
-                        g_atoms.append(GaussianAtom(g_line))
-                    else:
-                        self.freq_displacement[frequency] = Geometries(
-                            molecules=[g_atoms]
-                        )
-                        return self.freq_displacement[frequency]
+        self.freq_displacement[frequency] = Geometries(
+            molecules=self.output_reader.get_normal_mode(mode_index)[np.newaxis],
+            atom_names=[ATOMNR_ATOM[atom_nr] for atom_nr in self.output_reader.mode_atom_nrs.tolist()],
+        )
+        return self.freq_displacement[frequency]
 
-                if found_frequency and "Atom  AN      X      Y      Z" in line:
-                    found_displacement = True
+    def read_normal_modes(self):
+        """
+        Read normal modes, only the normal mode tables if read_summary has found them (see
+        OutputReader.read_normal_modes), else the whole output file
+        """
+        if self.output_reader.summary_only and os.path.exists(self.filepath):
+            try:
+                if self.output_reader.read_normal_modes():
+                    return
+            except (OSError, ValueError):
+                pass
+        self.load_output()
 
     @property
     def get_img_frq(self):
@@ -0,0 +1,82 @@
+import os
+import struct
+
+# Icons of all windows (":/24x24/...", ":/16x16/..." and ":/logos/..."), compiled from UIs/icons.qrc into
+# UIs/icons_rc.py by pyrcc5. The same resources are kept as a binary .rcc file next to it, registered without
+# importing (and compiling) the large python module:
+ICONS_RC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "UIs", "icons_rc.py")
+ICONS_RCC_PATH = ICONS_RC_PATH[:-len("_rc.py")] + ".rcc"
+
+# Header of binary .rcc files: magic, format version and offsets of tree, data and names (big endian):
+RCC_MAGIC = b"qres"
+RCC_HEADER = ">4sIIII"
+
+_registered = False
+
+
+def make_rcc(version, tree, names, data):
+    """
+    Binary .rcc file of resources compiled to python by pyrcc5 (the arguments of QtCore.qRegisterResourceData).
+    Offsets in tree and names are relative to the start of their block, so the blocks are used as they are.
+    :param version: format version of tree (rcc_version of the resource module)
+    :return: bytes
+    """
+    header_size = struct.calcsize(RCC_HEADER)
+    data_offset = header_size
+    names_offset = data_offset + len(data)
+    tree_offset = names_offset + len(names)
+    header = struct.pack(RCC_HEADER, RCC_MAGIC, version, tree_offset, data_offset, names_offset)
+    return header + data + names + tree
+
+
+def write_icons_rcc(icons_rc, rcc_path=ICONS_RCC_PATH):
+    """
+    Write icons of the resource module (UIs.icons_rc) as binary .rcc file, for the next start (see register_icons).
+    Nothing is written if the directory is read only.
+    :param icons_rc: imported resource module
+    :return: True if written
+    """
+    content = make_rcc(
+        icons_rc.rcc_version, icons_rc.qt_resource_struct, icons_rc.qt_resource_name, icons_rc.qt_resource_data
+    )
+    temp_path = f"{rcc_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, rcc_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    return True
+
+
+def icons_rcc_is_current(rcc_path=ICONS_RCC_PATH, rc_path=ICONS_RC_PATH):
+    """
+    :return: True if the .rcc file exists and is not older than the resource module
+    """
+    try:
+        return os.path.getmtime(rcc_path) >= os.path.getmtime(rc_path)
+    except OSError:
+        return False
+
+
+def register_icons():
+    """
+    Register the icons once, before the first window using them is set up. The binary .rcc file is registered when
+    it is up to date, else UIs.icons_rc is imported (registers on import) and the .rcc file is written from it.
+    """
+    global _registered
+    if _registered:
+        return
+
+    # Qt is only needed once icons are registered:
+    from PyQt5.QtCore import QResource
+
+    if icons_rcc_is_current() and QResource.registerResource(ICONS_RCC_PATH):
+        _registered = True
+        return
+
+    import UIs.icons_rc as icons_rc
+    write_icons_rcc(icons_rc)
+    _registered = True
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import itertools
+import os
+
+# Replaced by the filename (without extension) of every input file in link0 lines and title, fex. "%chk={filename}.chk":
+FILENAME = "{filename}"
+
+# Coordinates of an xyz line of input files (after the element), sign or space before every coordinate:
+COORDINATES_FORMAT = "           % .8f        % .8f        % .8f"
+
+
+def input_lines_format(elements):
+    """
+    :return: one format (str) for all xyz lines of a geometry of elements (see format_input_lines)
+    """
+    return "\n".join(element.replace("%", "%%") + COORDINATES_FORMAT for element in elements)
+
+
+def format_input_lines(elements, coordinates, geometry_format=None):
+    """
+    :param coordinates: numpy array (n_atoms, 3)
+    :param geometry_format: input_lines_format(elements), if already made
+    :return: list of xyz lines for input files (see COORDINATES_FORMAT), formatted all at once
+    """
+    if geometry_format is None:
+        geometry_format = input_lines_format(elements)
+    return (geometry_format % tuple(coordinates.ravel().tolist())).split("\n")
+
+
+class InputTemplate:
+    """
+    Gaussian input file for one job: link0 lines, route, title, charge and multiplicity, restraints (ModRedundant
+    lines) and additional input after the restraints (fex. "Eps=4.0"). Everything but the filename and geometry is put
+    together once, so any number of input files can be rendered from it without Qt (fex. all points of a scan, or all
+    conformers of an ensemble, see self.write_files). Made from the widgets of CalcSetupWindow by
+    CalcSetupWindow.input_template, or directly in scripts:
+
+        template = InputTemplate("#p Opt B3LYP/6-31G(d)", 0, 1, link0=["%chk={filename}.chk"])
+        template.write_files(directory, filenames, elements, geometries)
+    """
+
+    def __init__(self, route, charge=0, multiplicity=1, link0=(), title=FILENAME, restraints=(), additional=""):
+        """
+        :param link0: list of link0 lines (fex. "%mem=4GB"), FILENAME is replaced by the filename
+        :param title: title line, FILENAME is replaced by the filename
+        :param restraints: list of ModRedundant lines in all files (fex. "B 1 2 F")
+        """
+        self.route = route
+        self.charge = charge
+        self.multiplicity = multiplicity
+        self.link0 = list(link0)
+        self.title = title
+        self.restraints = list(restraints)
+        self.additional = additional
+
+        link0_str = "\n".join(self.link0)
+        self._header = f"{link0_str}\n{route}\n\n{title}\n\n{charge} {multiplicity}\n"
+        self._header_has_filename = FILENAME in self._header
+
+    def header(self, filename):
+        """
+        :return: everything before the xyz lines for filename
+        """
+        if self._header_has_filename:
+            return self._header.replace(FILENAME, filename)
+        return self._header
+
+    def footer(self, restraints=None):
+        """
+        :param restraints: list of ModRedundant lines for this file only (fex. from GridScan.restraints)
+        :return: everything after the xyz lines
+        """
+        restraints_str = "\n".join(self.restraints + list(restraints or ()))
+        return f"\n\n{restraints_str}\n\n{self.additional}\n\n"
+
+    def render(self, filename, xyz, restraints=None):
+        """
+        :param xyz: list of xyz lines (empty lines are skipped)
+        :param restraints: list of ModRedundant lines for this file only
+        :return: content of input file (str)
+        """
+        return self.header(filename) + "\n".join(line for line in xyz if line) + self.footer(restraints)
+
+    def render_geometry(self, filename, elements, coordinates, restraints=None, geometry_format=None):
+        """
+        :param coordinates: numpy array (n_atoms, 3)
+        :param geometry_format: input_lines_format(elements), if already made
+        :return: content of input file (str)
+        """
+        if geometry_format is None:
+            geometry_format = input_lines_format(elements)
+        xyz = geometry_format % tuple(coordinates.ravel().tolist())
+        return self.header(filename) + xyz + self.footer(restraints)
+
+    def write_files(self, directory, filenames, elements, geometries, restraints=None, extension=".com"):
+        """
+        Write one input file for every geometry, one at a time (geometries can be a generator, fex. reading the frames
+        of XYZFrames). The format of the xyz lines is made once for all files.
+        :param filenames: filename (without extension) of every geometry
+        :param elements: elements of the atoms (same in all geometries)
+        :param geometries: numpy arrays (n_atoms, 3)
+        :param restraints: list of ModRedundant lines for every file, None if only self.restraints
+        :return: list of filepaths written
+        """
+        geometry_format = input_lines_format(elements)
+        if restraints is None:
+            restraints = itertools.repeat(None)
+
+        filepaths = list()
+        for filename, coordinates, file_restraints in zip(filenames, geometries, restraints):
+            filepath = os.path.join(directory, filename + extension)
+            with open(filepath, "w") as f:
+                f.write(self.render_geometry(filename, elements, coordinates, file_restraints, geometry_format))
+                f.write("\n")
+            filepaths.append(filepath)
+
+        return filepaths
@@ -0,0 +1,1701 @@
+import sys
+import os
+import json
+import time
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5 import QtWidgets, QtGui
+from PyQt5.QtCore import QThreadPool, QTimer, pyqtSlot, Qt
+from mods.SplashScreen import SplashScreen
+from mods.IconResources import register_icons
+import mods.common_functions as cf
+from UIs.MainWindow import Ui_MainWindow
+from mods.ReactWidgets import DragDropListWidget
+from mods.State import State, FRAME_SEPARATOR, frame_key, split_frame
+from mods.Settings import Settings
+from mods.ThreadWorkers import Worker
+from threading import Lock, Event
+from mods.PymolProcess import PymolSession
+from mods.ParseCache import ParseCache
+from mods.ProjectSnapshot import save_snapshot, load_snapshot, SNAPSHOT_EXTENSION
+from mods.GaussianFile import OutputFile
+from mods.MoleculeFile import xyz_frames
+from mods.OutputWatcher import OutputWatcher
+
+# Secondary windows (Analyse, Settings, Plotter, PDB cluster, Calc setup, file editor) and plots (matplotlib) are
+# imported when first opened, see fex. self.open_analyse.
+
+# Files added by thread_add_files are sent to the GUI and pymol in batches of up to IMPORT_BATCH_SIZE files, or the
+# files added within IMPORT_BATCH_INTERVAL seconds:
+IMPORT_BATCH_SIZE = 50
+IMPORT_BATCH_INTERVAL = 0.25
+
+
+class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
+    def __init__(self, *args, obj=None, **kwargs):
+        super(MainWindow, self).__init__(*args, **kwargs)
+        # Icons are needed by all windows from here:
+        register_icons()
+        self.setupUi(self)
+        self.setWindowTitle("REACT - Main")
+
+        self.react_path = os.getcwd()
+        # It is not a good idea to have the settings file inside the software itself
+        # self.settings = Settings(parent=self, settingspath=f"{self.react_path}/.custom_settings.json")
+        self.settings = Settings(
+            parent=self, settingspath=f"{os.path.expanduser('~')}/.custom_settings.json"
+        )
+        self.states = []
+        self.proj_name = "new_project"
+
+        self.pymol = None
+
+        # Cache of read output files in workdir (see self.parse_cache)
+        self._parse_cache = None
+
+        # Processes reading imported files in parallel (see self.process_pool)
+        self._process_pool = None
+
+        # Set to cancel loading of project files (see self.load_project_files)
+        self._load_cancel = None
+        # Number of states still loading, and number of files loaded / to load:
+        self._loading_states = 0
+        self._load_count = 0
+        self._load_failed = 0
+        self._load_total = 0
+
+        # Output files of running jobs are read again when written to (only the new lines):
+        self.output_watcher = OutputWatcher(self)
+        self.output_watcher.files_changed.connect(self.update_running_files)
+        self._updating_files = False
+
+        # bool to keep track of unsaved changes to project.
+        self.unsaved_proj = False
+
+        # { state (int): main: path, frequency: path, solvation: path, big basis: path }
+        self.included_files = None
+
+        # Analyse window active or not:
+        self.analyse_window = None
+
+        # Create PDB cluster window active or not
+        self.cluster_window = None
+
+        # Bool allows only one instance of settings/calc setup window at the time.
+        self.settings_window = None
+        self.setup_window = None
+
+        self.add_state()
+
+        self.tabWidget.tabBar().tabMoved.connect(self.update_tab_names)
+        self.tabWidget.currentWidget().itemClicked.connect(self.change_pymol_structure)
+
+        # MainWindow Buttons with methods:
+        self.button_add_state.clicked.connect(self.add_state)
+        self.button_delete_state.clicked.connect(self.delete_state)
+        self.button_add_file.clicked.connect(self.add_files)
+        self.button_delete_file.clicked.connect(self.delete_file)
+        self.button_edit_file.clicked.connect(self.open_editfile)
+        self.button_cancel_load.clicked.connect(self.cancel_load)
+        self.button_cancel_load.hide()
+        self.button_analyse_calc.clicked.connect(self.open_analyse)
+        self.button_settings.clicked.connect(self.open_settings)
+        self.button_print_energy.clicked.connect(self.print_energy)
+        self.button_print_scf.clicked.connect(self.plot_scf)
+        self.button_print_relativeE.clicked.connect(self.print_relative_energy)
+        self.button_plot_ene_diagram.clicked.connect(self.plot_energy_diagram)
+        self.button_save_project.clicked.connect(self.save_project)
+        self.button_open_project.clicked.connect(self.import_project)
+        self.button_create_cluster.clicked.connect(self.create_cluster)
+        self.button_plotter.clicked.connect(self.open_plotter)
+        self.button_power_off.clicked.connect(self.power_off_on)
+        self.button_pymol.clicked.connect(self.start_pymol)
+        self.button_calc_setup.clicked.connect(self.open_calc_setup)
+
+        self.power = True
+
+        # Print welcome
+        self.append_text("Welcome to REACT", True)
+
+        # Set progressbar to full:
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_progressbar)
+        self.update_progressbar(100)
+
+        # Threads for jobs take take time:
+        self.threadpool = QThreadPool()
+
+        # SPLASH
+        self.splash = SplashScreen(self)
+        self.splash.show()
+
+        # PyQt5.QtCore.QRect(0, 0, 5120, 1440)
+        screen_size = self.screen().availableGeometry()
+        window_size = self.geometry()
+        self.move(int(((screen_size.width() - window_size.width()) / 2)), 50)
+
+        # TODO put this some place in the UI bottom ?
+        self.append_text(
+            "\nMultithreading with\nmaximum %d threads"
+            % self.threadpool.maxThreadCount()
+        )
+
+    def _find_pymol_executable(self):
+        """
+        Find PyMOL executable from system PATH or known installation locations
+        :return: path to pymol executable or None
+        """
+        import shutil
+
+        # Try to find pymol in PATH
+        pymol_exe = shutil.which("pymol")
+        if pymol_exe:
+            return pymol_exe
+
+        # Platform-specific fallback locations
+        if sys.platform == "darwin":  # macOS
+            common_paths = [
+                "/Applications/PyMOL.app/Contents/MacOS/pymol",
+                os.path.expanduser("~/Applications/PyMOL.app/Contents/MacOS/pymol"),
+                "/usr/local/bin/pymol",
+            ]
+        elif sys.platform == "linux":
+            common_paths = [
+                "/usr/bin/pymol",
+                "/usr/local/bin/pymol",
+            ]
+        elif sys.platform == "win32":
+            common_paths = [
+                "C:\\Program Files\\PyMOL\\PyMOL.exe",
+                "C:\\Program Files (x86)\\PyMOL\\PyMOL.exe",
+            ]
+        else:
+            common_paths = []
+
+        for path in common_paths:
+            if os.path.isfile(path):
+                return path
+
+        return None
+
+    def start_pymol(self, return_session=False):
+        """
+        Starts pymol sync to REACT
+        :return_session: return the pymol session link
+        :return: session (if return_session = True)
+        """
+        if self.pymol:
+            self.pymol.close()
+            return
+
+        pymol_path = None
+
+        # First, try user-configured PyMOL path from settings
+        if self.settings.pymolpath:
+            pymol_path = self.settings.pymolpath
+            if not os.path.isfile(pymol_path) and not os.path.isfile(
+                f"{pymol_path}/Contents/MacOS/pymol"
+            ):
+                self.append_text(f"Configured PyMOL not found at: {pymol_path}")
+                pymol_path = None
+
+        # If no user path, try to find PyMOL from environment/installation
+        if not pymol_path:
+            pymol_path = self._find_pymol_executable()
+
+        if not pymol_path:
+            self.append_text(
+                "PyMOL not found. Please install pymol-open-source: pip install pymol-open-source"
+            )
+            self.append_text("Or configure PyMOL path in settings.")
+            return
+
+        self.pymol = PymolSession(parent=self, home=self, pymol_path=pymol_path)
+
+        # Connect signal for thread-safe text messages with explicit QueuedConnection
+        self.pymol.textMessageSignal.connect(self.append_text, Qt.QueuedConnection)
+        # Connect signal for thread-safe PyMOL disconnection with explicit QueuedConnection
+        self.pymol.disconnectSignal.connect(
+            self.pymol._do_disconnect_pymol, Qt.QueuedConnection
+        )
+        # Connect signal for when PyMOL process finishes
+        self.pymol.pymolFinishedSignal.connect(
+            self._on_pymol_finished, Qt.QueuedConnection
+        )
+
+        if return_session:
+            return self.pymol
+
+        self.tabWidget.tabBar().currentChanged.connect(self.pymol_view_current_state)
+        self.connect_pymol_structures(connect=True)
+
+        self.pymol.pymol_cmd("group state_%d" % 1)
+        self.load_all_states_pymol()
+
+        self.pymol.importSavedPDB.connect(self.pdb_from_pymol)
+
+    def _on_pymol_finished(self):
+        """Handler for when PyMOL process finishes - runs in main thread"""
+        self.pymol = None
+
+    def connect_pymol_structures(self, connect=True):
+        """
+        Connect clicks in QListWidget to structure displayed in pymol
+        :param connect: bool
+        :return:
+        """
+        # on_off = {True:}
+        for state in range(self.count_states):
+            if connect:
+                self.tabWidget.widget(state).itemClicked.connect(
+                    self.change_pymol_structure
+                )
+            else:
+                self.tabWidget.widget(state).itemClicked.disconnect(
+                    self.change_pymol_structure
+                )
+
+    def pymol_view_current_state(self):
+        """
+        :return:
+        """
+        if not self.pymol:
+            return
+        state = self.get_current_state
+        name = None
+        if self.get_selected_filepath:
+            name = self.pymol_object_name(self.get_selected_filepath)
+
+        self.pymol.pymol_cmd("group state_%d, toggle, open" % state)
+        for i in range(1, self.count_states + 1):
+            if i != state:
+                self.pymol.pymol_cmd("group state_%d, toggle, close" % i)
+                self.pymol.pymol_cmd("disable state_%d" % i)
+        self.pymol.highlight(name=name, group="state_%d" % state)
+
+    def file_to_pymol(self, filepath, state=1, set_defaults=True):
+        """
+        Takes any file and opens it in pymol
+        :param filepath: path to file
+        :param state: integer for state
+        :param set_defaults: fix pymol representation
+        :return:
+        """
+        self.files_to_pymol([filepath], state, set_defaults)
+
+    def files_to_pymol(self, filepaths, state=1, set_defaults=True):
+        """
+        Opens files in pymol, all sent from memory, loaded and grouped with one request to pymol
+        :param filepaths: list of paths to files
+        :param state: integer for state
+        :param set_defaults: fix pymol representation
+        :return:
+        """
+        if not self.pymol:
+            return
+
+        object_names = list()
+        contents = list()
+        file_formats = list()
+        for filepath in filepaths:
+            content = self.pymol_content(filepath, state)
+            if content:
+                object_names.append(self.pymol_object_name(filepath))
+                contents.append(content[0])
+                file_formats.append(content[1])
+
+        if not object_names:
+            return
+
+        self.pymol.load_states(object_names, contents, file_formats)
+        self.pymol.pymol_cmd("group state_%d, %s" % (state, " ".join(object_names)))
+
+        if set_defaults:
+            self.pymol.set_default_rep()
+            self.pymol.pymol_cmd("enable state_%d and %s" % (state, object_names[-1]))
+
+    @staticmethod
+    def pymol_object_name(filepath):
+        """
+        :param filepath: key of file in State (see State.frame_key)
+        :return: object name in pymol, the filename with "_" for "." (and frame), fex. ts_out or conformers_xyz_3
+        """
+        return "_".join(filepath.split("/")[-1].replace(FRAME_SEPARATOR, ".").split("."))
+
+    def pymol_content(self, filepath, state=1):
+        """
+        Content to load in pymol: the structure of file (xyz) or the file itself (xyz, pdb)
+        :param filepath: path to file
+        :param state: integer for state
+        :return: content (str), format ("xyz" or "pdb"), None if file can not be displayed
+        """
+        try:
+            mol_obj = self.states[state - 1].get_molecule_object(filepath)
+        except AttributeError:
+            self.append_text("Make sure you have selected a file to display in Pymol")
+
+        try:
+            if mol_obj.faulty or not mol_obj:
+                return None
+        except AttributeError:
+            return None
+
+        if split_frame(filepath)[0].split(".")[-1] not in ["xyz", "pdb"]:
+            # Final structure:
+            title = filepath.split("/")[-1]
+        elif getattr(mol_obj, "frame", None) is not None:
+            # Only the selected frame of a multi-frame xyz file:
+            title = mol_obj.frames.title(mol_obj.frame)
+        else:
+            try:
+                with open(filepath) as f:
+                    return f.read(), filepath.split(".")[-1]
+            except OSError as e:
+                self.append_text(f"Error reading file: {e}")
+                return None
+
+        return "".join(xyz_frames(mol_obj.atom_names, [mol_obj.coordinates], title)), "xyz"
+
+    def load_all_states_pymol(self):
+        """
+        Loads all files from project table to pymol
+        :return:
+        """
+        if not self.pymol:
+            return
+
+        for i in range(len(self.states)):
+            state = i + 1
+            self.files_to_pymol(self.states[i].get_all_paths, state, set_defaults=False)
+            self.pymol.pymol_cmd(f"group state_{state}")
+
+        self.pymol.set_default_rep()
+
+        state = self.get_current_state
+        self.pymol.pymol_cmd("group state_%d, toggle, open" % state)
+        self.pymol.pymol_cmd("disable *")
+        sel_file = self.get_selected_filepath
+        if sel_file:
+            self.pymol.pymol_cmd(
+                "enable state_%d and %s" % (state, self.pymol_object_name(sel_file))
+            )
+
+    def load_scf_geometries(self):
+        """
+        Creates pymol object with all scf geometries
+        :return:
+        """
+        state = self.get_current_state
+        # filepath = self.get_selected_filepath
+
+        mol_obj = self.states[self.state_index].get_molecule_object(
+            self.get_selected_filepath
+        )
+
+        # All geometries but the last, as states of one object:
+        name = "%s_scf" % mol_obj.molecule_name.split("/")[-1].split(".")[0]
+        self.pymol.load_trajectory(name, mol_obj.atom_names, mol_obj.trajectory[:-1])
+        self.pymol.pymol_cmd("group state_%d, %s" % (state, name))
+
+        self.pymol.set_default_rep()
+        self.pymol.pymol_cmd("disable *")
+        self.pymol.pymol_cmd("enable state_%d and %s" % (state, name))
+
+    def change_pymol_structure(self):
+        """
+        displayes clicked entry in pymol
+        :return:
+        """
+        if not self.pymol:
+            return
+        group = "state_%d" % self.get_current_state
+        name = self.pymol_object_name(self.get_selected_filepath)
+        self.pymol.highlight(name=name, group=group)
+
+    def plot_scf(self):
+        """
+        Takes the selected file and prints the 4 Convergence criterias.
+        :return:
+        """
+        mol_obj = self.states[self.state_index].get_molecule_object(
+            self.tabWidget.currentWidget().currentItem().text()
+        )
+
+        if mol_obj.faulty:
+            self.append_text("ERROR: not possible for broken file!")
+            return
+
+        try:
+            filepath = self.tabWidget.currentWidget().currentItem().text()
+        except:
+            return
+
+        # Can not plot? :
+        if filepath.split(".")[-1] not in ["out", "log"]:
+            return
+
+        # Sync with pymol
+        if self.pymol:
+            self.load_scf_geometries()
+
+        filename = filepath.split("/")[-1]
+
+        scf_data = self.states[self.tabWidget.currentIndex()].get_scf(filepath)
+
+        # Check if this is geometry optimization or not (None if not):
+        converged = self.states[self.tabWidget.currentIndex()].check_convergence(
+            filepath
+        )
+        from mods.ReactPlot import PlotGdata
+        plot = PlotGdata(self, scf_data, filename)
+
+        if converged is None:
+            plot.plot_scf_done()
+            self.append_text("%s seem to not be a geometry optimisation ..." % filename)
+        else:
+            plot.plot_scf_convergence()
+            if converged is False:
+                self.append_text("%s has not converged successfully." % filename)
+
+    def add_file(self, filepath):
+        """
+        Adds only one file.
+        """
+        self.states[self.state_index].add_file(filepath)
+
+        items_insert_index = self.tabWidget.currentWidget().count()
+        self.tabWidget.currentWidget().insertItem(items_insert_index, filepath)
+        self.check_convergence(
+            filepath, items_insert_index, self.tabWidget.currentIndex()
+        )
+
+        if self.pymol:
+            self.file_to_pymol(
+                filepath=filepath, state=self.get_current_state, set_defaults=True
+            )
+
+    def add_files(self, paths=False):
+        """
+        Adds filenames via self.import_files (QFileDialog) to current QtabWidget tab QListWidget and selected state.
+        TODO: need to check if files exist in list from before! If file exist,
+        delete old and add again, since the user might have edited the file
+        outside the app or using FileEditorWindow.
+        """
+        # Add state tab if not any exists...
+        if self.tabWidget.currentIndex() < 0:
+            self.append_text(
+                "No states exist - files must be assigned to a state.", True
+            )
+            self.append_text("Auto-creating state 1 - files will be added there")
+            self.add_state()
+
+        # path = os.getcwd()  # wordkdir TODO set this as global at some point
+        path = self.settings.workdir
+        filter_type = (
+            "Gaussian output files (*.out);; Gaussian input files (*.com *.inp);; "
+            "Geometry files (*.pdb *.xyz)"
+        )
+        title_ = "Import File"
+
+        if isinstance(paths, list):
+            files_path = paths
+        else:
+            files_path, type_ = self.import_files(title_, filter_type, path)
+
+        if len(files_path) < 1:
+            return
+
+        # Remove file types not accepted by REACT
+        accepted_files = ["inp", "com", "out", "xyz", "pdb"]
+        files_path = [x for x in files_path if x.split(".")[-1] in accepted_files]
+
+        # Where to start inserting files in project list:
+        items_insert_index = self.tabWidget.currentWidget().count()
+
+        # Get tab_index and state in main thread before starting worker to avoid GUI access from worker
+        current_tab_index = self.tabWidget.currentIndex()
+        current_state = self.get_current_state
+
+        # Initialize progressbar in main thread before starting worker
+        self.update_progressbar(1)
+
+        # Files are read in parallel by processes, started from main thread:
+        executor = self.process_pool if len(files_path) > 1 else None
+
+        # Start thread first:
+        worker = Worker(
+            self.thread_add_files,
+            files_path,
+            items_insert_index,
+            current_tab_index,
+            current_state,
+            executor,
+        )
+        worker.signals.finished.connect(self.thread_complete, Qt.QueuedConnection)
+        worker.signals.progress.connect(self.progress_fn, Qt.QueuedConnection)
+        self.threadpool.start(worker)
+        self.timer.start(10)
+
+        # Insert files/filenames to project table:
+        list_widget = self.tabWidget.currentWidget()
+        list_widget.setUpdatesEnabled(False)
+        list_widget.insertItems(items_insert_index, files_path)
+        for i in range(items_insert_index, items_insert_index + len(files_path)):
+            list_widget.item(i).setForeground(QtGui.QColor(80, 80, 80))
+        list_widget.setUpdatesEnabled(True)
+
+        # Move horizontall scrollbar according to text
+        self.tabWidget.currentWidget().repaint()
+        scrollbar = self.tabWidget.currentWidget().horizontalScrollBar()
+        scrollbar.setValue(
+            self.tabWidget.currentWidget().horizontalScrollBar().maximum()
+        )
+
+    def thread_add_files(
+        self,
+        file_paths,
+        item_index,
+        tab_index,
+        state,
+        executor,
+        progress_callback,
+        results_callback,
+    ):
+        """
+        :param file_paths:
+        :param item_index: index where to start insertion of files in list
+        :param tab_index: tab index passed from main thread to avoid GUI access
+        :param state: state value passed from main thread to avoid GUI access
+        :param executor: ProcessPoolExecutor reading files in parallel, None to read files in this thread
+        :param progress_callback:
+        :return:
+        """
+        # Don't call GUI functions directly - use signals only
+        # Use tab_index instead of self.state_index to avoid GUI access from worker thread
+        errors = list()
+        added_files = self.states[tab_index].add_files(file_paths, executor, errors=errors)
+
+        item_indexes = {file: item_index + n for n, file in enumerate(file_paths)}
+        n_added = 0
+        for batch in self.batch_files(added_files, item_indexes):
+            n_added += len(batch)
+            # Files that could not be read are done too:
+            n_done = n_added + len(errors)
+            progress_callback.emit(
+                {
+                    self.update_progressbar: ((int(n_done) * 100 / len(file_paths)),),
+                    self.check_convergence_files: (batch, tab_index),
+                    self.files_to_pymol: (
+                        [file for file, _ in batch],
+                        state,
+                        n_done == len(file_paths),
+                    ),
+                }
+            )
+
+        if errors:
+            progress_callback.emit(
+                {
+                    self.update_progressbar: (100,),
+                    self.files_not_read: (errors, tab_index, item_indexes),
+                }
+            )
+
+        return "Done"
+
+    @staticmethod
+    def batch_files(added_files, item_indexes):
+        """
+        Collect files from State.add_files in batches of up to IMPORT_BATCH_SIZE files, or the files added within
+        IMPORT_BATCH_INTERVAL seconds
+        :param added_files: iterable of filepaths
+        :param item_indexes: {filepath: list index of file}
+        :return: generator, yields lists of (filepath, item_index)
+        """
+        batch = list()
+        batch_start = time.monotonic()
+        for file in added_files:
+            batch.append((file, item_indexes[file]))
+
+            if (
+                len(batch) >= IMPORT_BATCH_SIZE
+                or time.monotonic() - batch_start >= IMPORT_BATCH_INTERVAL
+            ):
+                yield batch
+                batch = list()
+                batch_start = time.monotonic()
+
+        if batch:
+            yield batch
+
+    def progress_fn(self, progress_stuff):
+        """
+        :param progress_stuff: {function : arguments}
+        :return:
+        """
+        for func in progress_stuff.keys():
+            args = progress_stuff[func]
+            func(*args)
+
+    def update_progressbar(self, val=None, reverse=False):
+        """
+        :param val:
+        :return:
+        """
+        with Lock():
+            if not val:
+                val = self.progressBar.value()
+                if reverse:
+                    val -= 1
+                else:
+                    val += 1
+                if val > 80:
+                    self.timer.setInterval(50)
+                else:
+                    self.timer.setInterval(10)
+
+            if val < 100:
+                self.progressBar.setTextVisible(True)
+
+            if not reverse and val > 99:
+                self.progressBar.setTextVisible(False)
+                self.timer.stop()
+            elif reverse and val < 1:
+                self.timer2.stop()
+                sys.exit()
+
+            self.progressBar.setValue(int(val))
+
+    def thread_complete(self):
+        self.append_parse_cache_stats()
+
+        # if self.pymol:
+        #    self.file_to_pymol(filepath=file, state=self.get_current_state, set_defaults=True)
+
+    def files_not_read(self, errors, tab_index=None, item_indexes=None):
+        """
+        Report files that could not be read (see State.add_files) in the log, and remove them from the list
+        :param errors: list of (filepath, exception)
+        :param tab_index: tab of the list, None if the files are removed elsewhere (fex. self.state_loaded)
+        :param item_indexes: {filepath: list index}
+        """
+        for file_path, error in errors:
+            self.append_text(f"\nERROR: could not read {file_path}: {error}")
+
+        if tab_index is None:
+            return
+
+        list_widget = self.tabWidget.widget(tab_index)
+        indexes = sorted({item_indexes[file_path] for file_path, _ in errors}, reverse=True)
+        for i in indexes:
+            item = list_widget.item(i)
+            if item and item.text() not in self.states[tab_index].files:
+                list_widget.takeItem(i)
+
+    def check_convergence(self, file_path, item_index, tab_index=None):
+        if tab_index is None:
+            tab_index = self.tabWidget.currentIndex()
+            tab_widget = self.tabWidget.currentWidget()
+        else:
+            tab_widget = self.tabWidget.widget(tab_index)
+
+        mol_obj = self.states[tab_index].get_molecule_object(filepath=file_path)
+
+        # Watch output files of jobs still running (also if faulty, fex. no geometry written yet):
+        if getattr(mol_obj, "running", False):
+            self.output_watcher.watch(file_path)
+        else:
+            self.output_watcher.unwatch(file_path)
+
+        if mol_obj.faulty:
+            tab_widget.item(item_index).setForeground(QtGui.QColor(195, 82, 52))
+            self.append_text("\nERROR: %s seems to have faulty..." % mol_obj.filename)
+            return
+
+        if mol_obj.file_extension not in ["out", "log"]:
+            tab_widget.item(item_index).setForeground(QtGui.QColor(98, 114, 164))
+        else:
+            converged = mol_obj.converged
+
+            if isinstance(converged, bool) and not converged:
+                tab_widget.item(item_index).setForeground(QtGui.QColor(195, 82, 52))
+                self.append_text(
+                    "\nWarning: %s seems to have not converged!" % mol_obj.filename
+                )
+            elif isinstance(converged, bool) and converged:
+                tab_widget.item(item_index).setForeground(QtGui.QColor(117, 180, 104))
+            elif not isinstance(converged, bool):
+                tab_widget.item(item_index).setForeground(QtGui.QColor(117, 180, 104))
+
+    def check_convergence_files(self, files, tab_index):
+        """
+        check_convergence for several files, with one repaint of the list
+        :param files: list of (file_path, item_index)
+        :param tab_index:
+        """
+        tab_widget = self.tabWidget.widget(tab_index)
+        tab_widget.setUpdatesEnabled(False)
+        for file_path, item_index in files:
+            self.check_convergence(file_path, item_index, tab_index)
+        tab_widget.setUpdatesEnabled(True)
+
+    def update_running_files(self, file_paths):
+        """
+        Read what running jobs have written to their output files since last time (see OutputWatcher), in a thread.
+        :param file_paths: list of changed output files
+        """
+        # Files changed while reading are read next time:
+        if self._updating_files:
+            for file_path in file_paths:
+                self.output_watcher.mark_changed(file_path)
+            return
+
+        # Files deleted from all states are not watched any longer:
+        for file_path in file_paths:
+            if not any(file_path in state.files for state in self.states):
+                self.output_watcher.unwatch(file_path)
+
+        self._updating_files = True
+        worker = Worker(self.thread_update_files, list(self.states), file_paths)
+        worker.signals.result.connect(self.update_files_result, Qt.QueuedConnection)
+        worker.signals.finished.connect(self.update_files_complete, Qt.QueuedConnection)
+        self.threadpool.start(worker)
+
+    def thread_update_files(self, states, file_paths, progress_callback, results_callback):
+        """
+        Make new file objects for the output files in a thread, self.states are only changed by the GUI thread (see
+        self.update_files_result)
+        :param states: states with the output files when the update was started
+        :param file_paths: output files to update in all states
+        :param progress_callback:
+        :return: list of (state, file_path, file object, new file object)
+        """
+        # Don't call GUI functions directly - use signals only
+        updated_files = list()
+        for state in states:
+            for file_path in file_paths:
+                mol_obj = state.files.get(file_path)
+                if mol_obj is None:
+                    continue
+
+                new_mol_obj = state.updated_fileobject(file_path)
+                if new_mol_obj is not None:
+                    updated_files.append((state, file_path, mol_obj, new_mol_obj))
+
+        return updated_files
+
+    def update_files_result(self, updated_files):
+        """
+        Replace file objects with the updated ones, and re-colour files when converged/faulty/running has changed
+        :param updated_files: list of (state, file_path, file object, new file object), see self.thread_update_files
+        """
+        for state, file_path, mol_obj, new_mol_obj in updated_files:
+            # Not if the file has been removed (or added again) while it was read:
+            if state not in self.states or state.files.get(file_path) is not mol_obj:
+                continue
+
+            state.files[file_path] = new_mol_obj
+            status = (mol_obj.faulty, mol_obj.converged, mol_obj.running)
+            if status != (new_mol_obj.faulty, new_mol_obj.converged, new_mol_obj.running):
+                self.update_file_status(file_path, self.states.index(state))
+
+    def update_files_complete(self):
+        self._updating_files = False
+
+    def update_file_status(self, file_path, tab_index):
+        """
+        Re-colour file in the list of the state (tab) when converged/faulty/running has changed
+        """
+        tab_widget = self.tabWidget.widget(tab_index)
+        if tab_widget is None:
+            return
+
+        for item in tab_widget.findItems(file_path, Qt.MatchExactly):
+            self.check_convergence(file_path, tab_widget.row(item), tab_index)
+
+    def delete_file(self):
+        """
+        Deletes selected file(s) from QtabBarWidget-->Tab-->QListWdget-->item
+        :return:
+        """
+        # Avoid crash when no tabs exist
+        if self.tabWidget.currentIndex() < 0:
+            return
+
+        # avoid crash when no files exist in state:
+        if self.tabWidget.currentWidget().count() < 1:
+            return
+
+        # Get the list displayed in the current tab (state)
+        current_list = self.tabWidget.currentWidget()
+
+        # Get the selected item(s) ---> returns a list of objects
+        list_items = current_list.selectedItems()
+
+        # delete files from state
+        tab_index = self.tabWidget.currentIndex()
+        self.states[tab_index].del_files([x.text() for x in list_items])
+
+        # delete files from pymol
+        if self.pymol:
+            state = self.get_current_state
+            [
+                self.pymol.pymol_cmd("delete %s" % self.pymol_object_name(x.text()))
+                for x in list_items
+            ]
+
+        # Remove selected items from list:
+        for item in list_items:
+            current_list.takeItem(current_list.row(item))
+
+            # Remove from included_files if existing:
+            try:
+                if self.included_files:
+                    for type_ in self.included_files[tab_index + 1].keys():
+                        if item.text() == self.included_files[tab_index + 1][type_]:
+                            self.included_files[tab_index + 1][type_] = ""
+                            # Update analyse window, if active:
+                            if self.analyse_window:
+                                self.analyse_window.update_state_included_files()
+            except KeyError:
+                pass
+
+    def update_tab_names(self):
+        """
+        Changes the order of states in self.states according to the order of tabs in the tabBar widget.
+        """
+
+        try:
+            new_states = []
+            new_included_files = dict()
+
+            for tab_index in range(len(self.states)):
+                state = self.tabWidget.tabText(tab_index)
+                new_states.append(self.states[int(state) - 1])
+                if state != str(tab_index + 1):
+                    self.tabWidget.setTabText(tab_index, str(tab_index + 1))
+                    # swap values of state and tab_index+1
+                    if self.included_files:
+                        new_included_files[int(state)] = self.included_files[
+                            tab_index + 1
+                        ]
+
+                else:
+                    if self.included_files:
+                        new_included_files[int(state)] = self.included_files[int(state)]
+
+            self.states = new_states
+            self.included_files = new_included_files
+
+            if self.pymol:
+                self.pymol.pymol_cmd("delete state_*")
+                QTimer.singleShot(100, self.load_all_states_pymol)
+        except KeyError:
+            if self.analyse_window:
+                self.analyse_window.init_included_files()
+
+    def add_state(self):
+        """
+        Add state (new tab) to tabBar widget with a ListWidget child.
+        """
+        self.states.append(State(self))
+
+        # new state:
+        state = self.count_states + 1
+        list_widget = DragDropListWidget(self)
+        # Frames of multi-frame xyz files are added from the context menu (see self.list_context_menu):
+        list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
+        list_widget.customContextMenuRequested.connect(self.list_context_menu)
+        self.tabWidget.addTab(list_widget, f"{state}")
+        self.tabWidget.setCurrentWidget(self.tabWidget.widget(state - 1))
+        if self.pymol:
+            self.pymol.pymol_cmd("group state_%d" % state)
+            self.tabWidget.widget(state - 1).itemClicked.connect(
+                self.change_pymol_structure
+            )
+
+    def list_context_menu(self, position):
+        """
+        Context menu of the file list of current state, to add one frame of a multi-frame xyz file (see self.add_frame)
+        :param position: position in list widget
+        """
+        list_widget = self.tabWidget.currentWidget()
+        item = list_widget.itemAt(position)
+        if not item:
+            return
+
+        mol_obj = self.states[self.state_index].get_molecule_object(item.text())
+        frame_count = getattr(mol_obj, "frame_count", 1)
+        if frame_count < 2:
+            return
+
+        menu = QtWidgets.QMenu(list_widget)
+        add_frame = menu.addAction("Add frame to state...")
+        if menu.exec_(list_widget.viewport().mapToGlobal(position)) == add_frame:
+            self.add_frame(split_frame(item.text())[0], frame_count)
+
+    def add_frame(self, filepath, frame_count):
+        """
+        Add one frame of a multi-frame xyz file (fex. one conformer of a CREST ensemble) to current state, without
+        reading the other frames. The frame is listed as filepath#frame, frames from 1 (see State.frame_key).
+        :param filepath: path to xyz file
+        :param frame_count: number of frames in file
+        """
+        frame, ok = QtWidgets.QInputDialog.getInt(
+            self, "Add frame", f"Frame of {filepath.split('/')[-1]} (1-{frame_count}):", 1, 1, frame_count
+        )
+        if ok:
+            self.add_file(frame_key(filepath, frame - 1))
+
+    def set_state(self, state):
+        """
+        Set tab to be displayed
+        :param state: integer
+        :return:
+        """
+        if int(state) <= self.count_states:
+            self.tabWidget.setCurrentWidget(self.tabWidget.widget(state - 1))
+
+    def delete_state(self):
+        """
+        Deletes current state (tab) from tabBar widget together with QListWidget child.
+        """
+        tab_index = self.tabWidget.currentIndex()
+        state = tab_index + 1
+
+        # Avoid crash when there are not tabs
+        if tab_index < 0:
+            return
+
+        # Delete from self.included_files
+        if self.included_files:
+            self.included_files[state] = {0: "", 1: "", 2: "", 3: ""}
+            if self.analyse_window:
+                self.analyse_window.update_state_included_files()
+
+        self.tabWidget.widget(tab_index).deleteLater()
+        self.states.pop(tab_index)
+
+        # This is important here:
+        QTimer.singleShot(100, self.update_tab_names)
+
+        if self.pymol:
+            self.pymol.pymol_cmd("delete state_%s" % str(state))
+
+    def create_input_content(self, filepath):
+        """
+        :return: string -> content of new input file, based on outputfile given as argument
+        """
+        return self.states[self.tabWidget.currentIndex()].create_input_content(filepath)
+
+    def create_xyz_filecontent(self, filepath):
+        return self.states[self.tabWidget.currentIndex()].create_xyz_filecontent(
+            filepath
+        )
+
+    def import_project(self):
+        """
+        Import project-file and creates new state instances accordingly.
+        """
+        proj_path, type_ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            "Import project",
+            self.settings.workdir,
+            filter=f"Project (*.rxt *.{SNAPSHOT_EXTENSION})",
+        )
+
+        # To avoid error if dialogwindow is opened, but no file is selected
+        if proj_path == "":
+            return
+
+        if self.unsaved_proj:
+            # TODO set self.unsaved_proj = True when approriate
+            # when Save is clicked: signal = 1, else signal = 0.
+            # TODO save project when signal == 1, else: discard project
+            from mods.DialogsAndExceptions import DialogSaveProject
+            dialog = DialogSaveProject(self)
+            signal = dialog.exec_()
+
+        # Files still loading from previous project are not wanted anymore:
+        self.cancel_load()
+
+        # delete states currently in workspace
+        self.states.clear()
+        self.tabWidget.clear()
+        self.textBrowser.clear()
+        if self.pymol:
+            self.pymol.pymol_cmd("delete *")
+
+        self.proj_name = proj_path.split("/")[-1]
+        self.label_projectname.setText(os.path.splitext(self.proj_name)[0])
+
+        # Output files of project snapshots are not read again, see self.save_project:
+        output_readers = dict()
+        if proj_path.endswith(f".{SNAPSHOT_EXTENSION}"):
+            proj, output_readers = load_snapshot(
+                proj_path, object_hook=cf.json_hook_int_bool_converter
+            )
+        else:
+            with open(proj_path, "r") as proj_file:
+                proj = json.load(proj_file, object_hook=cf.json_hook_int_bool_converter)
+
+        for key in ["states", "included files", "workdir", "log"]:
+            self._import_project_pop_and_assign(proj, key)
+
+        # Files are read after workdir (and parse cache) has been set:
+        self.parse_cache.reset_stats()
+        self.load_project_files(output_readers)
+
+    def _import_project_pop_and_assign(self, project, key):
+        try:
+            proj_item = project.pop(key)
+
+            if key == "states":
+                # Files are listed here, and read by self.load_project_files:
+                for state in proj_item.items():
+                    self.add_state()
+                    list_widget = self.tabWidget.currentWidget()
+                    list_widget.insertItems(0, state[1])
+                    for i in range(list_widget.count()):
+                        list_widget.item(i).setForeground(QtGui.QColor(80, 80, 80))
+
+            if key == "included files":
+                self.included_files = proj_item
+            if key == "log":
+                self.textBrowser.appendPlainText(proj_item)
+            elif key == "workdir":
+                self.settings.workdir = proj_item
+        except:
+            self.append_text(f'Failed to load "{key}" from "{self.proj_name}"')
+
+    def load_project_files(self, output_readers=None):
+        """
+        Read files listed in all states (tabs) of imported project. Files of all states are read in parallel, each
+        state in its own thread, and each state is enabled when all its files are read. Can be cancelled with
+        self.cancel_load.
+        :param output_readers: {filepath: OutputReader} from project snapshot, these files are not read
+        """
+        if output_readers is None:
+            output_readers = dict()
+
+        cancel = Event()
+        self._load_cancel = cancel
+        self._loading_states = 0
+        self._load_count = 0
+        self._load_failed = 0
+        self._load_total = 0
+
+        # [(tab_index, file_paths, {file_path: item_index})]
+        states_files = list()
+        # Files of snapshot not found, only the summary from the snapshot is available (see OutputFile.output_available):
+        summary_only = list()
+        for tab_index in range(self.count_states):
+            list_widget = self.tabWidget.widget(tab_index)
+            item_indexes = dict()
+            for i in range(list_widget.count()):
+                file_path = list_widget.item(i).text()
+                # Missing files are removed from the list by self.state_loaded:
+                if os.path.exists(split_frame(file_path)[0]):
+                    item_indexes[file_path] = i
+                elif file_path in output_readers:
+                    item_indexes[file_path] = i
+                    summary_only.append(file_path)
+                else:
+                    self.append_text(f"File not found: {file_path}")
+            if item_indexes:
+                states_files.append((tab_index, list(item_indexes), item_indexes))
+                self._load_total += len(item_indexes)
+
+        for file_path in dict.fromkeys(summary_only):
+            self.append_text(
+                f"File not found: {file_path} - opened from snapshot, without optimization steps and normal modes"
+            )
+
+        if not states_files:
+            self.append_parse_cache_stats()
+            return
+
+        executor = self.process_pool
+        self.update_progressbar(1)
+        self.button_cancel_load.show()
+
+        for tab_index, file_paths, item_indexes in states_files:
+            self.tabWidget.setTabEnabled(tab_index, False)
+            self._loading_states += 1
+
+            # The state is passed on, self.states may be replaced (fex. by another project) before the worker runs:
+            worker = Worker(
+                self.thread_load_state,
+                self.states[tab_index],
+                file_paths,
+                item_indexes,
+                tab_index,
+                executor,
+                cancel,
+                output_readers,
+            )
+            worker.signals.progress.connect(self.progress_fn, Qt.QueuedConnection)
+            # finished is emitted also if reading fails:
+            worker.signals.finished.connect(
+                partial(self.state_loaded, tab_index, cancel), Qt.QueuedConnection
+            )
+            self.threadpool.start(worker)
+
+    def thread_load_state(
+        self,
+        state,
+        file_paths,
+        item_indexes,
+        tab_index,
+        executor,
+        cancel,
+        output_readers,
+        progress_callback,
+        results_callback,
+    ):
+        """
+        :param state: State to add the files to
+        :param file_paths: files of state, in the order they are listed
+        :param item_indexes: {file_path: list index}
+        :param tab_index: tab index passed from main thread to avoid GUI access
+        :param executor: ProcessPoolExecutor reading files in parallel
+        :param cancel: threading.Event to stop reading files
+        :param output_readers: {filepath: OutputReader} from project snapshot
+        :param progress_callback:
+        :return:
+        """
+        # Don't call GUI functions directly - use signals only
+        errors = list()
+        added_files = state.add_files(file_paths, executor, cancel, output_readers, errors)
+        n_added = 0
+        for batch in self.batch_files(added_files, item_indexes):
+            n_added += len(batch)
+            progress_callback.emit(
+                {
+                    self.state_files_loaded: (
+                        batch,
+                        tab_index,
+                        n_added + len(errors) == len(file_paths),
+                        cancel,
+                    ),
+                }
+            )
+
+        # Files not read are removed from the list by self.state_loaded:
+        if errors:
+            progress_callback.emit({self.state_files_not_read: (errors, cancel)})
+
+        return "Done"
+
+    def state_files_loaded(self, files, tab_index, set_defaults, cancel):
+        """
+        Show files read by self.thread_load_state in list and pymol
+        :param files: list of (filepath, item_index)
+        :param cancel: threading.Event of the load the files belong to
+        """
+        # Files from a project that has since been replaced:
+        if cancel is not self._load_cancel:
+            return
+
+        self._load_count += len(files)
+        self.update_progressbar(self._load_count * 100 / self._load_total)
+        self.check_convergence_files(files, tab_index)
+        self.files_to_pymol([file for file, _ in files], tab_index + 1, set_defaults)
+
+    def state_files_not_read(self, errors, cancel):
+        """
+        Report files of project that could not be read by self.thread_load_state
+        :param errors: list of (filepath, exception)
+        :param cancel: threading.Event of the load the files belong to
+        """
+        if cancel is not self._load_cancel:
+            return
+
+        self._load_failed += len(errors)
+        self.files_not_read(errors)
+
+    def state_loaded(self, tab_index, cancel):
+        """
+        Enable state when self.thread_load_state is done. Files not read (cancelled or failed) are removed from the list.
+        :param tab_index:
+        :param cancel: threading.Event of the load the state belongs to
+        """
+        if cancel is not self._load_cancel:
+            return
+
+        list_widget = self.tabWidget.widget(tab_index)
+        loaded_files = self.states[tab_index].files
+        for i in reversed(range(list_widget.count())):
+            if list_widget.item(i).text() not in loaded_files:
+                list_widget.takeItem(i)
+
+        self.tabWidget.setTabEnabled(tab_index, True)
+        self._loading_states -= 1
+        if self._loading_states > 0:
+            return
+
+        self.button_cancel_load.hide()
+        self.update_progressbar(100)
+        if self._load_count + self._load_failed < self._load_total:
+            self.append_text(
+                "Loading of project stopped: %d of %d files loaded"
+                % (self._load_count, self._load_total)
+            )
+        self.append_parse_cache_stats()
+        self._load_cancel = None
+
+    def cancel_load(self):
+        """
+        Stop reading files of project (see self.load_project_files)
+        """
+        if self._load_cancel:
+            self._load_cancel.set()
+
+    def save_project(self):
+        """
+        exports a *.rxt (identical to JSON) file containing:
+        project = {'states'        : {1: [file1,file2,..],
+                                      2: [file1,file2,..]
+                                      },
+                   'included files': self.included_files,
+                   'workdir'      : self.settings.workdir
+                   'log'           : self.textBrowser.toPlainText()
+                   }
+        or a *.rxs project snapshot, with what has been read from all output files as well (see ProjectSnapshot).
+        """
+        project = {}
+        states = {}
+
+        self.append_text(
+            "\nREACT project last saved: %s\n"
+            % (time.asctime(time.localtime(time.time())))
+        )
+
+        for index in range(len(self.states)):
+            states[index + 1] = self.states[index].get_all_paths
+
+        project["states"] = states
+        project["included files"] = self.included_files
+        project["workdir"] = self.settings.workdir
+        project["log"] = self.textBrowser.toPlainText()
+
+        temp_filepath = self.settings.workdir + "/" + self.proj_name
+
+        proj_path, filter_ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            "Save project",
+            temp_filepath,
+            f"REACT project (*.rxt);; REACT project snapshot (*.{SNAPSHOT_EXTENSION})",
+        )
+
+        if proj_path == "":
+            return
+
+        if "snapshot" in filter_ and not proj_path.endswith(f".{SNAPSHOT_EXTENSION}"):
+            proj_path = f"{os.path.splitext(proj_path)[0]}.{SNAPSHOT_EXTENSION}"
+
+        self.proj_name = proj_path.split("/")[-1]
+
+        # change project name title in workspace
+        new_proj_title = os.path.splitext(self.proj_name)[0]
+        self.label_projectname.setText(new_proj_title)
+
+        if proj_path.endswith(f".{SNAPSHOT_EXTENSION}"):
+            output_readers = {
+                filepath: file_object.output_reader
+                for state in self.states
+                for filepath, file_object in state.files.items()
+                if isinstance(file_object, OutputFile)
+            }
+            save_snapshot(proj_path, project, output_readers)
+        else:
+            with open(proj_path, "w") as f:
+                json.dump(project, f)
+
+    def import_files(
+        self, title_="Import files", filter_type="Any files (*.*)", path=os.getcwd()
+    ):
+        """
+        Opens file dialog where multiple files can be selected.
+        Return: files_ --> list of files (absolute path)
+        Return: files_type --> string with the chosen filter_type
+        """
+        #  DontUseNativeDialog is required on Linux to avoid crashes, but native dialogs work better on macOS
+        import sys
+
+        if sys.platform == "linux":
+            files_, files_type = QtWidgets.QFileDialog.getOpenFileNames(
+                self,
+                title_,
+                path,
+                filter_type,
+                options=QtWidgets.QFileDialog.DontUseNativeDialog,
+            )
+        else:
+            files_, files_type = QtWidgets.QFileDialog.getOpenFileNames(
+                self,
+                title_,
+                path,
+                filter_type,
+            )
+
+        return files_, files_type
+
+    def append_parse_cache_stats(self):
+        """
+        Write the parse cache index, and print hit/miss ratio and errors of parse cache since last time to the log window
+        """
+        self.parse_cache.flush()
+        if self.parse_cache.hits + self.parse_cache.misses > 0:
+            self.append_text(self.parse_cache.stats_text)
+        for error in self.parse_cache.errors:
+            self.append_text(error)
+        self.parse_cache.reset_stats()
+
+    def append_text(self, text=str(), date_time=False):
+        """
+        :param text: text to be printed in ain window textBrowser
+        :return:
+        """
+        if date_time:
+            text = "\n%s\n%s" % (time.asctime(time.localtime(time.time())), text)
+        self.textBrowser.appendPlainText(text)
+        self.textBrowser.verticalScrollBar().setValue(
+            self.textBrowser.verticalScrollBar().maximum()
+        )
+
+    def print_energy(self):
+        """
+        Takes the selected file and prints the final ENERGY (SCF Done) in hartree and kcal/mol.
+        :return:
+        """
+        try:
+            filepath = self.tabWidget.currentWidget().currentItem().text()
+        except AttributeError:
+            return
+
+        filename = filepath.split("/")[-1]
+
+        if filename.split(".")[-1] not in ["out", "log"]:
+            self.append_text(
+                "%s does not seem to be a Gaussian output file." % filename
+            )
+            return
+
+        # this file --> State
+        state_energy = self.states[self.tabWidget.currentIndex()].get_energy(filepath)
+        # energy_kcal = superfile.connvert_to_kcal(energy_au) TODO ?
+
+        energy_kcal = cf.hartree_to_kcal(state_energy)
+
+        self.append_text("\nFinal energy of %s:" % filename)
+        self.append_text("%f a.u" % state_energy)
+        self.append_text("%.4f kcal/mol" % energy_kcal)
+
+    def get_relative_energies(self):
+        """
+        :return: energies dict[state] = "dE": float, "file":path
+        """
+        energies = list()
+        d_energies = dict()
+
+        for tab_index in range(self.tabWidget.count()):
+            if self.tabWidget.widget(tab_index).currentItem():
+                file_path = self.tabWidget.widget(tab_index).currentItem().text()
+                if file_path.split(".")[-1] in ["out", "log"]:
+                    try:
+                        energies.append(self.states[tab_index].get_energy(file_path))
+                        d_energies[tab_index + 1] = {
+                            "dE": energies[tab_index] - energies[0],
+                            "file": file_path,
+                        }
+                    except IndexError:
+                        self.append_text("Something went wrong with tab indexes...")
+
+                else:
+                    self.append_text(
+                        "%s does not seem to be Gaussian output" % file_path
+                    )
+            else:
+                self.append_text("No files selected for state %d" % (tab_index + 1))
+
+        return d_energies
+
+    def print_relative_energy(self):
+        """
+        calculates the relative energy (to state 1) for all states and prints it in the log window
+        :return:
+        """
+        self.append_text("Relative energies", date_time=True)
+
+        d_energies = self.get_relative_energies()
+
+        for state in sorted(d_energies.keys()):
+            self.append_text(
+                "%sE(%d): %.4f kcal/mol (%s)"
+                % (
+                    cf.unicode_symbols["Delta"],
+                    state,
+                    cf.hartree_to_kcal(d_energies[state]["dE"]),
+                    d_energies[state]["file"].split("/")[-1],
+                )
+            )
+
+    def plot_energy_diagram(self):
+        """
+        :return:
+        """
+        d_ene = self.get_relative_energies()
+
+        # Convert d_ene dict to list of energies in kcal/mol
+        d_ene = [cf.hartree_to_kcal(d_ene[x]["dE"]) for x in sorted(d_ene.keys())]
+
+        from mods.ReactPlot import PlotEnergyDiagram
+        plot = PlotEnergyDiagram(
+            d_ene, x_title="State", y_title="Relative energy", plot_legend=False
+        )
+
+    def open_settings(self):
+        if self.settings_window:
+            self.append_text(
+                "\nSettings window is already running.\nPerhaps the window is hidden?"
+            )
+            self.settings_window.raise_()
+        else:
+            from mods.Settings import SettingsTheWindow
+            self.settings_window = SettingsTheWindow(self)
+            self.settings_window.show()
+
+    def open_analyse(self):
+        """
+
+        :return:
+        """
+
+        if not self.tabWidget.currentWidget().currentItem():
+            self.append_text(
+                "\n Nothing to analyse here ... Make sure you have selected a file to analyse."
+            )
+            return
+
+        try:
+            mol_obj = self.states[self.state_index].get_molecule_object(
+                self.tabWidget.currentWidget().currentItem().text()
+            )
+        except AttributeError:
+            self.append_text("ERROR: something is wrong")
+            return
+        try:
+            if mol_obj.faulty:
+                self.append_text("ERROR: Analyse not possible for broken file!")
+                return
+        except AttributeError:
+            print(self.states)
+            print(self.included_files)
+            return
+
+        if self.analyse_window:
+            self.append_text(
+                "\nAnalyse Calculation is already running. \nPerhaps the window is hidden?"
+            )
+            self.analyse_window.raise_()
+            return
+
+        from mods.AnalyseCalc import AnalyseCalc
+        self.analyse_window = AnalyseCalc(self)
+        self.analyse_window.show()
+
+    def create_cluster(self):
+        """ """
+
+        # Check if PyMOL is running first
+        if not self.pymol:
+            self.append_text(
+                "\nINFO:\nPlease launch Pymol to use the Create cluster app.\n"
+            )
+            return
+
+        # Allow opening window even without selected file
+        if self.cluster_window:
+            self.cluster_window.raise_()
+        else:
+            from mods.PDBModel import ModelPDB
+            self.cluster_window = ModelPDB(self)
+            self.cluster_window.show()
+
+    @pyqtSlot(str)
+    def pdb_from_pymol(self, pdb_path):
+        if not self.cluster_window:
+            return
+        if self.cluster_window.ui.copy_to_project.isChecked():
+            self.add_file(pdb_path)
+            self.append_text(f"Added {pdb_path.split('/')[-1]} to project table")
+
+    def open_plotter(self):
+        """
+        :return:
+        """
+
+        try:
+            mol_obj = self.states[self.state_index].get_molecule_object(
+                self.tabWidget.currentWidget().currentItem().text()
+            )
+        except AttributeError:
+            pass
+        # if mol_obj.faulty:
+        #     self.append_text("ERROR: Plotter not possible for broken file!")
+        #     return
+
+        from mods.Plotter import Plotter
+        self.plotter = Plotter(self)
+        self.plotter.show()
+
+    def open_editfile(self):
+        """
+
+        :return:
+        """
+        if not self.tabWidget.currentWidget().currentItem():
+            self.append_text("\n No file selected for editing!")
+            return
+
+        filepath = self.tabWidget.currentWidget().currentItem().text()
+
+        # The whole xyz file of a frame is edited:
+        from mods.FileEditor import FileEditor
+        editor = FileEditor(self, split_frame(filepath)[0], key=filepath)
+        editor.show()
+
+    def open_calc_setup(self):
+        if not self.tabWidget.currentWidget().currentItem():
+            self.append_text(
+                "\n No file selected - select a file to prepare calculation on"
+            )
+            return
+
+        mol_obj = self.states[self.state_index].get_molecule_object(
+            self.tabWidget.currentWidget().currentItem().text()
+        )
+
+        if mol_obj.faulty:
+            self.append_text("ERROR: Calculation setup not possible for broken file!")
+            return
+
+        if self.setup_window:
+            self.append_text(
+                "\nSettup window is already running.\nPerhaps the window is hidden?"
+            )
+            self.setup_window.raise_()
+        else:
+            from mods.CalcSetupWindow import CalcSetupWindow
+            self.setup_window = CalcSetupWindow(self, self.current_file)
+            self.setup_window.show()
+
+    def power_off_on(self):
+        """
+        power down when power button is clicked
+        :return:
+        """
+        if self.power:
+            self.button_power_off.setIcon(QtGui.QIcon("resources/icons/power_off.png"))
+            self.append_text("Powering down...", date_time=True)
+            if self.pymol:
+                self.pymol.close()
+            self.power = False
+            self.timer2 = QTimer()
+            self.timer2.timeout.connect(lambda: self.update_progressbar(reverse=True))
+            self.timer2.start(5)
+
+        else:
+            self.button_power_off.setIcon(QtGui.QIcon("resources/icons/power_on.png"))
+            self.append_text("Powering down cancelled.")
+            self.power = True
+
+            self.timer2.stop()
+            self.timer.start(5)
+
+    @property
+    def get_selected_filepath(self):
+        """
+        :return: path to selected file, str
+        """
+        try:
+            return self.tabWidget.currentWidget().currentItem().text()
+        except:
+            return None
+
+    @property
+    def get_current_state(self):
+        """
+        :return: integer (state)
+        """
+        return self.tabWidget.currentIndex() + 1
+
+    @property
+    def curr_state(self):
+        return self.states[self.state_index]
+
+    @property
+    def state_index(self):
+        return self.tabWidget.currentIndex()
+
+    @property
+    def count_states(self):
+        """
+        :return: integer (total number of states)
+        """
+        return self.tabWidget.count()
+
+    @property
+    def current_file(self):
+        """
+        :return: current file (filepath, in text)
+        """
+        return self.tabWidget.currentWidget().currentItem().text()
+
+    @property
+    def workdir(self):
+        """
+        :return: self.settings.workdir
+        """
+        return self.settings.workdir
+
+    @property
+    def parse_cache(self):
+        """
+        :return: ParseCache stored in workdir (a new ParseCache if workdir has changed)
+        """
+        cache_dir = f"{self.settings.workdir}/.react_cache"
+        if not self._parse_cache or self._parse_cache.cache_dir != cache_dir:
+            self._parse_cache = ParseCache(cache_dir)
+        return self._parse_cache
+
+    @property
+    def process_pool(self):
+        """
+        :return: ProcessPoolExecutor for reading files (started when first used)
+        """
+        if not self._process_pool:
+            # Forking a process with running Qt threads is not safe:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.settings.import_workers or None,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._process_pool
+
+    def closeEvent(self, event):
+        self.cancel_load()
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+        # Output files read since the last import (fex. by the Analyse window):
+        if self._parse_cache:
+            self._parse_cache.flush()
+
+        if self.pymol:
+            try:
+                # TODO this only partly works... QProcess: Destroyed while process ("OpenSourcePymol/dist/OpenSourcePymol.app") is still running.
+                self.pymol.close()
+            except:
+                pass
+
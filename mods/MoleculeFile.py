@@ -1,20 +1,439 @@
-from mods.Atoms import XYZAtom, PDBAtom
+from collections.abc import Mapping
+import io
+import mmap
+import numpy as np
+from mods.Atoms import Atom, XYZAtom, PDBAtom
+from mods.NeighborSearch import NeighborSearch
+
+
+def format_xyz_lines(atom_names, coordinates):
+    """
+    :param atom_names: atom names (list or array)
+    :param coordinates: numpy array (n_atoms, 3)
+    :return: list of xyz lines, identical to Atom.formatted_xyz_line
+    """
+    return [
+        " %15s%14.8f%14.8f%14.8f" % (name.ljust(15), x, y, z)
+        for name, (x, y, z) in zip(list(atom_names), coordinates.tolist())
+    ]
+
+
+def xyz_frames(atom_names, trajectory, titles=""):
+    """
+    All geometries as multi-frame xyz content, one formatting per frame instead of per atom.
+    :param atom_names: atom names (list or array)
+    :param trajectory: numpy array (n_geometries, n_atoms, 3)
+    :param titles: comment line of every frame, one str for all frames or a list with one str per frame
+    :return: generator, content (str) of every frame
+    """
+    atom_names = [str(name).replace("%", "%%") for name in atom_names]
+    trajectory = np.asarray(trajectory, dtype=np.float64).reshape(-1, len(atom_names), 3)
+    if isinstance(titles, str):
+        titles = [titles] * len(trajectory)
+
+    # Same lines as format_xyz_lines:
+    frame_format = "".join(" %s%%14.8f%%14.8f%%14.8f\n" % name.ljust(15) for name in atom_names)
+    header = "%d\n" % len(atom_names)
+
+    for title, geometry in zip(titles, trajectory):
+        yield header + title + "\n" + frame_format % tuple(geometry.ravel().tolist())
+
+
+def write_xyz_frames(filepath, atom_names, trajectory, titles=""):
+    """
+    Write all geometries as one multi-frame xyz file (see xyz_frames), one frame at a time.
+    :param filepath: path to xyz file
+    """
+    with open(filepath, "w") as f:
+        for frame in xyz_frames(atom_names, trajectory, titles):
+            f.write(frame)
+
+
+def parse_xyz_block(block, atom_count):
+    """
+    :param block: bytes, atom lines of one or more xyz frames with atom_count atoms each (same atoms in every frame)
+    :return: atom names (n_atoms,), coordinates numpy array (n_frames, n_atoms, 3)
+    """
+    stream = io.BytesIO(block)
+
+    atom_names = list()
+    while len(atom_names) < atom_count:
+        line = stream.readline()
+        if not line:
+            break
+        if line.strip():
+            atom_names.append(line.split()[0].decode())
+    stream.seek(0)
+
+    # Only the coordinate columns, fex. extended xyz files have more columns:
+    coordinates = np.loadtxt(stream, dtype=np.float64, usecols=(1, 2, 3), comments=None, ndmin=2)
+
+    return np.array(atom_names, dtype=str), coordinates.reshape(-1, atom_count, 3)
+
+
+class XYZFrames:
+    """
+    Index of the frames of a (multi-frame) xyz file, fex. an optimization trajectory or a CREST conformer ensemble.
+    The index (byte offsets and atom count of every frame) is made from the atom count lines only, and frames are read
+    as numpy arrays when asked for: frames[i] = (atom_names, coordinates), or one at a time with iter(frames).
+    A frame not yet completely written (running job) is not in the index.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+        # Number of atoms, and byte offsets of title line, first atom line and end of every frame:
+        self.atom_counts = np.zeros(0, dtype=np.int64)
+        self._title_offsets = np.zeros(0, dtype=np.int64)
+        self._atom_offsets = np.zeros(0, dtype=np.int64)
+        self._end_offsets = np.zeros(0, dtype=np.int64)
+
+        self.make_index()
+
+    def make_index(self):
+        """
+        Find the line ends of the file with numpy, then jump from one atom count line to the next.
+        """
+        with open(self.filepath, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file
+                return
+
+        with mm:
+            size = len(mm)
+            newlines = np.frombuffer(mm, dtype=np.uint8) == 10
+            line_ends = np.flatnonzero(newlines)
+            del newlines
+            if mm[size - 1] != 10:
+                line_ends = np.append(line_ends, size)
+            line_count = len(line_ends)
+
+            def line_start(i):
+                return int(line_ends[i - 1]) + 1 if i else 0
+
+            atom_counts, title_offsets, atom_offsets, end_offsets = list(), list(), list(), list()
+            line = 0
+            while line < line_count:
+                header = mm[line_start(line):int(line_ends[line])].strip()
+                if not header:
+                    line += 1
+                    continue
+                try:
+                    atom_count = int(header)
+                except ValueError:
+                    break
+                if atom_count <= 0:
+                    break
+
+                last_line = line + atom_count + 1
+                if last_line >= line_count:
+                    break
+
+                atom_counts.append(atom_count)
+                title_offsets.append(line_start(line + 1))
+                atom_offsets.append(line_start(line + 2))
+                end_offsets.append(int(line_ends[last_line]))
+                line = last_line + 1
+
+        self.atom_counts = np.array(atom_counts, dtype=np.int64)
+        self._title_offsets = np.array(title_offsets, dtype=np.int64)
+        self._atom_offsets = np.array(atom_offsets, dtype=np.int64)
+        self._end_offsets = np.array(end_offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.atom_counts)
+
+    def __getitem__(self, i):
+        return self.read_frame(i)
+
+    def __iter__(self):
+        """
+        :return: generator, (atom_names, coordinates (n_atoms, 3)) for every frame, read one at a time
+        """
+        with open(self.filepath, "rb") as f:
+            for i in range(len(self)):
+                yield self._read_frame(f, i)
+
+    def frame_index(self, i):
+        """
+        :param i: frame number, negative from the end
+        :return: frame number from 0
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError("xyz frame %d out of range (%d frames)" % (i, len(self)))
+        return i % len(self)
+
+    def read_frame(self, i):
+        """
+        :param i: frame number, negative from the end
+        :return: atom_names, coordinates numpy array (n_atoms, 3) of frame i, without reading the other frames
+        """
+        with open(self.filepath, "rb") as f:
+            return self._read_frame(f, self.frame_index(i))
+
+    def _read_frame(self, f, i):
+        f.seek(self._atom_offsets[i])
+        block = f.read(self._end_offsets[i] - self._atom_offsets[i])
+        atom_names, coordinates = parse_xyz_block(block, self.atom_counts[i])
+        return atom_names, coordinates[0]
+
+    def read_frames(self, frames=None):
+        """
+        :param frames: frame numbers (all with the same number of atoms), all frames with the atoms of the final frame
+        if None
+        :return: atom_names, coordinates numpy array (n_frames, n_atoms, 3)
+        """
+        if frames is None:
+            frames = np.flatnonzero(self.atom_counts == self.atom_counts[-1]).tolist()
+        else:
+            frames = [self.frame_index(i) for i in frames]
+
+        atom_count = self.atom_counts[frames[0]]
+        if np.any(self.atom_counts[frames] != atom_count):
+            raise ValueError("xyz frames with different number of atoms can not be read together")
+
+        with open(self.filepath, "rb") as f:
+            blocks = list()
+            for i in frames:
+                f.seek(self._atom_offsets[i])
+                blocks.append(f.read(self._end_offsets[i] - self._atom_offsets[i]))
+
+        # Line end of every block, so that the blocks are parsed together:
+        return parse_xyz_block(b"\n".join(blocks), atom_count)
+
+    def title(self, i):
+        """
+        :return: comment line of frame i (fex. energy of CREST conformers)
+        """
+        i = self.frame_index(i)
+        with open(self.filepath, "rb") as f:
+            f.seek(self._title_offsets[i])
+            return f.read(self._atom_offsets[i] - self._title_offsets[i]).decode(errors="replace").strip()
+
+
+# Columns of ATOM/HETATM lines in pdb files, read by read_pdb_columns (coordinates are read into a separate array):
+PDB_ATOM_DTYPE = np.dtype([
+    ("serial", np.int64),
+    ("name", "U4"),
+    ("resname", "U4"),
+    ("chain", "U1"),
+    ("resseq", np.int64),
+    ("element", "U2"),
+])
+
+# Line width of ATOM/HETATM lines, shorter lines are padded with spaces:
+PDB_LINE_WIDTH = 80
+
+# Residue names by type (see ResidueIndex), terminal residues have N or C in front (Q-style) of the protein residue:
+PROTEIN_RESIDUES = frozenset([
+    "GLY", "HIS", "HID", "HIP", "HIE", "ALA", "VAL", "ILE", "CYS", "MET", "TYR", "ASP", "GLU", "ARG", "LYS", "PHE",
+    "TRP", "ASN", "GLN", "SER", "AR+", "LY+", "GL-", "AS-", "PRO", "LEU", "THR",
+])
+N_TERMINAL_RESIDUES = frozenset("N%s" % x for x in PROTEIN_RESIDUES)
+C_TERMINAL_RESIDUES = frozenset("C%s" % x for x in PROTEIN_RESIDUES | N_TERMINAL_RESIDUES)
+ION_RESIDUES = frozenset(["CL-", "CLA", "Cl-", "SOD", "Na+", "NA+"])
+WATER_RESIDUES = frozenset(["HOH", "WAT"])
+
+# Formal charge of residues (not listed: 0), terminal residues have +1 (N) or -1 (C) in addition:
+RESIDUE_CHARGES = {
+    "ASP": -1, "AS-": -1, "GLU": -1, "GL-": -1, "ARG": 1, "AR+": 1, "LYS": 1, "LY+": 1, "HIP": 1,
+    "CL-": -1, "CLA": -1, "Cl-": -1, "SOD": 1, "Na+": 1, "NA+": 1,
+}
+
+
+def read_pdb_columns(filepath):
+    """
+    Read the ATOM/HETATM lines of a pdb file as one block of fixed-width columns, parsed with numpy per column
+    instead of line by line. Files with columns not in the fixed-width format (fex. no residue number) are read line
+    by line with PDBAtom.
+    :param filepath: path to pdb file
+    :return: pdb_atoms (structured array PDB_ATOM_DTYPE), coordinates numpy array (n_atoms, 3), list of lines (bytes)
+    """
+    with open(filepath, "rb") as f:
+        lines = [line.rstrip(b"\r\n") for line in f if line.startswith((b"ATOM", b"HETATM"))]
+
+    pdb_atoms = np.zeros(len(lines), dtype=PDB_ATOM_DTYPE)
+    if not lines:
+        return pdb_atoms, np.zeros((0, 3)), lines
+
+    table = b"".join(line[:PDB_LINE_WIDTH].ljust(PDB_LINE_WIDTH) for line in lines)
+    table = np.frombuffer(table, dtype=np.uint8).reshape(-1, PDB_LINE_WIDTH)
+
+    def column(start, end):
+        return np.ascontiguousarray(table[:, start:end]).view("S%d" % (end - start)).ravel()
+
+    def text_column(start, end):
+        return np.char.strip(column(start, end).astype(str))
+
+    try:
+        pdb_atoms["serial"] = column(6, 11).astype(np.int64)
+        pdb_atoms["resseq"] = column(22, 26).astype(np.int64)
+        coordinates = np.stack([column(30, 38), column(38, 46), column(46, 54)], axis=1).astype(np.float64)
+    except ValueError:
+        return pdb_columns_from_atoms([PDBAtom(line.decode()) for line in lines]) + (lines,)
+
+    pdb_atoms["name"] = text_column(12, 16)
+    pdb_atoms["resname"] = text_column(17, 21)
+    pdb_atoms["chain"] = text_column(21, 22)
+    pdb_atoms["element"] = text_column(76, 78)
+
+    return pdb_atoms, coordinates, lines
+
+
+def pdb_columns_from_atoms(atoms):
+    """
+    :param atoms: list of PDBAtom
+    :return: pdb_atoms (structured array PDB_ATOM_DTYPE), coordinates numpy array (n_atoms, 3)
+    """
+    pdb_atoms = np.zeros(len(atoms), dtype=PDB_ATOM_DTYPE)
+    for i, atom in enumerate(atoms):
+        pdb_atoms[i] = (
+            atom.pdb_atom_nr,
+            atom.pdb_atom_name[:4],
+            atom.res_name[1:].strip(),
+            atom.pdb_line[21:22].strip(),
+            atom.res_nr,
+            atom.atom_name[:2],
+        )
+    coordinates = np.array([atom.coordinate for atom in atoms], dtype=np.float64).reshape(-1, 3)
+    return pdb_atoms, coordinates
+
+
+def residue_type(resname):
+    """
+    :param resname: residue name from pdb file
+    :return: "protein", "n-terminal", "c-terminal", "ion", "water" or "ligand"
+    """
+    if resname in PROTEIN_RESIDUES:
+        return "protein"
+    if resname in N_TERMINAL_RESIDUES:
+        return "n-terminal"
+    if resname in C_TERMINAL_RESIDUES:
+        return "c-terminal"
+    if resname in ION_RESIDUES:
+        return "ion"
+    if resname in WATER_RESIDUES:
+        return "water"
+    return "ligand"
+
+
+def residue_charge(resname):
+    """
+    :param resname: residue name from pdb file
+    :return: formal charge of residue (int)
+    """
+    if resname in N_TERMINAL_RESIDUES:
+        return residue_charge(resname[1:]) + 1
+    if resname in C_TERMINAL_RESIDUES:
+        return residue_charge(resname[1:]) - 1
+    return RESIDUE_CHARGES.get(resname, 0)
+
+
+class ResidueIndex:
+    """
+    Residues of a pdb file, made once from the columns of PDBFile (see PDBFile.residue_index) so that ligands, charge
+    and cluster atoms are found without reading the file again.
+    Residues are keyed by (chain, resseq, resname), in the order of the file, with the atom ranges (start, stop) of the
+    residue in PDBFile.pdb_atoms and PDBFile.coordinates (more than one range if the atoms of a residue are not
+    together in the file).
+    """
+
+    def __init__(self, pdb_atoms):
+        # (chain, resseq, resname) : [(start, stop), ...]
+        self.residues = dict()
+        # (chain, resseq, resname) : residue type (see residue_type)
+        self.residue_types = dict()
+
+        if not len(pdb_atoms):
+            return
+
+        chains, resseqs, resnames = pdb_atoms["chain"], pdb_atoms["resseq"], pdb_atoms["resname"]
+        new_residue = (chains[1:] != chains[:-1]) | (resseqs[1:] != resseqs[:-1]) | (resnames[1:] != resnames[:-1])
+        starts = np.concatenate(([0], np.flatnonzero(new_residue) + 1)).tolist()
+        stops = starts[1:] + [len(pdb_atoms)]
+
+        for start, stop in zip(starts, stops):
+            key = (str(chains[start]), int(resseqs[start]), str(resnames[start]))
+            if key not in self.residues:
+                self.residues[key] = list()
+                self.residue_types[key] = residue_type(key[2])
+            self.residues[key].append((start, stop))
+
+    def __len__(self):
+        return len(self.residues)
+
+    def of_type(self, *types):
+        """
+        :param types: residue types, fex. "ligand", "water"
+        :return: list of residue keys of these types
+        """
+        return [key for key, type_ in self.residue_types.items() if type_ in types]
+
+    @property
+    def ligand_names(self):
+        """
+        :return: residue names of ligands (not protein, ion or water), in the order of the file
+        """
+        return list(dict.fromkeys(key[2] for key in self.of_type("ligand")))
+
+    def atoms(self, residues):
+        """
+        :param residues: residue keys, fex. from self.of_type
+        :return: numpy array with atom positions (from 0) of residues
+        """
+        ranges = [atom_range for key in residues for atom_range in self.residues[key]]
+        if not ranges:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, stop) for start, stop in ranges])
+
+    def charge(self, residues=None):
+        """
+        :param residues: residue keys, all residues if None
+        :return: sum of formal charge of residues (see RESIDUE_CHARGES)
+        """
+        if residues is None:
+            residues = self.residues.keys()
+        return sum(residue_charge(key[2]) for key in residues)
+
+
+class MoleculeAtoms(Mapping):
+    """
+    Read-only dict view of the atoms of a Molecule: molecule[i] = Atom, with i from 1 to number of atoms.
+    Atom objects are made by the Molecule the first time they are asked for.
+    """
+
+    def __init__(self, molecule):
+        self._molecule = molecule
+
+    def __getitem__(self, i):
+        return self._molecule.get_atom(i)
+
+    def __iter__(self):
+        return iter(range(1, self._molecule.atom_count + 1))
+
+    def __len__(self):
+        return self._molecule.atom_count
 
 
 class Molecule:
     """
-    Takes a list of Atom objects at init and creates molecule (dict)
-    molecule[i] = Atom
+    Takes a list (or dict) of Atom objects at init, or coordinates as numpy array with atom names and indexes.
+    Coordinates are stored in one numpy array (n_atoms, 3), and atom names and indexes in arrays, so Atom objects
+    are only made when asked for: molecule[i] = Atom
     """
-    def __init__(self, atoms=None, filepath=None):
-        self._molecule = dict()
+    def __init__(self, atoms=None, filepath=None, coordinates=None, atom_names=None, atom_indices=None):
+        # Atom objects given or already made, i (from 1) : Atom
+        self._atom_objects = dict()
+        self._coordinates = np.zeros((0, 3))
+        self._atom_names = np.array([], dtype=str)
+        self._atom_indices = np.zeros(0, dtype=np.int32)
+
         if atoms:
-            if isinstance(atoms, dict):
-                self._molecule = atoms
-                self._atoms = atoms.values()
-            else:
-                self._atoms = atoms
-                self.make_molecule()
+            self.atoms = atoms
+        elif coordinates is not None:
+            self.set_arrays(coordinates, atom_names, atom_indices)
 
         self._filepath = filepath
 
@@ -22,9 +441,30 @@ class Molecule:
         self._charge = None
         self._multiplicity = None
 
-    def make_molecule(self):
-        for i in range(len(self.atoms)):
-            self._molecule[i+1] = self.atoms[i]
+    def set_arrays(self, coordinates, atom_names, atom_indices=None):
+        """
+        :param coordinates: (n_atoms, 3)
+        :param atom_names: atom name for every atom
+        :param atom_indices: atom index (fex. center number or pdb atom number) for every atom, 1...n if None
+        """
+        self._coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 3)
+        self._atom_names = np.asarray(atom_names, dtype=str)
+        if atom_indices is None:
+            atom_indices = np.arange(1, len(self._coordinates) + 1)
+        self._atom_indices = np.asarray(atom_indices, dtype=np.int32)
+        self._atom_objects = dict()
+
+    def get_atom(self, i):
+        """
+        :param i: atom number in molecule (from 1)
+        :return: Atom object (made from arrays if not made before)
+        """
+        if i not in self._atom_objects:
+            if not 0 < i <= self.atom_count:
+                raise KeyError(i)
+            x, y, z = self._coordinates[i - 1].tolist()
+            self._atom_objects[i] = Atom(str(self._atom_names[i - 1]), x, y, z, int(self._atom_indices[i - 1]))
+        return self._atom_objects[i]
 
     @property
     def filepath(self):
@@ -62,13 +502,35 @@ class Molecule:
     def multiplicity(self, value):
         self._multiplicity = value
 
+    @property
+    def coordinates(self):
+        """
+        :return: numpy array (n_atoms, 3)
+        """
+        return self._coordinates
+
+    @property
+    def atom_names(self):
+        return self._atom_names
+
+    @property
+    def atom_indices(self):
+        return self._atom_indices
+
+    @property
+    def elements(self):
+        """
+        :return: element symbol of every atom (fex. for covalent radii, see BondGraph)
+        """
+        return self._atom_names
+
     @property
     def atoms(self):
-        return self._atoms
+        return [self.get_atom(i) for i in range(1, self.atom_count + 1)]
 
     @property
     def molecule(self):
-        return self._molecule
+        return MoleculeAtoms(self)
 
     @property
     def molecules(self):
@@ -80,59 +542,97 @@ class Molecule:
 
     @property
     def formatted_xyz(self):
-        molecule_xyz = list()
-
-        for i in sorted(self.molecule.keys()):
-            molecule_xyz.append(self.molecule[i].formatted_xyz_line)
-
-        return molecule_xyz
+        return format_xyz_lines(self._atom_names, self._coordinates)
 
     @property
     def formatted_pdb(self):
-        pdb_list = list()
-        for i in sorted(self.molecule.keys()):
-            pdb_list.append(self.molecule[i].formatted_pdb_line)
-        return pdb_list
+        return [self.get_atom(i).formatted_pdb_line for i in range(1, self.atom_count + 1)]
 
     @property
     def atom_count(self):
-        return len(self.atoms)
+        return len(self._coordinates)
 
     @molecule.setter
     def molecule(self, value):
-        self._molecule = value
+        self.atoms = value
 
     @atoms.setter
     def atoms(self, value):
-        self._atoms = value
+        """
+        :param value: list of Atom objects, or dict {i: Atom}
+        """
+        if isinstance(value, Mapping):
+            value = [value[i] for i in sorted(value.keys())]
+        self.set_arrays(
+            coordinates=[atom.coordinate for atom in value],
+            atom_names=[atom.atom_name for atom in value],
+            atom_indices=[getattr(atom, "center_number", 0) or 0 for atom in value],
+        )
+        self._atom_objects = {i + 1: atom for i, atom in enumerate(value)}
 
 
 class Geometries(Molecule):
     """
-    Takes a list of molecules [[Atoms], [Atoms],... iterations SCF] typically from geometry optimisations.
+    Takes a list of molecules [[Atoms], [Atoms],... iterations SCF] typically from geometry optimisations, or all
+    geometries as one numpy array (n_geometries, n_atoms, 3) together with atom_names and atom_indices.
+    All geometries are stored in one array (self.trajectory) and the current geometry (self.iteration) is a view of it.
     """
-    def __init__(self, molecules=None, filepath=None):
+    def __init__(self, molecules=None, filepath=None, atom_names=None, atom_indices=None):
 
-        # [[Atoms], [Atoms],... iterations SCF]
-        self._molecules = molecules
         self._iteration = -1
         self.faulty = False
 
-        # Init with final molecule / geometry optimization
-        super().__init__(atoms=molecules[-1], filepath=filepath)
+        if isinstance(molecules, np.ndarray):
+            trajectory = molecules
+            super().__init__(
+                coordinates=trajectory[-1], atom_names=atom_names, atom_indices=atom_indices, filepath=filepath
+            )
+        else:
+            # Init with final molecule / geometry optimization
+            super().__init__(atoms=molecules[-1], filepath=filepath)
+
+            # Only geometries with the same atoms as the final geometry can be stored in the trajectory:
+            trajectory = list()
+            for atoms in molecules:
+                if isinstance(atoms, Mapping):
+                    atoms = [atoms[i] for i in sorted(atoms.keys())]
+                if len(atoms) == self.atom_count:
+                    trajectory.append([atom.coordinate for atom in atoms])
+            # Number of geometries from the list, fex. a .com file with geom=check has no atoms:
+            trajectory = np.array(trajectory, dtype=np.float64).reshape(len(trajectory), self.atom_count, 3)
+
+        # [geometry, atom, xyz]
+        self._trajectory = trajectory
+        self._coordinates = self._trajectory[-1]
+
+    @property
+    def trajectory(self):
+        """
+        :return: numpy array (n_geometries, n_atoms, 3)
+        """
+        return self._trajectory
 
     @property
     def molecules(self):
-        return self._molecules
+        """
+        Atom objects for all geometries (made on request) - use self.trajectory for coordinates only.
+        :return: [[Atoms], [Atoms],... iterations SCF]
+        """
+        return [
+            [
+                Atom(str(name), x, y, z, int(index))
+                for name, index, (x, y, z) in zip(self._atom_names, self._atom_indices, geometry.tolist())
+            ]
+            for geometry in self._trajectory
+        ]
 
     @molecules.setter
     def molecules(self, value):
-        self._molecules = value
-
+        Geometries.__init__(self, molecules=value, filepath=self.filepath)
 
     @property
     def count_molecules(self):
-        return len(self._molecules)
+        return len(self._trajectory)
 
     @property
     def iteration(self):
@@ -140,39 +640,89 @@ class Geometries(Molecule):
 
     @iteration.setter
     def iteration(self, value):
-        if abs(value) > self.count_molecules:
+        if not -self.count_molecules <= value < self.count_molecules:
             return
-        self._iteration = value
 
-        self.atoms = self._molecules[value]
-        self.make_molecule()
+        # Atom objects belong to the previous geometry:
+        if value % self.count_molecules != self._iteration % self.count_molecules:
+            self._atom_objects = dict()
+
+        self._iteration = value
+        self._coordinates = self._trajectory[value]
 
     @property
     def all_geometries_formatted(self):
-        geoms = list()
-        for i in range(self.count_molecules):
-            self.iteration = i
-            geoms.append(self.formatted_xyz)
-        return geoms
+        return [format_xyz_lines(self._atom_names, geometry) for geometry in self._trajectory]
+
+    def formatted_xyz_trajectory(self, title=""):
+        """
+        All geometries as one multi-frame xyz file (loaded as states by PyMOL)
+        :param title: comment line of every frame
+        :return: list of lines
+        """
+        lines = list()
+        for geometry_lines in self.all_geometries_formatted:
+            lines.append(str(self.atom_count))
+            lines.append(title)
+            lines.extend(geometry_lines)
+        return lines
+
+    def write_xyz_trajectory(self, filepath, title=""):
+        """
+        Write all geometries as one multi-frame xyz file, same content as self.formatted_xyz_trajectory
+        :param title: comment line of every frame (str), or list with one comment line per geometry
+        """
+        write_xyz_frames(filepath, self._atom_names, self._trajectory, title)
 
 
 class XYZFile(Geometries):
-    def __init__(self, atoms=None, filepath=None):
+    """
+    Single or multi-frame xyz file. All frames with the same atoms as the final frame are the trajectory (final frame
+    is the current geometry), or only frame if given (fex. one conformer of an ensemble), see XYZFrames.
+    """
+    def __init__(self, atoms=None, filepath=None, frame=None):
+        self._frame = frame
+        self.frames = None
+
         # Atoms = list(Atom)
         if atoms:
             # List of Atom objects
             self._atoms = atoms
+            super(XYZFile, self).__init__(molecules=[self._atoms], filepath=filepath)
+            return
+
+        self._filepath = filepath
+        self.frames = XYZFrames(filepath)
 
-        if not atoms and filepath:
-            self._filepath = filepath
+        if not len(self.frames):
+            # No atom count line, every line with coordinates is an atom:
             self._atoms = self.read_xyz()
+            super(XYZFile, self).__init__(molecules=[self._atoms], filepath=filepath)
+            return
+
+        atom_names, trajectory = self.frames.read_frames(None if frame is None else [frame])
+        super(XYZFile, self).__init__(molecules=trajectory, filepath=filepath, atom_names=atom_names)
 
-        super(XYZFile, self).__init__(molecules=[self._atoms], filepath=filepath)
+    @property
+    def frame(self):
+        """
+        :return: frame number of the file read, None if all frames are read
+        """
+        return self._frame
+
+    @property
+    def frame_count(self):
+        """
+        :return: number of frames in file
+        """
+        if self.frames is None:
+            return 1
+        return max(len(self.frames), 1)
 
     def read_xyz(self):
         """
-        :param filepath: path to xyz file
-        :return: dict with atoms - {atom_index: {name: C, x:value, y: value, z: value}}
+        Read xyz file without atom count line
+        :return: list of XYZAtom
         """
         index = 0
         atoms = list()
@@ -188,24 +738,144 @@ class XYZFile(Geometries):
 
 
 class PDBFile(Geometries):
+    """
+    Atoms of a pdb file as numpy arrays: self.pdb_atoms (structured array PDB_ATOM_DTYPE with serial, name, resname,
+    chain, resseq and element of every atom) and self.coordinates, read column by column (see read_pdb_columns).
+    PDBAtom objects are only made when asked for (self.molecule[i], self.atoms).
+    """
     def __init__(self, pdb_atoms=None, filepath=None):
+        # Lines of the pdb file for every atom (bytes), to make PDBAtom objects:
+        self._pdb_lines = None
+        self._residue_index = None
+        self._neighbor_search = None
+
         if filepath:
-            self._atoms = self.read_pdb(filepath)
+            self.pdb_atoms, coordinates, self._pdb_lines = read_pdb_columns(filepath)
+            super().__init__(
+                molecules=coordinates.reshape(1, -1, 3),
+                filepath=filepath,
+                atom_names=self.pdb_atoms["element"],
+                atom_indices=self.pdb_atoms["serial"],
+            )
         elif pdb_atoms:
             self._atoms = pdb_atoms
+            self.pdb_atoms, _coordinates = pdb_columns_from_atoms(pdb_atoms)
+            super().__init__(molecules=[self._atoms], filepath=filepath)
+
+    def get_atom(self, i):
+        """
+        :param i: atom number in molecule (from 1)
+        :return: PDBAtom (made from the pdb line if not made before)
+        """
+        if i not in self._atom_objects and self._pdb_lines is not None:
+            if not 0 < i <= self.atom_count:
+                raise KeyError(i)
+            atom = PDBAtom(self._pdb_lines[i - 1].decode())
+            atom.x, atom.y, atom.z = self._coordinates[i - 1].tolist()
+            self._atom_objects[i] = atom
+        return super().get_atom(i)
+
+    @property
+    def residue_index(self):
+        """
+        :return: ResidueIndex of the pdb file, made the first time it is asked for
+        """
+        if self._residue_index is None:
+            self._residue_index = ResidueIndex(self.pdb_atoms)
+        return self._residue_index
+
+    @property
+    def elements(self):
+        """
+        :return: element of every atom from the element column, or first letter of pdb atom name (without leading
+        digits, fex. 1HB) if the file has no element column
+        """
+        guessed = np.array([name.lstrip("0123456789")[:1] for name in self.pdb_atoms["name"].tolist()], dtype=str)
+        return np.where(self.pdb_atoms["element"] != "", self.pdb_atoms["element"], guessed)
 
-        super().__init__(molecules=[self._atoms], filepath=filepath)
+    @property
+    def neighbor_search(self):
+        """
+        :return: NeighborSearch of the atoms, made the first time it is asked for
+        """
+        if self._neighbor_search is None:
+            self._neighbor_search = NeighborSearch(self.coordinates)
+        return self._neighbor_search
+
+    def atom_positions(self, serials):
+        """
+        :param serials: pdb atom numbers (fex. atom IDs from PyMOL)
+        :return: numpy array with atom positions (from 0), None if the atom numbers are not unique in the file
+        """
+        order = np.argsort(self.pdb_atoms["serial"], kind="stable")
+        sorted_serials = self.pdb_atoms["serial"][order]
+        if np.any(sorted_serials[1:] == sorted_serials[:-1]):
+            return None
+
+        serials = np.asarray(serials, dtype=np.int64)
+        found = np.searchsorted(sorted_serials, serials).clip(max=max(len(order) - 1, 0))
+        found = found[sorted_serials[found] == serials]
+        return order[found]
+
+    def atoms_around(self, atoms, radius, whole_residues=False, include_solvent=True):
+        """
+        Atoms within radius of atoms, not including atoms (same as "atoms around radius" in PyMOL)
+        :param atoms: atom positions (from 0)
+        :param radius: distance in Angstrom
+        :param whole_residues: all atoms of residues with atoms within radius ("byres" in PyMOL)
+        :param include_solvent: include water residues
+        :return: sorted numpy array with atom positions (from 0)
+        """
+        atoms = np.asarray(atoms, dtype=np.int64)
+        around = np.setdiff1d(self.neighbor_search.within(self.coordinates[atoms], radius), atoms)
+
+        if whole_residues:
+            residues = np.unique(self.pdb_atoms[["chain", "resseq", "resname"]][around])
+            residues = [(str(chain), int(resseq), str(resname)) for chain, resseq, resname in residues.tolist()]
+            around = np.sort(self.residue_index.atoms(residues))
+
+        if not include_solvent:
+            water = self.residue_index.atoms(self.residue_index.of_type("water"))
+            around = np.setdiff1d(around, water)
+
+        return around
+
+    def select(self, chains=None, residues=None, resnames=None):
+        """
+        Atoms in chains, residues and residue names (all given must match), fex. to cut out a cluster model.
+        :param chains: chain ids, fex. ["A"]
+        :param residues: residue numbers (resseq)
+        :param resnames: residue names, fex. ["HOH", "WAT"]
+        :return: numpy array with atom positions (from 0) in self.pdb_atoms and self.coordinates
+        """
+        mask = np.ones(self.atom_count, dtype=bool)
+        if chains is not None:
+            mask &= np.isin(self.pdb_atoms["chain"], list(chains))
+        if residues is not None:
+            mask &= np.isin(self.pdb_atoms["resseq"], list(residues))
+        if resnames is not None:
+            mask &= np.isin(self.pdb_atoms["resname"], list(resnames))
+        return np.flatnonzero(mask)
+
+    def pdb_lines(self, atoms=None):
+        """
+        :param atoms: atom positions (from 0), fex. from self.select. All atoms if None
+        :return: list of pdb lines (as in file) of atoms
+        """
+        if atoms is None:
+            atoms = range(self.atom_count)
+        if self._pdb_lines is None:
+            return [self.get_atom(i + 1).pdb_line for i in atoms]
+        return [self._pdb_lines[i].decode() for i in atoms]
 
     def read_pdb(self, filepath):
+        """
+        Read pdb file line by line (see read_pdb_columns)
+        :return: list of PDBAtom
+        """
         atoms = list()
         with open(filepath, "r") as pdb:
             for line in pdb:
                 if line.startswith("ATOM") or line.startswith("HETATM"):
                     atoms.append(PDBAtom(line))
         return atoms
-
-
-
-
-
-
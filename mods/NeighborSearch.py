@@ -0,0 +1,221 @@
+import numpy as np
+
+# Default cell size (Angstrom) of the cell list, queries with a radius up to the cell size search 27 cells:
+DEFAULT_CELL_SIZE = 4.0
+
+
+def distance(a, b):
+    """
+    :param a: [x, y, z]
+    :param b: [x, y, z]
+    :return: distance between a and b (float)
+    """
+    return float(np.linalg.norm(np.asarray(b, dtype=np.float64) - np.asarray(a, dtype=np.float64)))
+
+
+def expand_ranges(starts, counts):
+    """
+    :param starts: start of every range
+    :param counts: length of every range
+    :return: owner (which range) and value of every element in all ranges, fex. starts [0, 10], counts [2, 3] gives
+    owner [0, 0, 1, 1, 1] and values [0, 1, 10, 11, 12]
+    """
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, starts[owner] + offsets
+
+
+class NeighborSearch:
+    """
+    Cell list over coordinates (n_atoms, 3) for distance queries without comparing all atoms with each other:
+    atoms within radius of points (self.near, self.within), k nearest atoms (self.nearest) and all atom pairs within a
+    cutoff (self.pairs). Atoms are sorted by cell, and every query is done for all points at once with numpy, looking
+    only in the cells close enough to the points.
+    Atom numbers returned are positions (from 0) in coordinates.
+    """
+
+    def __init__(self, coordinates, cell_size=DEFAULT_CELL_SIZE):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+
+        if len(self.coordinates):
+            self._origin = self.coordinates.min(axis=0)
+        else:
+            self._origin = np.zeros(3)
+
+        # Atom cells (n_atoms, 3) and number of cells in every direction:
+        self._atom_cells = self.cells(self.coordinates)
+        self._shape = self._atom_cells.max(axis=0) + 1 if len(self.coordinates) else np.ones(3, dtype=np.int64)
+
+        # Atoms sorted by cell, and start and number of atoms of every cell with atoms:
+        cell_keys = self.cell_keys(self._atom_cells)
+        self._order = np.argsort(cell_keys, kind="stable")
+        self._keys, self._starts, self._counts = np.unique(
+            cell_keys[self._order], return_index=True, return_counts=True
+        )
+        # Cell (3) of every cell with atoms:
+        self._key_cells = self._atom_cells[self._order[self._starts]]
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def cells(self, points):
+        """
+        :param points: numpy array (n_points, 3)
+        :return: cell of every point (n_points, 3)
+        """
+        return np.floor((points - self._origin) / self.cell_size).astype(np.int64)
+
+    def cell_keys(self, cells):
+        """
+        :param cells: numpy array (n, 3)
+        :return: one number for every cell (-1 for cells outside the cell list)
+        """
+        inside = np.all((cells >= 0) & (cells < self._shape), axis=1)
+        keys = (cells[:, 0] * self._shape[1] + cells[:, 1]) * self._shape[2] + cells[:, 2]
+        return np.where(inside, keys, -1)
+
+    def candidates(self, points, reach):
+        """
+        All atoms in the cells up to reach cells away from the cell of every point. With reach = ceil(r / cell_size)
+        these include all atoms within r of the points.
+        :param points: numpy array (n_points, 3)
+        :return: point numbers and atom numbers of all candidate pairs
+        """
+        point_cells = self.cells(points)
+
+        if (2 * reach + 1) ** 3 > len(self._keys):
+            # Fewer cells with atoms than cells to look in (fex. points far from the atoms), check every cell with atoms:
+            close = np.all(np.abs(self._key_cells[np.newaxis] - point_cells[:, np.newaxis]) <= reach, axis=2)
+            point_numbers, cell = np.nonzero(close)
+            owner, sorted_atoms = expand_ranges(self._starts[cell], self._counts[cell])
+            return point_numbers[owner], self._order[sorted_atoms]
+
+        point_numbers, atom_numbers = list(), list()
+        steps = range(-reach, reach + 1)
+        for offset in np.array([(i, j, k) for i in steps for j in steps for k in steps]):
+            keys = self.cell_keys(point_cells + offset)
+            cell = np.searchsorted(self._keys, keys)
+            cell[cell == len(self._keys)] = 0
+            found = np.flatnonzero((keys >= 0) & (self._keys[cell] == keys))
+            if not len(found):
+                continue
+
+            owner, sorted_atoms = expand_ranges(self._starts[cell[found]], self._counts[cell[found]])
+            point_numbers.append(found[owner])
+            atom_numbers.append(self._order[sorted_atoms])
+
+        if not point_numbers:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(point_numbers), np.concatenate(atom_numbers)
+
+    def reach(self, radius):
+        """
+        :return: number of cells to search in every direction for radius
+        """
+        return max(int(np.ceil(radius / self.cell_size)), 1)
+
+    def near(self, points, radius):
+        """
+        :param points: numpy array (n_points, 3)
+        :param radius: distance in Angstrom
+        :return: point numbers, atom numbers and distances of all atoms within radius of the points
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        point_numbers, atom_numbers = self.candidates(points, self.reach(radius))
+        distances = np.linalg.norm(self.coordinates[atom_numbers] - points[point_numbers], axis=1)
+        close = distances <= radius
+        return point_numbers[close], atom_numbers[close], distances[close]
+
+    def within(self, points, radius):
+        """
+        :param points: one point [x, y, z] or numpy array (n_points, 3)
+        :param radius: distance in Angstrom
+        :return: sorted numpy array with atoms within radius of any of the points
+        """
+        return np.unique(self.near(points, radius)[1])
+
+    def nearest(self, points, k=1):
+        """
+        :param points: numpy array (n_points, 3)
+        :param k: number of atoms
+        :return: atom numbers and distances (n_points, k) of the k nearest atoms of every point, sorted by distance
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        k = min(k, len(self))
+        atom_numbers = np.zeros((len(points), k), dtype=np.int64)
+        distances = np.zeros((len(points), k))
+
+        # Points are done when the k nearest atoms are closer than the cells searched (no atoms outside can be closer):
+        remaining = np.arange(len(points))
+        reach = 1
+        while len(remaining) and k:
+            point_numbers, candidate_atoms = self.candidates(points[remaining], reach)
+            candidate_distances = np.linalg.norm(
+                self.coordinates[candidate_atoms] - points[remaining][point_numbers], axis=1
+            )
+
+            order = np.lexsort((candidate_distances, point_numbers))
+            point_numbers, candidate_atoms = point_numbers[order], candidate_atoms[order]
+            candidate_distances = candidate_distances[order]
+
+            first = np.searchsorted(point_numbers, np.arange(len(remaining)))
+            count = np.bincount(point_numbers, minlength=len(remaining))
+            enough = count >= k
+            kth = np.full(len(remaining), np.inf)
+            kth[enough] = candidate_distances[first[enough] + k - 1]
+
+            # All cells searched (all atoms are candidates):
+            point_cells = self.cells(points[remaining])
+            searched_all = np.all((point_cells - reach <= 0) & (point_cells + reach >= self._shape - 1), axis=1)
+            done = enough & ((kth <= reach * self.cell_size) | searched_all)
+            for i in np.flatnonzero(done):
+                atom_numbers[remaining[i]] = candidate_atoms[first[i]:first[i] + k]
+                distances[remaining[i]] = candidate_distances[first[i]:first[i] + k]
+
+            remaining = remaining[~done]
+            reach += 1
+
+        return atom_numbers, distances
+
+    def pairs(self, cutoff):
+        """
+        Atom pairs from pairs of cells with atoms: every cell with itself and with half of the cells around it (the
+        other half has the cell as neighbour), so that every atom pair is only found once.
+        :param cutoff: distance in Angstrom
+        :return: atom numbers i, j (i < j) and distances of all atom pairs within cutoff
+        """
+        reach = self.reach(cutoff)
+        steps = range(-reach, reach + 1)
+        offsets = [(i, j, k) for i in steps for j in steps for k in steps if (i, j, k) >= (0, 0, 0)]
+
+        first_atoms, second_atoms = list(), list()
+        for offset in np.array(offsets):
+            keys = self.cell_keys(self._key_cells + offset)
+            cell = np.searchsorted(self._keys, keys)
+            cell[cell == len(self._keys)] = 0
+            found = np.flatnonzero((keys >= 0) & (self._keys[cell] == keys))
+            if not len(found):
+                continue
+
+            # Every atom of the first cell with every atom of the second cell:
+            first_owner, first = expand_ranges(self._starts[found], self._counts[found])
+            second_cell = cell[found][first_owner]
+            second_owner, second = expand_ranges(self._starts[second_cell], self._counts[second_cell])
+            first = first[second_owner]
+
+            if not offset.any():
+                # Same cell, every pair once:
+                first, second = first[first < second], second[first < second]
+
+            first_atoms.append(self._order[first])
+            second_atoms.append(self._order[second])
+
+        if not first_atoms:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        i, j = np.concatenate(first_atoms), np.concatenate(second_atoms)
+        distances = np.linalg.norm(self.coordinates[j] - self.coordinates[i], axis=1)
+        close = distances <= cutoff
+        i, j = np.minimum(i[close], j[close]), np.maximum(i[close], j[close])
+        return i, j, distances[close]
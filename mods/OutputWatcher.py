@@ -0,0 +1,109 @@
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+import os
+
+# How often (ms) the size and mtime of all watched files are checked:
+POLL_INTERVAL = 5000
+
+# Changes within this time (ms) are collected and emitted together:
+DEBOUNCE_INTERVAL = 1000
+
+
+class OutputWatcher(QObject):
+    """
+    Watches output files of running jobs and emits files_changed with the paths that have been written to, so that
+    only the appended lines are read (State.update_fileobject).
+    Changes are picked up by QFileSystemWatcher (inotify on Linux) and by polling size and mtime, since file system
+    events are not seen for files written from other hosts on a shared disk. All changes within DEBOUNCE_INTERVAL are
+    emitted as one list, so that a job writing continuously does not trigger a read for every write.
+    """
+
+    files_changed = pyqtSignal(list)
+
+    def __init__(self, parent=None, poll_interval=POLL_INTERVAL, debounce_interval=DEBOUNCE_INTERVAL):
+        super().__init__(parent)
+
+        # filepath : (size, mtime) when last emitted
+        self._stats = dict()
+        # filepaths changed since last emit
+        self._changed = set()
+
+        self._fs_watcher = QFileSystemWatcher(self)
+        self._fs_watcher.fileChanged.connect(self.file_changed)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_interval)
+        self._debounce_timer.timeout.connect(self.emit_changed)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval)
+        self._poll_timer.timeout.connect(self.poll)
+
+    @property
+    def watched_files(self):
+        return list(self._stats.keys())
+
+    @staticmethod
+    def stat(filepath):
+        """
+        :return: (size, mtime) of filepath, or None if the file does not exist
+        """
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def watch(self, filepath):
+        if filepath in self._stats:
+            return
+
+        self._stats[filepath] = self.stat(filepath)
+        self._fs_watcher.addPath(filepath)
+
+        if not self._poll_timer.isActive():
+            self._poll_timer.start()
+
+    def unwatch(self, filepath):
+        if filepath not in self._stats:
+            return
+
+        del self._stats[filepath]
+        self._changed.discard(filepath)
+        self._fs_watcher.removePath(filepath)
+
+        if not self._stats:
+            self._poll_timer.stop()
+
+    def file_changed(self, filepath):
+        # A file replaced by a new file is no longer watched by QFileSystemWatcher:
+        if filepath in self._stats and filepath not in self._fs_watcher.files() and os.path.exists(filepath):
+            self._fs_watcher.addPath(filepath)
+
+        self.mark_changed(filepath)
+
+    def poll(self):
+        for filepath, stat in self._stats.items():
+            if self.stat(filepath) != stat:
+                self.mark_changed(filepath)
+
+    def mark_changed(self, filepath):
+        """
+        Collect filepath to be emitted with the next files_changed
+        """
+        if filepath not in self._stats:
+            return
+
+        self._changed.add(filepath)
+        if not self._debounce_timer.isActive():
+            self._debounce_timer.start()
+
+    def emit_changed(self):
+        changed = list(self._changed)
+        self._changed = set()
+
+        for filepath in changed:
+            self._stats[filepath] = self.stat(filepath)
+
+        if changed:
+            self.files_changed.emit(changed)
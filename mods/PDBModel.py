@@ -3,6 +3,7 @@ from PyQt5.QtCore import pyqtSlot, QTimer
 from UIs.PDB_clusterWindow import Ui_ClusterPDB
 from mods.DialogsAndExceptions import DialogMessage
 from mods.common_functions import find_ligands_pdbfile
+from mods.MoleculeFile import PDBFile
 import os
 
 
@@ -41,6 +42,8 @@ class ModelPDB(QtWidgets.QMainWindow):
         self.model_final = False
         self.auto_added = False
         self.atom_count = dict()
+        # PDBFile of source pdb (residue index is made once per file):
+        self.pdb_file = None
 
         # Connect signals from pymol:
         self.pymol.atomsSelectedSignal.connect(self.update_selected_atoms)
@@ -112,8 +115,8 @@ class ModelPDB(QtWidgets.QMainWindow):
             pdb_source=file_.split("/")[-1].split(".")[0], pdb_target="source"
         )
         self.guess_highlight_ligand(pdb_file=file_, pymol_name="source")
-        self.pymol.pymol_cmd("count_atoms source")
-        self.pymol.pymol_cmd("count_atoms source and not sol.")
+        self.pymol.count_atoms("source")
+        self.pymol.count_atoms("source and not sol.")
 
         if self.ui.list_model_summary.count() > 0:
             self.ui.list_model_summary.takeItem(0)
@@ -125,8 +128,8 @@ class ModelPDB(QtWidgets.QMainWindow):
         :return:
         """
         if self.model_tmp:
-            self.pymol.pymol_cmd("count_atoms included")
-            self.pymol.pymol_cmd("count_atoms included and not sol.")
+            self.pymol.count_atoms("included")
+            self.pymol.count_atoms("included and not sol.")
         tab_index = self.ui.tabWidget.currentIndex()
         if tab_index == 0:
             if self.model_tmp:
@@ -152,8 +155,8 @@ class ModelPDB(QtWidgets.QMainWindow):
                 print("Please create a model first...")
                 self.ui.tabWidget.setCurrentIndex(0)
                 return
-            self.pymol.pymol_cmd("count_atoms model_tmp")
-            self.pymol.pymol_cmd("count_atoms model_tmp and not sol.")
+            self.pymol.count_atoms("model_tmp")
+            self.pymol.count_atoms("model_tmp and not sol.")
             self.copy_model()
             self.pymol.pymol_cmd("config_mouse three_button_editing")
 
@@ -171,12 +174,29 @@ class ModelPDB(QtWidgets.QMainWindow):
         :param pdb_file: path to pdb file
         :return:
         """
-        residues = find_ligands_pdbfile(pdb_file)
+        residues = find_ligands_pdbfile(self.get_pdb_file(pdb_file))
 
         self.pymol.set_protein_ligand_rep(
             residues, pymol_name=pymol_name, group="pdb_model"
         )
 
+    def get_pdb_file(self, pdb_file):
+        """
+        :param pdb_file: path to pdb file
+        :return: PDBFile from project if loaded there, else read from pdb_file (only once)
+        """
+        if self.pdb_file and self.pdb_file.filepath == pdb_file:
+            return self.pdb_file
+
+        for state in self.react.states:
+            mol_obj = state.get_molecule_object(pdb_file)
+            if isinstance(mol_obj, PDBFile):
+                self.pdb_file = mol_obj
+                return self.pdb_file
+
+        self.pdb_file = PDBFile(filepath=pdb_file)
+        return self.pdb_file
+
     def group_pdb_pymol(self, pdb_source, pdb_target):
         """
         Make a group in pymol for setting up PDB model / cluster
@@ -236,8 +256,8 @@ class ModelPDB(QtWidgets.QMainWindow):
                 object_name="source",
                 group="pdb_model",
             )
-        self.pymol.pymol_cmd("count_atoms included")
-        self.pymol.pymol_cmd("count_atoms included not sol.")
+        self.pymol.count_atoms("included")
+        self.pymol.count_atoms("included not sol.")
 
     @pyqtSlot(list)
     def update_nterm(self, resi):
@@ -334,6 +354,21 @@ class ModelPDB(QtWidgets.QMainWindow):
 
         if self.selected_atoms["central"]:
             self.selected_atoms["included"].clear()
+
+            included = self.included_atoms(expand_radius)
+            if included is not None:
+                self.selected_atoms["included"] = included
+                self.pymol.set_selection(
+                    atoms=included,
+                    sele_name="included",
+                    object_name="source",
+                    group="pdb_model",
+                )
+                self.pymol.count_atoms("included")
+                self.pymol.count_atoms("included not sol.")
+                return
+
+            # Atoms not found in pdb file, let pymol find them:
             self.pymol.expand_sele(
                 selection="central",
                 sele_name="included",
@@ -348,6 +383,31 @@ class ModelPDB(QtWidgets.QMainWindow):
             # Timer in milliseconds:
             self.timer.start(500)
 
+    def included_atoms(self, radius):
+        """
+        Atoms around central atoms in source pdb file, found with the coordinates of the pdb file instead of asking
+        pymol (same selection as pymol.expand_sele)
+        :param radius: distance in Angstrom
+        :return: list of pdb atom numbers (as PyMOL ID), None if central atoms are not found in pdb file
+        """
+        pdb_path = self.ui.lineEdit_pdb_file.text()
+        try:
+            pdb_file = self.get_pdb_file(pdb_path)
+        except OSError:
+            return None
+
+        central = pdb_file.atom_positions([int(x) for x in self.selected_atoms["central"]])
+        if central is None or len(central) != len(self.selected_atoms["central"]):
+            return None
+
+        included = pdb_file.atoms_around(
+            central,
+            radius,
+            whole_residues=self.ui.select_byres.isChecked(),
+            include_solvent=self.ui.include_solvent.isChecked(),
+        )
+        return [str(x) for x in pdb_file.pdb_atoms["serial"][included].tolist()]
+
     def delayed_get_atoms(self):
         self.timer.stop()
         self.pymol.get_selected_atoms(sele="included")
@@ -370,16 +430,16 @@ class ModelPDB(QtWidgets.QMainWindow):
 
         # Update included selection to now refer to model_tmp instead of source:
         self.pymol.pymol_cmd("select included, model_tmp")
-        self.pymol.pymol_cmd("count_atoms model_tmp")
-        self.pymol.pymol_cmd("count_atoms model_tmp and not sol.")
+        self.pymol.count_atoms("model_tmp")
+        self.pymol.count_atoms("model_tmp and not sol.")
 
         # Identify terminals that have been chopped
         [
             self.pymol.find_unbonded(pymol_name="model_tmp", type=x, group="pdb_model")
             for x in ["nterm", "cterm"]
         ]
-        self.pymol.pymol_cmd("count_atoms nterm")
-        self.pymol.pymol_cmd("count_atoms cterm")
+        self.pymol.count_atoms("nterm")
+        self.pymol.count_atoms("cterm")
 
         self.model_tmp = True
         self.ui.tabWidget.setCurrentIndex(1)
@@ -396,14 +456,14 @@ class ModelPDB(QtWidgets.QMainWindow):
 
     def delete_selected(self):
         self.pymol.pymol_cmd("remove sele and model_tmp")
-        self.pymol.pymol_cmd("count_atoms model_tmp")
-        self.pymol.pymol_cmd("count_atoms model_tmp and not sol.")
+        self.pymol.count_atoms("model_tmp")
+        self.pymol.count_atoms("model_tmp and not sol.")
 
     def build_fragment(self):
         fragment = self.ui.groups_to_add.currentText()
         self.pymol.add_fragment(attach_to="sele", fragment=fragment)
-        self.pymol.pymol_cmd("count_atoms model_tmp")
-        self.pymol.pymol_cmd("count_atoms model_tmp and not sol.")
+        self.pymol.count_atoms("model_tmp")
+        self.pymol.count_atoms("model_tmp and not sol.")
 
     def auto_add_terminals(self):
         """
@@ -432,7 +492,7 @@ class ModelPDB(QtWidgets.QMainWindow):
             lambda: self.pymol.pymol_cmd("color gray, auto_added and name C*"),
         )
         QtCore.QTimer.singleShot(
-            build_time + 75, lambda: self.pymol.pymol_cmd("count_atoms model_tmp")
+            build_time + 75, lambda: self.pymol.count_atoms("model_tmp")
         )
         self.auto_added = True
 
@@ -483,22 +543,10 @@ class ModelPDB(QtWidgets.QMainWindow):
 
     def _do_save_pdb(self, pdb_path):
         """Helper to execute the actual save command after delay"""
-        # Use cmd.save() with object selection - PyMOL will infer format from .pdb extension
-        self.pymol.pymol_cmd('cmd.save("%s", "model_final", 0)' % pdb_path)
+        # Use cmd.save() with object selection - PyMOL will infer format from .pdb extension. When PyMOL has written
+        # the file, it is copied to the project table if chosen (see REACT.pdb_from_pymol):
+        self.pymol.save(pdb_path, "model_final", 0)
         self.react.append_text(f"\n{pdb_path} written.")
-        
-        # Check if user wants to copy to project table
-        if self.ui.copy_to_project.isChecked():
-            # Add a small delay to ensure file is written before importing
-            QTimer.singleShot(300, lambda: self._import_to_project(pdb_path))
-    
-    def _import_to_project(self, pdb_path):
-        """Import the saved PDB file into the project table"""
-        try:
-            self.react.add_file(pdb_path)
-            self.react.append_text(f"Added {pdb_path.split('/')[-1]} to project table")
-        except Exception as e:
-            self.react.append_text(f"Error importing to project: {e}")
 
     def closeEvent(self, event):
         self.react.cluster_window = None
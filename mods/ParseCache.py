@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import zipfile
+import numpy as np
+from mods.GaussianFile import OutputReader
+
+# Bump when the arrays from OutputReader.get_arrays change, so that old entries are read again:
+CACHE_VERSION = 7
+
+# Default max size of cache directory in bytes (least recently used entries are deleted above this size):
+DEFAULT_MAX_SIZE = 2 * 1024**3
+
+
+def file_hash(filepath, chunk_size=4 * 1024**2):
+    """
+    :param filepath: path to file
+    :return: blake2b hex digest of file content
+    """
+    content_hash = hashlib.blake2b(digest_size=20)
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def entry_path(cache_dir, content_hash):
+    return os.path.join(cache_dir, "%s.npz" % content_hash)
+
+
+def cached_summary(cache_dir, filepath, content_hash=None):
+    """
+    Summary of output file (see OutputReader.read_summary) from its entry in cache_dir, else read from the file. Run
+    by worker processes (see State.add_files), the index is updated with the result by ParseCache.add_result.
+    :param content_hash: hash of the file from the index (see ParseCache.known_hash), None to hash the file here
+    :return: (stat of file before reading, content hash, arrays of OutputReader.get_arrays, True if found in cache)
+    """
+    stat = os.stat(filepath)
+    if content_hash is None:
+        content_hash = file_hash(filepath)
+
+    try:
+        with np.load(entry_path(cache_dir, content_hash)) as arrays:
+            output_reader = OutputReader.from_arrays(filepath, arrays, summary_only=True)
+        return stat, content_hash, output_reader.get_arrays(summary_only=True), True
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        pass
+
+    return stat, content_hash, OutputReader(filepath).read_summary().get_arrays(), False
+
+
+class ParseCache:
+    """
+    Persistent on-disk cache of read Gaussian output files (OutputReader), stored as compressed numpy archives.
+    Entries are content-addressed (named by the hash of the output file), and the index maps every filepath to size,
+    mtime and hash, so that unchanged files are recognised without reading them at all. The same content at a different
+    path (copied or moved project) is recognised by its hash.
+    An entry holds the whole file, or only its summary (see OutputReader.read_summary) until the whole file is read.
+    Least recently used entries are deleted when the total size of the cache exceeds max_size.
+    The index is changed in memory for every file, and written by self.flush (fex. when all files of an import are
+    read). Errors writing the cache are kept in self.errors for the REACT log.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.index_path = os.path.join(cache_dir, "index.json")
+
+        self.hits = 0
+        self.misses = 0
+        # Messages of errors since self.reset_stats:
+        self.errors = list()
+
+        # State.add_file is called from worker threads:
+        self._lock = threading.Lock()
+
+        # filepath : (stat, hash) of files not found by self.lookup
+        self._missed = dict()
+
+        # {"paths": {filepath: {"size": int, "mtime": int, "hash": str}},
+        #  "entries": {hash: {"bytes": int, "last_used": float}}}
+        self._index = self.load_index()
+        # Index changed since it was written, see self.flush:
+        self._dirty = False
+
+    def load_index(self):
+        """
+        :return: cache index, empty index if not existing or not compatible
+        """
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == CACHE_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+
+        return {"version": CACHE_VERSION, "paths": dict(), "entries": dict()}
+
+    def save_index(self):
+        """
+        Write index to a temporary file first, so that the index is never half-written.
+        """
+        tmp_path = "%s.%d.tmp" % (self.index_path, os.getpid())
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def entry_path(self, content_hash):
+        return entry_path(self.cache_dir, content_hash)
+
+    def get_output_reader(self, filepath, summary_only=False):
+        """
+        Get OutputReader for filepath from cache if the file is unchanged, else read file and refresh cache.
+        :param filepath: path to Gaussian output file
+        :param summary_only: OutputReader without geometries and normal modes (see OutputReader.read_summary)
+        :return: OutputReader
+        """
+        output_reader = self.lookup(filepath, summary_only)
+        if output_reader:
+            return output_reader
+
+        if summary_only:
+            output_reader = OutputReader(filepath).read_summary()
+        else:
+            output_reader = OutputReader(filepath).read()
+        self.add(filepath, output_reader)
+        return output_reader
+
+    def lookup(self, filepath, summary_only=False):
+        """
+        :param filepath: path to Gaussian output file
+        :param summary_only: OutputReader without geometries and normal modes (see OutputReader.read_summary)
+        :return: OutputReader from cache if the file is unchanged, else None (read the file and add it with self.add)
+        """
+        stat = os.stat(filepath)
+        content_hash = self.known_hash(filepath, stat) or file_hash(filepath)
+
+        output_reader = self.load(filepath, content_hash, summary_only)
+        if output_reader:
+            with self._lock:
+                self.hits += 1
+            self.update_index(filepath, stat, content_hash)
+            return output_reader
+
+        with self._lock:
+            self.misses += 1
+            # File stat and hash before the file is read, see self.add:
+            self._missed[filepath] = (stat, content_hash)
+
+        return None
+
+    def known_hash(self, filepath, stat=None):
+        """
+        :param stat: os.stat of filepath, if already made
+        :return: hash of filepath from the index if its size and mtime are unchanged, else None (not hashed here)
+        """
+        if stat is None:
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                return None
+
+        with self._lock:
+            path_entry = self._index["paths"].get(filepath)
+
+        if path_entry and path_entry["size"] == stat.st_size and path_entry["mtime"] == stat.st_mtime_ns:
+            return path_entry["hash"]
+        return None
+
+    def add_result(self, filepath, result):
+        """
+        Count hit or miss of cached_summary run by a worker, and store the summary if it was not in the cache
+        :param result: return value of cached_summary
+        :return: OutputReader
+        """
+        stat, content_hash, arrays, hit = result
+        output_reader = OutputReader.from_arrays(filepath, arrays)
+
+        if hit:
+            with self._lock:
+                self.hits += 1
+            self.update_index(filepath, stat, content_hash)
+            return output_reader
+
+        with self._lock:
+            self.misses += 1
+            self._missed[filepath] = (stat, content_hash)
+        self.add(filepath, output_reader)
+        return output_reader
+
+    def add(self, filepath, output_reader):
+        """
+        Store output_reader for filepath after a lookup that missed
+        :param filepath: path to Gaussian output file
+        :param output_reader: OutputReader read from filepath
+        """
+        with self._lock:
+            missed = self._missed.pop(filepath, None)
+        if not missed:
+            return
+        stat, content_hash = missed
+
+        # Do not store a file that changed while reading it (fex. a running job):
+        new_stat = os.stat(filepath)
+        if new_stat.st_size == stat.st_size and new_stat.st_mtime_ns == stat.st_mtime_ns:
+            self.store(content_hash, output_reader)
+            self.update_index(filepath, stat, content_hash)
+
+    def load(self, filepath, content_hash, summary_only=False):
+        """
+        :param summary_only: only arrays needed for OutputReader summary are read from the entry
+        :return: OutputReader from cache entry, or None if not in cache (or only the summary is, see OutputReader)
+        """
+        try:
+            with np.load(self.entry_path(content_hash)) as arrays:
+                output_reader = OutputReader.from_arrays(filepath, arrays, summary_only)
+                if output_reader.summary_only and not summary_only:
+                    return None
+                return output_reader
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def store(self, content_hash, output_reader):
+        """
+        Write cache entry for output_reader
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry_path = self.entry_path(content_hash)
+            # np.savez adds .npz to the filename if missing:
+            tmp_path = "%s.%d.tmp.npz" % (entry_path[:-4], os.getpid())
+            np.savez_compressed(tmp_path, **output_reader.get_arrays())
+            os.replace(tmp_path, entry_path)
+            entry_bytes = os.path.getsize(entry_path)
+        except OSError as e:
+            with self._lock:
+                self.errors.append("Parse cache: could not write cache entry: %s" % e)
+            return
+
+        with self._lock:
+            self._index["entries"][content_hash] = {"bytes": entry_bytes, "last_used": time.time()}
+            self._dirty = True
+
+    def update_index(self, filepath, stat, content_hash):
+        """
+        Update path and last used time for entry, the index is written by self.flush
+        """
+        with self._lock:
+            if content_hash not in self._index["entries"]:
+                try:
+                    entry_bytes = os.path.getsize(self.entry_path(content_hash))
+                except OSError:
+                    return
+                self._index["entries"][content_hash] = {"bytes": entry_bytes, "last_used": time.time()}
+            self._index["paths"][filepath] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": content_hash,
+            }
+            self._index["entries"][content_hash]["last_used"] = time.time()
+            self._dirty = True
+
+    def flush(self):
+        """
+        Evict old entries and write the index, if it has changed since last time
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self.evict()
+            try:
+                self.save_index()
+            except OSError as e:
+                self.errors.append("Parse cache: could not write cache index: %s" % e)
+                return
+            self._dirty = False
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache is smaller than self.max_size
+        """
+        entries = self._index["entries"]
+        total_bytes = sum(entry["bytes"] for entry in entries.values())
+
+        for content_hash in sorted(entries, key=lambda x: entries[x]["last_used"]):
+            if total_bytes <= self.max_size:
+                break
+            total_bytes -= entries.pop(content_hash)["bytes"]
+            try:
+                os.remove(self.entry_path(content_hash))
+            except OSError:
+                pass
+
+        self._index["paths"] = {
+            path: path_entry for path, path_entry in self._index["paths"].items() if path_entry["hash"] in entries
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.errors = list()
+
+    @property
+    def stats_text(self):
+        """
+        :return: str with hit/miss ratio of cache, for REACT log
+        """
+        total = self.hits + self.misses
+        if not total:
+            return "Parse cache: no output files read"
+        return "Parse cache: %d hits, %d misses (%.0f%% hit ratio)" % (self.hits, self.misses, 100 * self.hits / total)
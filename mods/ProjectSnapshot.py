@@ -0,0 +1,47 @@
+import json
+import numpy as np
+from mods.GaussianFile import OutputReader
+
+# File extension of project snapshots (.rxt projects only have the paths of the files):
+SNAPSHOT_EXTENSION = "rxs"
+
+
+def save_snapshot(path, project, output_readers):
+    """
+    Write project (as in .rxt) together with what has been read from its output files to one compressed numpy
+    archive, so that the project can be opened without the output files (fex. on a computer without the cluster
+    disks mounted). Only the summary of each output file is stored (see OutputReader.read_summary): energies,
+    thermal corrections, final geometry, frequencies and convergence series.
+    :param path: path to snapshot file
+    :param project: project dict, see REACT.save_project
+    :param output_readers: {filepath: OutputReader}
+    """
+    arrays = {"project": np.array(json.dumps(project))}
+    filepaths = list()
+    for i, (filepath, output_reader) in enumerate(output_readers.items()):
+        filepaths.append(filepath)
+        for name, array in output_reader.get_arrays(summary_only=True).items():
+            arrays["file%d_%s" % (i, name)] = array
+    arrays["filepaths"] = np.array(json.dumps(filepaths))
+
+    # np.savez adds .npz to the filename if missing, so the file is written to an open file object:
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+def load_snapshot(path, object_hook=None):
+    """
+    :param path: path to snapshot file written by save_snapshot
+    :param object_hook: object_hook for json.loads of project, as for .rxt projects
+    :return: project dict, {filepath: OutputReader} (summary only, see OutputReader.read_summary)
+    """
+    with np.load(path) as arrays:
+        project = json.loads(str(arrays["project"]), object_hook=object_hook)
+
+        output_readers = dict()
+        for i, filepath in enumerate(json.loads(str(arrays["filepaths"]))):
+            prefix = "file%d_" % i
+            file_arrays = {name[len(prefix):]: arrays[name] for name in arrays.files if name.startswith(prefix)}
+            output_readers[filepath] = OutputReader.from_arrays(filepath, file_arrays, summary_only=True)
+
+    return project, output_readers
@@ -1,5 +1,5 @@
-from mods.MoleculeFile import Geometries, Molecule
-import copy
+from mods.MoleculeFile import Geometries
+import numpy as np
 
 
 class Properties(Geometries):
@@ -8,14 +8,16 @@ class Properties(Geometries):
     this class.
     """
 
-    def __init__(self, filetype=None, filepath=None, geometries=None):
+    def __init__(self, filetype=None, filepath=None, geometries=None, atom_names=None, atom_indices=None):
         self._filepath = filepath
         # This class should know what filetype it has... Gaussian, PDB, XYZ... and other future softwares like ADF..
         self._filetype = filetype
 
-        # Multiple geometries:
-        if geometries:
-            super().__init__(molecules=geometries, filepath=filepath)
+        # Multiple geometries, [[Atoms], ...] or numpy array with atom_names and atom_indices (see Geometries):
+        if geometries is not None:
+            super().__init__(
+                molecules=geometries, filepath=filepath, atom_names=atom_names, atom_indices=atom_indices
+            )
 
         self._filename = filepath.split("/")[-1]
         self._file_extension = self.filename.split(".")[-1]
@@ -263,34 +265,25 @@ class Properties(Geometries):
 
     def displacement_animation(self, freq, scale=1, steps=10):
         """
-        Creates a list of Molecule objects with coordinates corresponding to displacement caused by frequency.
+        Creates Geometries with coordinates corresponding to displacement caused by frequency, all made in one array
+        operation: coordinates + displacement * scale * t, with t from 0 to (steps - 1)/steps and back again.
         :param scale: scale displacment
-        :param steps: number of structures to create
-        :return: list of gaussian molecules, where the first is the original optimised molecules.
+        :param steps: number of structures to create (each direction)
+        :return: Geometries with 2 * steps + 1 geometries, where the first is the original optimised molecule. False if
+        no normal mode is found for freq.
         """
-        molecule = self.molecule
-        try:
-            displacement = self.get_displacement(freq).molecule
-        except AttributeError:
-            self.react.append_text("No molecule found...")
+        displacement = self.get_displacement(freq)
+        if displacement is None:
             return False
-        molecules = list()
-        molecules.append(Molecule(atoms=molecule))
-
-        # Forward direction (N steps)
-        for i in range(steps):
-            mol_disp = copy.deepcopy(molecule)
-            for atom in mol_disp.keys():
-                mol_disp[atom].x += float(displacement[atom].x) * scale * (i / steps)
-                mol_disp[atom].y += float(displacement[atom].y) * scale * (i / steps)
-                mol_disp[atom].z += float(displacement[atom].z) * scale * (i / steps)
-
-            molecules.append(Molecule(atoms=mol_disp))
-        # Reversed direction
-        for i in range(len(molecules) - 1, 0, -1):
-            molecules.append(molecules[i])
-
-        return molecules
+
+        # Forward direction (N steps) after the original molecule, and reversed direction:
+        t = np.arange(steps) / steps
+        t = np.concatenate(([0.0], t, t[::-1]))
+
+        # [geometry, atom, xyz]
+        geometries = self.coordinates + (displacement.coordinates * scale) * t[:, np.newaxis, np.newaxis]
+
+        return Geometries(molecules=geometries, atom_names=self.atom_names, atom_indices=self.atom_indices)
 
     def get_displacement(self, frequency):
         """
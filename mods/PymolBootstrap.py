@@ -0,0 +1,185 @@
+"""
+Run inside PyMOL by PymolSession (as a startup script of the PyMOL process): connects to the PymolChannel of REACT on
+localhost and runs its requests, one JSON object per line. Only the python standard library and pymol are used here.
+
+Requests: {"id": 1, "method": "count_atoms", "args": ["sele"], "kwargs": {}}, where method is one of
+Bootstrap.handlers or one of the functions of pymol.cmd in CMD_METHODS. Requests are run in the order they are received, and every request gets
+one reply:
+
+    {"type": "result", "id": 1, "result": 12}
+    {"type": "error", "id": 1, "error": "QueryError: Invalid selection name"}
+
+Events are sent without a request, fex. when a watched selection changes (see Bootstrap.watch_selection):
+
+    {"type": "event", "event": "selection", "name": "sele", "result": [4, 7]}
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Environment variables of the PyMOL process with port and token of the PymolChannel (see PymolChannel.environment):
+PORT_VARIABLE = "REACT_PYMOL_PORT"
+TOKEN_VARIABLE = "REACT_PYMOL_TOKEN"
+
+# Seconds between checks of watched selections, and longest wait for queued commands before a query:
+WATCH_INTERVAL = 0.2
+SYNC_TIMEOUT = 60.0
+
+# Functions of pymol.cmd that REACT requests (see PymolSession), other methods are refused:
+CMD_METHODS = ("count_atoms", "count_states", "get_dihedral", "load", "save")
+
+
+def iterate_values(selection, expression="ID"):
+    """
+    :param expression: atom property expression, fex. "ID" or "int(resi)"
+    :return: list with value of expression for every atom in selection
+    """
+    from pymol import cmd
+
+    values = list()
+    cmd.iterate(selection, f"values.append({expression})", space={"values": values})
+    return values
+
+
+def load_states(name, content, file_format="xyz"):
+    """
+    Create object name from content in memory, with one state for every model (fex. every frame of multi-frame xyz).
+    An object with the same name is replaced.
+    :param content: file content (str)
+    :return: number of states of the object
+    """
+    from pymol import cmd
+
+    cmd.delete(name)
+    cmd.load_raw(content, file_format, name)
+    return cmd.count_states(name)
+
+
+def jsonable(value):
+    """
+    Default of json.dumps for results of pymol.cmd that are not JSON types, fex. numpy arrays
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+class Bootstrap:
+    """
+    Connection to REACT, requests are read and run in a thread of PyMOL (the pymol.cmd API is locked by PyMOL).
+    """
+
+    def __init__(self, port, token):
+        self.socket = socket.create_connection(("127.0.0.1", port))
+        self.token = token
+        self._write_lock = threading.Lock()
+
+        # Commands of cmd.do are queued by PyMOL, they are run before the next request that is not "do":
+        self._queued_commands = False
+
+        # {selection name: last atom IDs} (see self.watch_selection):
+        self.watched = dict()
+        self.closed = False
+
+        self.handlers = {
+            "do": self.do,
+            "iterate": iterate_values,
+            "load_states": load_states,
+            "watch_selection": self.watch_selection,
+        }
+
+    def send(self, message):
+        line = json.dumps(message, default=jsonable) + "\n"
+        with self._write_lock:
+            self.socket.sendall(line.encode("utf8"))
+
+    def do(self, commands):
+        """
+        Run PyMOL commands, as if written in the PyMOL command line (one command per line)
+        """
+        from pymol import cmd
+
+        cmd.do(commands)
+        self._queued_commands = True
+
+    def watch_selection(self, name="sele", watch=True):
+        """
+        Send an event with the atom IDs of selection name when it changes (fex. when atoms are clicked)
+        """
+        if watch:
+            self.watched[name] = None
+        else:
+            self.watched.pop(name, None)
+
+    def handle(self, request):
+        """
+        :param request: dict with id, method, args and kwargs
+        :return: reply (dict)
+        """
+        from pymol import cmd
+
+        request_id = request.get("id")
+        method = request.get("method", "")
+
+        if method != "do" and self._queued_commands:
+            cmd.sync(SYNC_TIMEOUT)
+            self._queued_commands = False
+
+        function = self.handlers.get(method)
+        if function is None and method in CMD_METHODS:
+            function = getattr(cmd, method, None)
+        if not callable(function):
+            return {"type": "error", "id": request_id, "error": f"Unknown method: {method}"}
+
+        try:
+            result = function(*request.get("args", ()), **request.get("kwargs", {}))
+        except Exception as error:
+            return {"type": "error", "id": request_id, "error": f"{type(error).__name__}: {error}"}
+        return {"type": "result", "id": request_id, "result": result}
+
+    def serve(self):
+        """
+        Run requests until REACT closes the connection
+        """
+        self.send({"type": "hello", "token": self.token})
+        for line in self.socket.makefile("r", encoding="utf8"):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                self.send({"type": "error", "id": None, "error": f"Invalid request: {error}"})
+                continue
+            self.send(self.handle(request))
+        self.closed = True
+
+    def watch(self):
+        """
+        Check watched selections every WATCH_INTERVAL seconds, until the connection is closed
+        """
+        from pymol import cmd
+
+        while not self.closed:
+            time.sleep(WATCH_INTERVAL)
+            for name in list(self.watched.keys()):
+                ids = iterate_values(name, "ID") if name in cmd.get_names("selections") else list()
+                # No event for the selection when the watch starts (None):
+                previous = self.watched.get(name)
+                if previous is not None and ids != previous:
+                    self.send({"type": "event", "event": "selection", "name": name, "result": ids})
+                if name in self.watched:
+                    self.watched[name] = ids
+
+    def start(self):
+        threading.Thread(target=self.serve, daemon=True).start()
+        threading.Thread(target=self.watch, daemon=True).start()
+
+
+# Started when run by PyMOL for REACT:
+if os.environ.get(PORT_VARIABLE) and "pymol" in sys.modules:
+    Bootstrap(int(os.environ[PORT_VARIABLE]), os.environ.get(TOKEN_VARIABLE, "")).start()
@@ -0,0 +1,206 @@
+import json
+import secrets
+from PyQt5.QtCore import QObject, QProcessEnvironment, pyqtSignal
+from PyQt5.QtNetwork import QHostAddress, QTcpServer
+from mods.PymolBootstrap import PORT_VARIABLE, TOKEN_VARIABLE
+
+
+def batch_handlers(count, callback):
+    """
+    Reply handlers for a batch of requests (see PymolChannel.batch), replies are collected until the last one arrived
+    :param count: number of requests
+    :param callback: function called with a list of results, in the order of requests (None for errors)
+    :return: list of functions (ok, result), one for every request
+    """
+    results = [None] * count
+    waiting = set(range(count))
+
+    def make_handler(i):
+        def handler(ok, result):
+            results[i] = result if ok else None
+            waiting.discard(i)
+            if not waiting:
+                callback(results)
+        return handler
+
+    return [make_handler(i) for i in range(count)]
+
+
+class PymolChannel(QObject):
+    """
+    Requests to PyMOL and their replies as line delimited JSON over a localhost socket, see mods/PymolBootstrap.py
+    (run inside PyMOL, connects to this channel). Every request has an id and gets one typed reply (result or error),
+    so replies can not be mixed up when several requests are sent before the replies arrive (see self.batch).
+
+    Requests made before PyMOL has connected are kept, and sent when it connects (dropped when the channel is closed).
+    """
+
+    connected = pyqtSignal()
+    # Event from PyMOL: event, name (fex. "selection", "sele") and result (fex. atom IDs):
+    eventReceived = pyqtSignal(str, str, object)
+    # Error reply: request id, error message
+    errorReceived = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super(PymolChannel, self).__init__(parent)
+        self.token = secrets.token_hex(16)
+        self.socket = None
+        self.is_connected = False
+        self.is_closed = False
+
+        # Request id: function (ok, result) called with the reply:
+        self._next_id = 1
+        self._reply_handlers = dict()
+        # Requests (id, method, args, kwargs) made before PyMOL connected, and received bytes without end of line:
+        self._pending = list()
+        self._buffer = b""
+
+        self.server = QTcpServer(self)
+        self.server.newConnection.connect(self._on_new_connection)
+        self.server.listen(QHostAddress.LocalHost, 0)
+
+    def environment(self):
+        """
+        :return: QProcessEnvironment for the PyMOL process, with port and token of this channel
+        """
+        environment = QProcessEnvironment.systemEnvironment()
+        environment.insert(PORT_VARIABLE, str(self.server.serverPort()))
+        environment.insert(TOKEN_VARIABLE, self.token)
+        return environment
+
+    def request(self, method, args=(), kwargs=None, callback=None):
+        """
+        :param method: function of pymol.cmd (fex. "count_atoms") or of PymolBootstrap.Bootstrap.handlers
+        :param args: list of JSON types
+        :param callback: function called with the result, not called if the reply is an error (see errorReceived)
+        :return: request id
+        """
+        if not callback:
+            return self._send([(method, args, kwargs, None)])[0]
+
+        def handler(ok, result):
+            if ok:
+                callback(result)
+
+        return self._send([(method, args, kwargs, handler)])[0]
+
+    def batch(self, requests, callback=None):
+        """
+        Send several requests at once, replies are collected until the last one has arrived
+        :param requests: list of (method, args) or (method, args, kwargs)
+        :param callback: function called with a list of results, in the order of requests (None for errors)
+        :return: list of request ids
+        """
+        requests = [tuple(request) + (None,) * (3 - len(request)) for request in requests]
+        if not callback:
+            return self._send([request + (None,) for request in requests])
+
+        handlers = batch_handlers(len(requests), callback)
+        return self._send([request + (handler,) for request, handler in zip(requests, handlers)])
+
+    def take_pending(self):
+        """
+        Requests not sent (PyMOL has not connected) are dropped from the channel
+        :return: list of (method, args, kwargs, reply handler or None) of the dropped requests, in order (fex. to send
+        them to stdin of PyMOL instead, the reply handler is called with (ok, result))
+        """
+        pending = [
+            (method, args, kwargs, self._reply_handlers.pop(request_id, None))
+            for request_id, method, args, kwargs in self._pending
+        ]
+        self._pending = list()
+        return pending
+
+    def close(self):
+        self.is_closed = True
+        self._pending = list()
+        if self.socket:
+            self.socket.disconnectFromHost()
+        self.server.close()
+
+    def _send(self, requests):
+        """
+        :param requests: list of (method, args, kwargs, reply handler or None)
+        :return: list of request ids
+        """
+        request_ids = list()
+        lines = list()
+        for method, args, kwargs, handler in requests:
+            request_id = self._next_id
+            self._next_id += 1
+            request_ids.append(request_id)
+            if handler:
+                self._reply_handlers[request_id] = handler
+
+            if self.is_connected:
+                lines.append(self._request_line(request_id, method, args, kwargs))
+            elif not self.is_closed:
+                self._pending.append((request_id, method, list(args), kwargs))
+
+        if lines:
+            self.socket.write("".join(lines).encode("utf8"))
+        return request_ids
+
+    @staticmethod
+    def _request_line(request_id, method, args, kwargs):
+        return json.dumps({"id": request_id, "method": method, "args": list(args), "kwargs": kwargs or {}}) + "\n"
+
+    def _on_new_connection(self):
+        socket = self.server.nextPendingConnection()
+        if self.socket:
+            # Only one PyMOL per channel:
+            socket.abort()
+            return
+        self.socket = socket
+        self.socket.readyRead.connect(self._on_ready_read)
+        self.socket.disconnected.connect(self._on_disconnected)
+
+    def _on_disconnected(self):
+        self.is_connected = False
+        self._reply_handlers = dict()
+
+    def _on_ready_read(self):
+        self._buffer += bytes(self.socket.readAll())
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+
+            if not self.is_connected:
+                self._on_hello(message)
+                if not self.socket:
+                    return
+            elif message.get("type") == "event":
+                self.eventReceived.emit(message.get("event", ""), message.get("name", ""), message.get("result"))
+            else:
+                self._on_reply(message)
+
+    def _on_hello(self, message):
+        """
+        First message from PyMOL has to have the token of this channel
+        """
+        if message.get("type") != "hello" or message.get("token") != self.token:
+            self.socket.abort()
+            self.socket = None
+            return
+
+        self.is_connected = True
+        if self._pending:
+            lines = [self._request_line(*request) for request in self._pending]
+            self._pending = list()
+            self.socket.write("".join(lines).encode("utf8"))
+        self.connected.emit()
+
+    def _on_reply(self, message):
+        request_id = message.get("id")
+        ok = message.get("type") == "result"
+        if not ok:
+            self.errorReceived.emit(request_id or 0, str(message.get("error")))
+
+        handler = self._reply_handlers.pop(request_id, None)
+        if handler:
+            handler(ok, message.get("result"))
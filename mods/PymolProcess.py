@@ -1,5 +1,18 @@
-from PyQt5.QtCore import QProcess, Qt, pyqtSignal, pyqtSlot, QObject, QTimer
+from PyQt5.QtCore import QProcess, Qt, pyqtSignal, QObject, QTimer
+import ast
 import os
+import tempfile
+from mods.MoleculeFile import xyz_frames
+from mods.PymolChannel import PymolChannel, batch_handlers
+
+# Script run by pymol at start, connecting it to PymolSession.channel:
+BOOTSTRAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PymolBootstrap.py")
+
+# Milliseconds to wait for pymol to connect, before commands are written to stdin of pymol instead:
+CONNECT_TIMEOUT = 10000
+
+# Start of lines printed by pymol with the reply to a request from stdin (see PymolSession.stdin_request):
+STDIN_REPLY = "REACT_REPLY"
 
 
 class PymolSession(QObject):
@@ -37,99 +50,45 @@ class PymolSession(QObject):
         )
         self.session.stateChanged.connect(self._on_process_state_changed)
 
-        # Delete file of loaded molecule after loading it:
+        # Requests to pymol with typed replies (see mods/PymolChannel.py), pymol connects to it when started:
+        self.channel = PymolChannel(self)
+        self.channel.eventReceived.connect(self.handle_event)
+        self.channel.errorReceived.connect(self.handle_error)
+        # Commands are written to stdin of pymol if it does not connect to the channel (see self.check_channel):
+        self.channel_failed = False
+        # Request id : reply handler of requests written to stdin, and stdout not read yet (without end of line):
+        self._next_stdin_id = 1
+        self._stdin_handlers = dict()
+        self._stdout_buffer = b""
+
+        # Files of loaded molecules, deleted when loaded (or when pymol is closed):
         self.files_to_delete = list()
 
-        # Handling standard output:
-        self.atoms_selected = list()
+        # Replies from pymol:
         self.atom_count = dict()
-        self.unbonded = 0
-        self.neg_charge = None
-        self.pos_charge = None
-
-        self.stdout_handler = {
-            "iterate sele, ID": {
-                "collect": False,
-                "process": self.collect_iterate,
-                "return": "iterated",
-                "signal": self.return_sel_atomnr,
-            },
-            "iterate included, ID": {
-                "collect": False,
-                "process": self.collect_iterate,
-                "return": "iterated",
-                "signal": self.return_sel_atomnr,
-            },
-            "iterate nterm": {
-                "collect": False,
-                "process": self.collect_iterate,
-                "return": "iterated",
-                "signal": self.return_nterm,
-            },
-            "iterate cterm": {
-                "collect": False,
-                "process": self.collect_iterate,
-                "return": "iterated",
-                "signal": self.return_cterm,
-            },
-            "get_dihedral ": {
-                "collect": False,
-                "process": self.collect_dihedral,
-                "return": "cmd.get_dihedral:",
-                "signal": self.return_dihedral,
-            },
-            "count_atoms ": {
-                "collect": False,
-                "process": self.return_atom_count,
-                "return": "count_atoms:",
-                "signal": None,
-            },
-            "Save: wrote ": {
-                "collect": False,
-                "process": self.pdb_written,
-                "return": "Save: wrote",
-                "signal": None,
-            },
-            "Selector": {
-                "collect": False,
-                "process": self.print_selector,
-                "return": "Selector",
-                "signal": None,
-            },
-        }
 
         self.start_pymol()
         # Wait for PyMOL to be ready before sending commands
         QTimer.singleShot(1000, self.set_pymol_settings)
+        QTimer.singleShot(CONNECT_TIMEOUT, self.check_channel)
 
     def monitor_clicks(self):
-        self.stdout_handler["You clicked "] = {
-            "collect": False,
-            "process": self.iterate_sele,
-            "return": "You clicked ",
-            "signal": None,
-        }
-        print("Now monitoring all pymol atom clicks!")
-
-    def iterate_sele(self, stdout):
         """
-        Iterates over selected atoms and get ID
+        Atoms selected by clicks in pymol are sent with atomsSelectedSignal (see self.handle_event)
         """
-        self.pymol_cmd("iterate sele, ID")
+        self.channel.request("watch_selection", ["sele", True])
+        print("Now monitoring all pymol atom clicks!")
 
     def unmonitor_clicks(self):
-        del self.stdout_handler["You clicked "]
+        self.channel.request("watch_selection", ["sele", False])
 
-    def load_structure(self, file_=None, delete_after=False):
+    def load_structure(self, file_=None, delete_after=False, object_name=None):
         """
         Load file in pymol
         :param file_: path to file (xyz, pdb, mae)
+        :param object_name: name of object in pymol (default: filename without extension)
         """
         print("Loading structure", file_)
-        if delete_after:
-            # filename as displayed in pymol : filepath
-            self.files_to_delete.append(file_)
-
         if not file_:
             print("PymolProcess load_structure - No file given")
             return
@@ -137,34 +96,135 @@ class PymolSession(QObject):
         # Extract object name from filename (without extension)
         import os
 
-        object_name = os.path.basename(file_).rsplit(".", 1)[0]
+        if not object_name:
+            object_name = os.path.basename(file_).rsplit(".", 1)[0]
 
         # Verify file exists
         if not os.path.exists(file_):
             print(f"ERROR: File does not exist: {file_}")
             return
 
-        # Quote the file path and specify object name explicitly
-        self.pymol_cmd('load "%s", %s' % (file_, object_name))
+        self.load_files([file_], [object_name], delete_after)
         print(f'PyMOL command: load "{file_}", {object_name}')
 
+    def load_structures(self, files, delete_after=False):
+        """
+        Load several files in pymol with one write to pymol (fex. when importing many files)
+        :param files: list of paths to files (xyz, pdb, mae)
+        :return: list of object names in pymol
+        """
+        existing_files = list()
+        object_names = list()
+        for file_ in files:
+            if not os.path.exists(file_):
+                print(f"ERROR: File does not exist: {file_}")
+                continue
+            existing_files.append(file_)
+            object_names.append(os.path.basename(file_).rsplit(".", 1)[0])
+
+        self.load_files(existing_files, object_names, delete_after)
+        return object_names
+
+    def load_files(self, files, object_names, delete_after=False):
+        """
+        Load files in pymol with one write, and delete them when pymol has loaded them if delete_after
+        :param files: list of paths to files
+        :param object_names: name in pymol of every file
+        """
+        if not files:
+            return
+        if delete_after:
+            self.files_to_delete.extend(files)
+
+        if self.channel_failed:
+            for file_, name in zip(files, object_names):
+                # Deleted when pymol has loaded the file:
+                handler = (lambda ok, result, file_=file_: self.delete_files([file_])) if delete_after else None
+                self.stdin_request("load", [file_, name], handler=handler)
+            return
+
+        self.channel.batch(
+            [("load", [file_, name]) for file_, name in zip(files, object_names)],
+            callback=(lambda _: self.delete_files(files)) if delete_after else None,
+        )
+
+    def load_states(self, object_names, contents, file_formats="xyz", callback=None):
+        """
+        Create objects from file contents in memory, with one request and no files. Every model in a content is a
+        state of its object (fex. frames of a multi-frame xyz), and objects with the same names are replaced.
+        :param object_names: list of names in pymol
+        :param contents: list of file contents (str)
+        :param file_formats: format of all contents (fex. "xyz" or "pdb"), or list with the format of every content
+        :param callback: function called with list of the number of states of every object
+        """
+        if isinstance(file_formats, str):
+            file_formats = [file_formats] * len(contents)
+
+        if self.channel_failed:
+            handlers = batch_handlers(len(contents), callback) if callback else [None] * len(contents)
+            for object_name, content, file_format, handler in zip(object_names, contents, file_formats, handlers):
+                self.stdin_load_states(object_name, content, file_format, handler)
+            return
+
+        self.channel.batch(
+            [
+                ("load_states", [object_name, content, file_format])
+                for object_name, content, file_format in zip(object_names, contents, file_formats)
+            ],
+            callback=callback,
+        )
+
+    def load_trajectory(self, object_name, atom_names, trajectory, titles="", callback=None):
+        """
+        Create object with one state for every geometry, sent as one multi-frame xyz buffer (see self.load_states)
+        :param atom_names: atom names (list or array)
+        :param trajectory: numpy array (n_states, n_atoms, 3), fex. all geometries of an optimization or a scan
+        :param titles: comment line of every state, one str for all or a list with one str per state
+        """
+        content = "".join(xyz_frames(atom_names, trajectory, titles))
+        self.load_states([object_name], [content], "xyz", callback)
+
+    def stdin_load_states(self, object_name, content, file_format="xyz", handler=None):
+        """
+        Without self.channel, content is written to a temporary file, loaded by a request to stdin of pymol and deleted
+        when pymol has replied (see self.stdin_request)
+        :param handler: function (ok, result) called with the number of states of the object
+        """
+        fd, filepath = tempfile.mkstemp(suffix="." + file_format)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        # Deleted when pymol is closed, if pymol does not reply:
+        self.files_to_delete.append(filepath)
+
+        self.pymol_cmd("delete %s" % object_name)
+        self.stdin_request("load", [filepath, object_name], handler=lambda ok, result: self.delete_files([filepath]))
+        if handler:
+            self.stdin_request("count_states", [object_name], handler=handler)
+
     def start_pymol(self, external_gui=False):
         startup = ["-p"]
         if not external_gui:
             startup.append("-x")
+        # Connect pymol to self.channel:
+        startup.append(BOOTSTRAP_PATH)
+        self.session.setProcessEnvironment(self.channel.environment())
         self.session.start(self.pymol_path, startup)
         print(self.session.waitForStarted())
         self.session.isWindowType()
 
     def pymol_cmd(self, cmd=""):
         """
-        Write standard pymol commands to pymol
+        Send standard pymol commands to pymol, through self.channel (or stdin of pymol if it did not connect)
         :param cmd: pymol command
         :return:
         """
         if not self.session or self.session.state() != QProcess.Running:
             return
 
+        if not self.channel_failed:
+            self.channel.request("do", [cmd])
+            return
+
         cmd += "\n"
         try:
             self.session.write(cmd.encode())
@@ -175,6 +235,103 @@ class PymolSession(QObject):
             # If write fails, don't crash - just log it
             pass
 
+    def pymol_cmds(self, cmds):
+        """
+        Send several pymol commands to pymol at once
+        :param cmds: list of pymol commands
+        :return:
+        """
+        if cmds:
+            self.pymol_cmd("\n".join(cmds))
+
+    def request(self, method, args=(), callback=None):
+        """
+        Request with a reply from pymol, see PymolChannel.request (or self.stdin_request if pymol did not connect)
+        :param callback: function called with the result, not called if the reply is an error
+        """
+        if not self.channel_failed:
+            self.channel.request(method, args, callback=callback)
+            return
+
+        def handler(ok, result):
+            if ok and callback:
+                callback(result)
+
+        self.stdin_request(method, args, handler=handler)
+
+    def batch(self, requests, callback=None):
+        """
+        Several requests at once, see PymolChannel.batch (or self.stdin_request if pymol did not connect)
+        :param requests: list of (method, args) or (method, args, kwargs)
+        :param callback: function called with a list of results, in the order of requests (None for errors)
+        """
+        if not self.channel_failed:
+            self.channel.batch(requests, callback)
+            return
+
+        handlers = batch_handlers(len(requests), callback) if callback else [None] * len(requests)
+        for request, handler in zip(requests, handlers):
+            method, args, kwargs = tuple(request) + (None,) * (3 - len(request))
+            self.stdin_request(method, args, kwargs, handler)
+
+    def stdin_request(self, method, args=(), kwargs=None, handler=None):
+        """
+        Without self.channel, a request is run by pymol as python from stdin, and the result (or error) is printed
+        with STDIN_REPLY and the request id, read by self.handle_stdout. Selections are not watched (see
+        self.monitor_clicks).
+        :param method: function of pymol.cmd, or "iterate" (see PymolBootstrap.iterate_values)
+        :param handler: function (ok, result) called with the reply
+        """
+        if method == "watch_selection":
+            return
+
+        if method == "iterate":
+            selection, expression = (list(args) + ["ID"])[:2]
+            self.pymol_cmds(
+                [
+                    "stored.react_values = []",
+                    "iterate %s, stored.react_values.append(%s)" % (selection, expression),
+                ]
+            )
+            expression = "stored.react_values"
+        else:
+            expression = "cmd.%s(*%r, **%r)" % (method, list(args), kwargs or {})
+
+        request_id = self._next_stdin_id
+        self._next_stdin_id += 1
+        if handler:
+            self._stdin_handlers[request_id] = handler
+
+        # One line of python for pymol, printing the reply as: STDIN_REPLY request_id ok repr(result)
+        code = (
+            f"try:\n    _react_result = {expression}\n"
+            f"except Exception as error:\n    print({STDIN_REPLY!r}, {request_id}, False, repr(str(error)))\n"
+            f"else:\n    print({STDIN_REPLY!r}, {request_id}, True, repr(_react_result))\n"
+        )
+        self.pymol_cmd("exec(%r)" % code)
+
+    def check_channel(self):
+        """
+        If pymol has not connected to self.channel, commands and requests are written to stdin of pymol instead (see
+        self.stdin_request). Clicks in pymol are then not seen by REACT.
+        """
+        if self.channel.is_connected:
+            return
+
+        self.channel_failed = True
+        pending = self.channel.take_pending()
+        self.channel.close()
+
+        for method, args, kwargs, handler in pending:
+            if method == "do":
+                self.pymol_cmd(args[0])
+            elif method == "load_states":
+                self.stdin_load_states(*args, handler=handler)
+            else:
+                self.stdin_request(method, args, kwargs, handler)
+
+        self.textMessageSignal.emit("Pymol did not connect to REACT: atoms clicked in pymol are not available", False)
+
     def set_pymol_settings(self):
         """
         :return:
@@ -306,24 +463,46 @@ class PymolSession(QObject):
 
     def get_selected_atoms(self, sele="sele", type="ID"):
         """
-        Get PDB atom numbers/residue numbers of selection
-        :return:
+        Get PDB atom numbers/residue numbers of selection, sent with ntermResidues or ctermResidues for the nterm and
+        cterm selections, else with atomsSelectedSignal (as str)
+        """
+        signal = {"nterm": self.ntermResidues, "cterm": self.ctermResidues}.get(sele, self.atomsSelectedSignal)
+        self.request("iterate", [sele, type], callback=lambda values: signal.emit([str(value) for value in values]))
+
+    def count_atoms(self, selection):
+        """
+        Number of atoms in selection, sent with countAtomsSignal as self.atom_count {selection: count (str)}
         """
-        self.pymol_cmd("iterate %s, %s" % (sele, type))
+        self.request("count_atoms", [selection], callback=lambda count: self.return_atom_count(selection, count))
 
     def get_dihedral(self, a1, a2, a3, a4):
-        self.look_for_dihedral = True
-        self.pymol_cmd("get_dihedral %s, %s, %s, %s" % (a1, a2, a3, a4))
+        """
+        Dihedral of atoms, sent with dihedralSignal as [a1, a2, a3, a4, dihedral] (str)
+        """
+        atoms = [a1, a2, a3, a4]
+        self.request("get_dihedral", atoms, callback=lambda dihedral: self.dihedralSignal.emit(atoms + [str(dihedral)]))
 
     def set_dihedral(self, a1, a2, a3, a4, dihedral):
         self.pymol_cmd("set_dihedral %s, %s, %s, %s, %s" % (a1, a2, a3, a4, dihedral))
         self.pymol_cmd("unpick")
 
     def set_overall_charge(self):
-        self.pymol_cmd("select negative_charge, visible and formal_charge < 0")
-        QTimer.singleShot(500, lambda: None)
-        self.pymol_cmd("select positive_charge, visible and formal_charge > 0")
-        QTimer.singleShot(500, lambda: None)
+        """
+        Number of visible atoms with positive minus negative formal charge, sent with overallChargeSignal
+        """
+        self.batch(
+            [
+                ("count_atoms", ["visible and formal_charge < 0"]),
+                ("count_atoms", ["visible and formal_charge > 0"]),
+            ],
+            callback=self.return_overall_charge,
+        )
+
+    def save(self, filepath, selection="all", state=0):
+        """
+        Save selection to file (format from extension), importSavedPDB is sent with filepath when it is written
+        """
+        self.request("save", [filepath, selection, state], callback=lambda _: self.importSavedPDB.emit(filepath))
 
     def add_fragment(self, attach_to, fragment):
         """
@@ -394,107 +573,95 @@ class PymolSession(QObject):
         """Wrapper for QProcess.stateChanged signal"""
         self.handle_state(state)
 
+    def delete_files(self, files):
+        """
+        Remove files from disk (and from self.files_to_delete)
+        """
+        for filename in files:
+            if filename in self.files_to_delete:
+                self.files_to_delete.remove(filename)
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
+
     def delete_all_files(self):
         """
         Iterates through self.delete_file and removes from disk
         :return:
         """
-        for filename in self.files_to_delete:
-            os.remove(filename)
-        self.files_to_delete = list()
+        self.delete_files(list(self.files_to_delete))
 
     def handle_stdout(self):
         """
-        Reads output from Qprocess - this will be used to auto-decide handling REACT <--> Pymol
+        Reads output from Qprocess. Replies from pymol are read by self.channel, only replies to requests from stdin are
+        read here (see self.stdin_request)
         :return:
         """
-        data = self.session.readAllStandardOutput()
-        stdout = bytes(data).decode("utf8")
+        data = bytes(self.session.readAllStandardOutput())
 
-        # Only print for debugging errors, not all output (prevents repaint issues)
         # Uncomment next line for full PyMOL output debugging:
-        # print(stdout)
+        # print(data.decode("utf8"))
 
-        # Check for errors and print those
-        if "Error:" in stdout or "ExecutiveLoad-Error:" in stdout:
-            # Disable print to prevent recursive repaint on Linux
-            # print(f"PyMOL Error detected: {stdout}")
-            pass
+        if not self.channel_failed:
+            return
 
-        if "CmdLoad:" in stdout:
-            if len(self.files_to_delete) > 0:
-                try:
-                    os.remove(self.files_to_delete.pop(0))
-                except FileNotFoundError:
-                    pass
+        self._stdout_buffer += data
+        *lines, self._stdout_buffer = self._stdout_buffer.split(b"\n")
+        for line in lines:
+            line = line.decode(errors="replace").strip()
+            if line.startswith(STDIN_REPLY + " "):
+                self.handle_stdin_reply(line)
 
-        for k in self.stdout_handler.keys():
-            if k in stdout:
-                self.atoms_selected.clear()
-                self.stdout_handler[k]["collect"] = True
+    def handle_stdin_reply(self, line):
+        """
+        :param line: reply printed by pymol, STDIN_REPLY request_id ok repr(result) (see self.stdin_request)
+        """
+        try:
+            _, request_id, ok, result = line.split(None, 3)
+            request_id = int(request_id)
+        except ValueError:
+            return
+
+        try:
+            result = ast.literal_eval(result)
+        except (ValueError, SyntaxError):
+            pass
 
-        for k in self.stdout_handler.keys():
-            if self.stdout_handler[k]["collect"]:
-                self.stdout_handler[k]["process"](stdout)
+        ok = ok == "True"
+        if not ok:
+            self.handle_error(request_id, str(result))
 
-                if self.stdout_handler[k]["return"] in stdout:
-                    if self.stdout_handler[k]["signal"]:
-                        self.stdout_handler[k]["signal"]()
-                    self.stdout_handler[k]["collect"] = False
+        handler = self._stdin_handlers.pop(request_id, None)
+        if handler:
+            handler(ok, result)
 
-    def collect_iterate(self, stdout):
+    def handle_error(self, request_id, error):
         """
-        Read standard output from Qprocess pymol in the case of "iterate sele, rank" and collects atom numbers to
-        self.atoms_selected
-        :param stdout:
-        :return:
+        Error reply from pymol to a request (fex. an invalid selection)
+        """
+        self.textMessageSignal.emit(f"Pymol: {error}", False)
+
+    def handle_event(self, event, name, result):
+        """
+        Events from pymol (see mods/PymolBootstrap.py): atoms selected by clicks (see self.monitor_clicks)
         """
-        for junk in stdout.split():
-            for atomnr in junk.split("\n"):
-                if atomnr.isnumeric():
-                    self.atoms_selected.append(atomnr)
-                elif "atoms" in atomnr and len(self.atoms_selected) > 0:
-                    del self.atoms_selected[-1]
-
-    def collect_dihedral(self, stdout):
-        if "get_dihedral " in stdout:
-            self.atoms_selected.extend(stdout.replace(",", "").split()[1:5])
-        elif "cmd.get_dihedral:" in stdout:
-            self.atoms_selected.append(stdout.split()[1])
-
-    @pyqtSlot()
-    def return_sel_atomnr(self):
-        self.atomsSelectedSignal.emit(self.atoms_selected)
-
-    @pyqtSlot()
-    def return_dihedral(self):
-        self.dihedralSignal.emit(self.atoms_selected)
-
-    @pyqtSlot()
-    def return_nterm(self):
-        self.ntermResidues.emit(self.atoms_selected)
-
-    @pyqtSlot()
-    def return_cterm(self):
-        self.ctermResidues.emit(self.atoms_selected)
-
-    @pyqtSlot()
-    def return_atom_count(self, stdout):
-        if "count_atoms " in stdout:
-            self.atom_count[" ".join(stdout.split()[1:])] = None
-        elif "count_atoms:" in stdout:
-            for k in self.atom_count.keys():
-                if not self.atom_count[k]:
-                    self.atom_count[k] = stdout.split()[1]
-            self.countAtomsSignal.emit(self.atom_count)
-
-    @pyqtSlot()
-    def pdb_written(self, stdout):
-        pdb_path = ""
-        if "Save: wrote" in stdout:
-            pdb_path = stdout.split('"')[1]
-
-        self.importSavedPDB.emit(pdb_path)
+        if event == "selection" and name == "sele":
+            self.atomsSelectedSignal.emit([str(atom) for atom in result])
+
+    def return_atom_count(self, selection, count):
+        self.atom_count[selection] = str(count)
+        self.countAtomsSignal.emit(self.atom_count)
+
+    def return_overall_charge(self, counts):
+        negative, positive = counts
+        if negative is None or positive is None:
+            # Use signal instead of direct GUI call to avoid cross-thread issues
+            self.textMessageSignal.emit(
+                "Something went wrong while calculating charge of the system..", False
+            )
+            return
+        self.overallChargeSignal.emit(str(positive - negative))
 
     def handle_state(self, state):
         states = {
@@ -522,6 +689,7 @@ class PymolSession(QObject):
         """
         try:
             self.pymol_cmd("quit")
+            self.channel.close()
             self.session.kill()
             self.disconnect_pymol()
         except:
@@ -544,32 +712,3 @@ class PymolSession(QObject):
             self.react.connect_pymol_structures(connect=False)
         except:
             pass
-
-    @pyqtSlot()
-    def print_selector(self, stdout):
-        if "negative_charge" in stdout:
-            self.neg_charge = stdout.split()[5]
-            # Disable print to prevent recursive repaint on Linux
-            # print("got neg charge", self.neg_charge)
-        if "positive_charge" in stdout:
-            self.pos_charge = stdout.split()[5]
-            # Disable print to prevent recursive repaint on Linux
-            # print("got pos charge", self.pos_charge)
-        else:
-            return
-
-        try:
-            if self.neg_charge and self.pos_charge:
-                # Disable print to prevent recursive repaint on Linux
-                # print("got both charges")
-                overall_charge = int(self.pos_charge) - int(self.neg_charge)
-                # Disable print to prevent recursive repaint on Linux
-                # print("Overall charge:", overall_charge)
-                self.overallChargeSignal.emit(str(overall_charge))
-                self.pymol_cmd("delete %s" % "negative_charge")
-                self.pymol_cmd("delete %s" % "positive_charge")
-        except:
-            # Use signal instead of direct GUI call to avoid cross-thread issues
-            self.textMessageSignal.emit(
-                "Something went wrong while calculating charge of the system..", False
-            )
@@ -1,113 +1,96 @@
 #!/usr/bin/env python
-import sys
-import copy
 import numpy as np
+from mods.BondGraph import BondGraph
+from mods.InputTemplate import format_input_lines
+
+
+def parse_xyz_lines(xyz):
+    """
+    :param xyz: list of xyz lines (fex. mol_obj.formatted_xyz)
+    :return: list of elements, numpy array with coordinates (n_atoms, 3)
+    """
+    elements = list()
+    coordinates = np.zeros((len(xyz), 3))
+
+    for i, entry in enumerate(xyz):
+        temp = entry.split()
+        elements.append(temp[0])
+        coordinates[i] = [float(value) for value in temp[1:4]]
+
+    return elements, coordinates
 
 
 class AtomBond():
     """
     Class to represent the atom bond that is to be scanned.
     Atom1 will be kept frozen while scan (except if move both == True)
+
+    All geometries of the scan are made at once as a numpy array (n_geometries, n_atoms, 3) (see self.trajectory), and
+    are only formatted as text when written (see self.formatted_xyz, self.write_xyzfiles).
     """
 
-    def __init__(self, xyz, atom1_idx, atom2_idx, bond_dist, scan_dist, step_size, move_both, scan_mode):
+    def __init__(self, xyz, atom1_idx, atom2_idx, bond_dist, scan_dist, step_size, move_both, scan_mode,
+                 move_fragments=False):
+        """
+        :param xyz: list of xyz lines (fex. mol_obj.formatted_xyz)
+        :param atom1_idx: atom number (from 1)
+        :param atom2_idx: atom number (from 1)
+        :param move_fragments: move all atoms bonded to atom2 (and atom1 if move_both) with the atom, fex. a whole
+        substituent, instead of only the atom. Only the atoms are moved when the bond is in a ring.
+        """
         self._atom1_idx = atom1_idx
         self._atom2_idx = atom2_idx
-        self.xyz = self.convert_xyz(xyz)
+        self.elements, self.coordinates = self.convert_xyz(xyz)
         self._bond_dist = bond_dist
         self._scan_dist = scan_dist
         self._step_size = step_size
         self.num_atoms = len(xyz)
         self._move_both = move_both
         self._scan_mode = scan_mode
+        self.move_fragments = move_fragments
         self.steps = int(self.scan_dist/self.step_size)
 
+        self._bond_graph = None
 
     def invert_atoms(self):
         temp = self.atom1_idx
         self.atom1_idx = self.atom2_idx
         self.atom2_idx = temp
 
-    def get_dist(self, atomA, atomB):
-        vector = np.array([atomB['x']-atomA['x'], atomB['y']-atomA['y'], atomB['z']-atomA['z']])
-        return np.linalg.norm(vector)
-
     def convert_xyz(self, xyz):
         """
         Convert coordinates into the data format used within this class
+        :return: list of elements, numpy array with coordinates (n_atoms, 3)
         """
-        i = 0
-        atoms = {}
-
-        for entry in xyz:
-            temp = entry.split()
-            element = temp[0]
-            x = float(temp[1])
-            y = float(temp[2])
-            z = float(temp[3])
-
-            atoms[i] = {'element': element, 'x': x, 'y': y, 'z': z}
-            i += 1
-
-        return atoms
-
-    def convert_back(self, atoms):
-        """
-        Convert coordinates back into format of mol_obj.formatted_xyz
-        """
-        i = 0
-
-        all_atoms = []
-
-        for i in range(self.num_atoms):
-            all_atoms.append([atoms[i]['element'], format(atoms[i]['x'], ".8f"),
-                              format(atoms[i]['y'],".8f"), format(atoms[i]['z'], ".8f")])
-
-        return all_atoms
-
-    def move_atom(self, atom, vector, weight):
-        """
-        Given a vector, move atom along the vector, with magnitude = weight
-        """
-
-        x = atom['x']
-        y = atom['y']
-        z = atom['z']
-
-        return {'element': atom['element'],
-                'x': x + (vector['a'] * weight),
-                'y': y + (vector['b'] * weight),
-                'z': z + (vector['c'] * weight)}
-
-    def calc_abc_values(self, atom1, atom2, dist):
-        """
-        abc values are x,y,z values (respectively) to the vector going FROM
-        atom1 and TO atom2
-        """
-        a = ((atom2['x'] - atom1['x'])/dist)
-        b = ((atom2['y'] - atom1['y'])/dist)  
-        c = ((atom2['z'] - atom1['z'])/dist)
+        return parse_xyz_lines(xyz)
 
-        return {'a': a, 'b': b, 'c': c}
+    @property
+    def bond_graph(self):
+        if self._bond_graph is None:
+            self._bond_graph = BondGraph(self.elements, self.coordinates)
+        return self._bond_graph
 
-    def update_xyz(self, all_xyz, atom_idx, new_atom_xyz):
+    def moved_atoms(self, atom1_idx, atom2_idx):
         """
-        Update xyz of one atom.
+        :param atom1_idx: atom number (from 0), kept in place
+        :param atom2_idx: atom number (from 0), moved
+        :return: numpy array with atoms moved together with atom2 (see self.move_fragments)
         """
-        new_xyz = copy.deepcopy(all_xyz)
-        new_xyz[atom_idx] = new_atom_xyz
-
-        return new_xyz
+        if self.move_fragments:
+            side = self.bond_graph.side(atom1_idx, atom2_idx)
+            if side is not None:
+                return side
+        return np.array([atom2_idx])
 
     def scan_make_filenames(self, atom1_idx, atom2_idx, steps):
 
         dist = self.bond_dist
-        basisname = f"{self.xyz[atom1_idx]['element']}{self.xyz[atom2_idx]['element']}"
+        basisname = f"{self.elements[atom1_idx]}{self.elements[atom2_idx]}"
         dist_formatted = f"{dist:.2f}"
         dist_final = dist_formatted.replace(".", "_")
 
         filenames = [f"{basisname}_{dist_final}"]
-        
+
         if self.scan_mode == '+/-':
 
             extend = self._scan_make_filenames(dist, steps, self.step_size, '+', basisname)
@@ -144,154 +127,91 @@ class AtomBond():
             filenames.append(f"{basisname}_{dist_final}")
 
         return filenames
-    
 
-    def scan_bond(self, atom1_idx, atom2_idx, xyz):
+    @property
+    def scan_filenames(self):
         """
-        First, calcuate the vector moving from atom1 and to atom2.
-        Fetch the coordinates of atom1 and atom2 (atom*_forv, atom*_rev)
-        Some of these variables will be used in proceeding loop, where 
-        the coordiantes are updated(one step) for each loop.
-        In every loop, a new set of all coordinates are appended to a list.
-        In the end, this list is returned.
+        :return: list with filename (without extension) of every geometry in self.trajectory
         """
-        abc_vector = self.calc_abc_values(xyz[atom1_idx], xyz[atom2_idx], self.bond_dist)
-
-        atom1_forw = xyz[atom1_idx]
-        atom1_rev = xyz[atom1_idx]
-        atom2_forw = xyz[atom2_idx]
-        atom2_rev = xyz[atom2_idx]
-
-        xyz_extend_bond = [xyz]
-        xyz_decrease_bond = []
-
-        if self.move_both == True:
-            for i in range(self.steps):
-                if self._scan_mode == '-' or self.scan_mode == '+/-':
-                # negative direction
-                    atom1_forw = self.move_atom(atom1_forw, abc_vector, (self.step_size * 0.5))
-                    atom2_rev = self.move_atom(atom2_rev, abc_vector, (self.step_size * -0.5))
-                    
-                    temp = self.update_xyz(xyz, atom1_idx, atom1_forw)
-                    xyz_decrease_bond.append(self.update_xyz(temp, atom2_idx, atom2_rev))
-
-                if self._scan_mode == '+' or self.scan_mode == '+/-':
-                    #positive direction
-                    atom1_rev = self.move_atom(atom1_rev, abc_vector, (self.step_size * -0.5))
-                    atom2_forw = self.move_atom(atom2_forw, abc_vector, (self.step_size * 0.5))
-
-                    temp = self.update_xyz(xyz, atom1_idx, atom1_rev)
-                    xyz_extend_bond.append(self.update_xyz(temp, atom2_idx, atom2_forw))
-        else:
-            for i in range(self.steps):
+        return self.scan_make_filenames(self.atom1_idx-1, self.atom2_idx-1, self.steps)
 
-                if self._scan_mode == '-' or self.scan_mode == '+/-':
-                # negative direction
-                    atom2_rev = self.move_atom(atom2_rev, abc_vector, (self.step_size * -1))
-                    xyz_decrease_bond.append(self.update_xyz(xyz, atom2_idx, atom2_rev))
-
-                if self._scan_mode == '+' or self.scan_mode == '+/-':
-                    #positive direction
-                    atom2_forw = self.move_atom(atom2_forw, abc_vector, (self.step_size))
-                    xyz_extend_bond.append(self.update_xyz(xyz, atom2_idx, atom2_forw))
+    @property
+    def bond_changes(self):
+        """
+        Change of bond length of every geometry, in the same order as self.scan_filenames:
+        '+' [0, step, ..., steps*step], '-' [0, -step, ..., -steps*step] and
+        '+/-' [-steps*step, ..., 0, ..., steps*step]
+        :return: numpy array (n_geometries,)
+        """
+        changes = np.arange(1, self.steps + 1) * self.step_size
 
         if self._scan_mode == '+/-':
-            xyz_decrease_bond.reverse()
-            xyz_decrease_bond.extend(xyz_extend_bond)
-            return xyz_decrease_bond
-
+            return np.concatenate((-changes[::-1], [0.0], changes))
         if self._scan_mode == '-':
-            return xyz_decrease_bond
-        else:
-            return xyz_extend_bond
-
+            return np.concatenate(([0.0], -changes))
+        return np.concatenate(([0.0], changes))
 
-    def write_xyzfiles(self, path, filename_in=False):
+    def scan_bond(self, atom1_idx, atom2_idx):
         """
-        Write all xyz as .xyz files
+        All geometries at once: the vector from atom1 to atom2 (divided by bond distance) times the change of bond
+        length of every geometry (see self.bond_changes) is added to atom2, or half of it to atom2 and subtracted from
+        atom1 if move_both. Atoms are numbers from 0.
+        :return: numpy array (n_geometries, n_atoms, 3)
         """
+        vector = (self.coordinates[atom2_idx] - self.coordinates[atom1_idx]) / self.bond_dist
+        moves = self.bond_changes[:, np.newaxis] * vector
 
-        self.all_xyz = self.scan_bond(self.atom1_idx-1, self.atom2_idx-1, self.xyz)
-        filenames = self.scan_make_filenames(self.atom1_idx-1, self.atom2_idx-1, self.steps)
-
-        for i in range(len(self.all_xyz)):
-            xyz = self.convert_back(self.all_xyz[i])
-            filename =  filenames[i]
-
-            with open(path + filename + '.xyz', "w+") as f:
-                        
-                f.write(str(len(xyz))+'\n'+filename +'\n')
+        trajectory = np.repeat(self.coordinates[np.newaxis], len(moves), axis=0)
+        if self.move_both:
+            trajectory[:, self.moved_atoms(atom2_idx, atom1_idx)] -= 0.5 * moves[:, np.newaxis]
+            trajectory[:, self.moved_atoms(atom1_idx, atom2_idx)] += 0.5 * moves[:, np.newaxis]
+        else:
+            trajectory[:, self.moved_atoms(atom1_idx, atom2_idx)] += moves[:, np.newaxis]
 
-                for item in xyz:
+        return trajectory
 
-                    f.write(" ".join(item) + '\n')
+    @property
+    def trajectory(self):
+        """
+        :return: numpy array with all geometries of the scan (n_geometries, n_atoms, 3)
+        """
+        return self.scan_bond(self.atom1_idx-1, self.atom2_idx-1)
 
+    def formatted_xyz(self, geometry, trajectory=None):
+        """
+        :param geometry: number of geometry in the scan (fex. -1 for the last)
+        :param trajectory: self.trajectory, if already made
+        :return: list of xyz lines for input files (same format as self.scan_new_coordinates)
+        """
+        if trajectory is None:
+            trajectory = self.trajectory
+        return format_input_lines(self.elements, trajectory[geometry])
 
-                    # whitespaces = []
+    def write_xyzfiles(self, path, filename_in=False):
+        """
+        Write all xyz as .xyz files
+        """
+        trajectory = self.trajectory
+        filenames = self.scan_filenames
 
-                    # if item[1][0] == '-':
-                    #     whitespaces.append('     ')
-                    # else:
-                    #     whitespaces.append('      ')
-                    # if item[2][0] == '-':
-                    #     whitespaces.append('  ')
-                    # else:
-                    #     whitespaces.append('   ')
-                    # if item[3][0] == '-':
-                    #     whitespaces.append('  ')
-                    # else:
-                    #     whitespaces.append('   ')
+        # One format for every geometry:
+        elements = [element.replace("%", "%%") for element in self.elements]
+        geometry_format = "".join(f"{element} %.8f %.8f %.8f\n" for element in elements)
 
-                    #length of whitespace + xyz = 7
-                    #atom = [None]*(7)
-                    #atom[::2] = item
-                    #atom[1::2] = whitespaces
-                    
-                    #f.write("   ".join(atom) + "\n")
+        for filename, geometry in zip(filenames, trajectory):
+            with open(path + filename + '.xyz', "w+") as f:
+                f.write(str(self.num_atoms) + '\n' + filename + '\n')
+                f.write(geometry_format % tuple(geometry.ravel().tolist()))
 
     @property
     def scan_new_coordinates(self):
-
-        self.all_xyz = self.scan_bond(self.atom1_idx-1, self.atom2_idx-1, self.xyz)
-        filenames = self.scan_make_filenames(self.atom1_idx-1, self.atom2_idx-1, self.steps)
-
-        all_xyz = {}
-
-        for i in range(len(self.all_xyz)):
-            xyz = self.convert_back(self.all_xyz[i])
-            filename =  filenames[i]
-            lines_in_xyz = []
-
-            
-            for item in xyz:
-
-                whitespaces = []
-
-                if item[1][0] == '-':
-                    whitespaces.append('     ')
-                else:
-                    whitespaces.append('      ')
-                if item[2][0] == '-':
-                    whitespaces.append('  ')
-                else:
-                    whitespaces.append('   ')
-                if item[3][0] == '-':
-                    whitespaces.append('  ')
-                else:
-                    whitespaces.append('   ')
-
-                #length of whitespace + xyz = 7
-                atom = [None]*(7)
-                atom[::2] = item
-                atom[1::2] = whitespaces
-                
-                lines_in_xyz.append("   ".join(atom))
-            
-            all_xyz[filename] = lines_in_xyz
-
-        return all_xyz
-
-
+        """
+        :return: dict {filename: list of xyz lines} with all geometries of the scan
+        """
+        trajectory = self.trajectory
+        return {
+            filename: self.formatted_xyz(i, trajectory) for i, filename in enumerate(self.scan_filenames)
+        }
 
     @property
     def atom1_idx(self):
@@ -350,16 +270,3 @@ class AtomBond():
     @move_both.setter
     def move_both(self, value):
         self._move_both = value
-
-
-#if __name__ == '__main__':
-
-#    all_xyz = []
-
-#    with open(sys.argv[1], 'r') as f:
-#        for line in f:
-#            line = line.replace("\n", "")
-#            all_xyz.append(line)
-
-    #AtomBond(all_xyz, 10, 78, 0.5, 0.2, move_both=False)
-       
\ No newline at end of file
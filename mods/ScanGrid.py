@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+import itertools
+import os
+import numpy as np
+from mods.BondGraph import BondGraph
+from mods.GaussianFile import OutputReader
+from mods.InputTemplate import input_lines_format, format_input_lines
+from mods.ScanBond import parse_xyz_lines
+
+# ModRedundant coordinate type from number of atoms:
+COORDINATE_TYPES = {2: "B", 3: "A", 4: "D"}
+
+# Name of the manifest written with the input files of a grid scan (see GridScan.write_files):
+MANIFEST_FORMAT = "{name}_grid.txt"
+
+
+def measure(coordinates, atoms):
+    """
+    :param coordinates: numpy array (n_atoms, 3)
+    :param atoms: 2, 3 or 4 atom numbers (from 0)
+    :return: bond length (Angstrom), angle or dihedral (degrees, -180 to 180) of atoms
+    """
+    points = coordinates[list(atoms)]
+
+    if len(atoms) == 2:
+        return float(np.linalg.norm(points[1] - points[0]))
+
+    if len(atoms) == 3:
+        v1, v2 = points[0] - points[1], points[2] - points[1]
+        cos = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+        return float(np.degrees(np.arccos(np.clip(cos, -1.0, 1.0))))
+
+    b0, b1, b2 = points[0] - points[1], points[2] - points[1], points[3] - points[2]
+    b1 = b1 / np.linalg.norm(b1)
+    v = b0 - np.dot(b0, b1) * b1
+    w = b2 - np.dot(b2, b1) * b1
+    return float(np.degrees(np.arctan2(np.dot(np.cross(b1, v), w), np.dot(v, w))))
+
+
+def rotate(points, origin, axis, angle):
+    """
+    Rotate points around axis through origin (right-hand rule)
+    :param points: numpy array (n_points, 3)
+    :param angle: degrees
+    :return: numpy array (n_points, 3)
+    """
+    axis = axis / np.linalg.norm(axis)
+    angle = np.radians(angle)
+    vectors = points - origin
+    return (
+        origin
+        + vectors * np.cos(angle)
+        + np.cross(axis, vectors) * np.sin(angle)
+        + np.outer(vectors @ axis, axis) * (1 - np.cos(angle))
+    )
+
+
+class GridCoordinate:
+    """
+    One coordinate of a grid scan: a bond (2 atoms), angle (3 atoms) or dihedral (4 atoms), and the values it is scanned
+    over (Angstrom or degrees).
+    """
+
+    def __init__(self, atoms, values):
+        """
+        :param atoms: atom numbers (from 1, as in input files)
+        :param values: values of the coordinate in the grid
+        """
+        if len(atoms) not in COORDINATE_TYPES:
+            raise ValueError(f"A grid coordinate needs 2, 3 or 4 atoms, not {len(atoms)}")
+        self.atoms = [int(atom) for atom in atoms]
+        self.values = np.asarray(values, dtype=np.float64).ravel()
+
+    @classmethod
+    def from_steps(cls, atoms, start, step_size, steps):
+        """
+        :return: GridCoordinate with values start, start + step_size, ..., start + steps * step_size
+        """
+        return cls(atoms, start + np.arange(steps + 1) * step_size)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def coordinate_type(self):
+        return COORDINATE_TYPES[len(self.atoms)]
+
+    @property
+    def name(self):
+        """
+        :return: fex. "B1-2" or "D4-1-2-3"
+        """
+        return self.coordinate_type + "-".join(str(atom) for atom in self.atoms)
+
+    def restraint(self, value):
+        """
+        :return: ModRedundant line setting the coordinate to value and freezing it, fex. "B 1 2 1.500000 F"
+        """
+        return f"{self.coordinate_type} {' '.join(str(atom) for atom in self.atoms)} {value:.6f} F"
+
+
+class GridScan:
+    """
+    Relaxed scan over a grid of two or three coordinates (GridCoordinate): one constrained geometry for every
+    combination of their values. Geometries are made one at a time from the starting geometry (see self.geometry) and
+    written as input files one by one with a manifest of grid indices (see self.write_files), so memory does not grow
+    with the size of the grid. The energy surface is read back from the outputs with collect_grid_energies.
+
+    The atoms on the moving side of every coordinate (found with BondGraph) are moved together: atom2 of a bond with its
+    side of the bond, atom3 of an angle with its side of the atom2-atom3 bond and the atom3 side of the middle bond of
+    a dihedral. Only the last atom is moved when the bond is in a ring. Coordinates are set in order, so a coordinate
+    moving atoms of an earlier one can change its value - the restraints set the exact values in the optimization.
+    """
+
+    def __init__(self, xyz, coordinates, name="grid"):
+        """
+        :param xyz: list of xyz lines (fex. mol_obj.formatted_xyz)
+        :param coordinates: list of GridCoordinate
+        :param name: start of filenames (see self.filename)
+        """
+        self.elements, self.coordinates = parse_xyz_lines(xyz)
+        self.grid_coordinates = list(coordinates)
+        self.name = name
+
+        self._bond_graph = None
+        self._moved_atoms = dict()
+        self._geometry_format = input_lines_format(self.elements)
+
+    @property
+    def shape(self):
+        return tuple(len(coordinate) for coordinate in self.grid_coordinates)
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def points(self):
+        """
+        :return: generator, grid index (tuple) of every point, last coordinate changing fastest
+        """
+        return itertools.product(*(range(n) for n in self.shape))
+
+    def values(self, index):
+        """
+        :return: tuple with value of every coordinate at grid index
+        """
+        return tuple(float(coordinate.values[i]) for coordinate, i in zip(self.grid_coordinates, index))
+
+    @property
+    def bond_graph(self):
+        if self._bond_graph is None:
+            self._bond_graph = BondGraph(self.elements, self.coordinates)
+        return self._bond_graph
+
+    def moved_atoms(self, coordinate):
+        """
+        :param coordinate: GridCoordinate
+        :return: numpy array with atom numbers (from 0) moved when the coordinate is changed
+        """
+        atoms = tuple(coordinate.atoms)
+        if atoms not in self._moved_atoms:
+            # Bond whose atom2 side is moved (atom1-atom2 of a bond, atom2-atom3 of an angle or dihedral):
+            atom1, atom2 = (atoms[1] - 1, atoms[2] - 1) if len(atoms) > 2 else (atoms[0] - 1, atoms[1] - 1)
+            side = self.bond_graph.side(atom1, atom2)
+            self._moved_atoms[atoms] = np.array([atoms[-1] - 1]) if side is None else side
+        return self._moved_atoms[atoms]
+
+    def set_coordinate(self, coordinates, coordinate, value):
+        """
+        Move the atoms of coordinate (see self.moved_atoms) so that it has value
+        :param coordinates: numpy array (n_atoms, 3), changed in place
+        """
+        atoms = [atom - 1 for atom in coordinate.atoms]
+        moved = self.moved_atoms(coordinate)
+        change = value - measure(coordinates, atoms)
+
+        if len(atoms) == 2:
+            vector = coordinates[atoms[1]] - coordinates[atoms[0]]
+            coordinates[moved] += change * vector / np.linalg.norm(vector)
+            return
+
+        if len(atoms) == 3:
+            origin = coordinates[atoms[1]]
+            axis = np.cross(coordinates[atoms[0]] - origin, coordinates[atoms[2]] - origin)
+            if np.linalg.norm(axis) < 1e-8:
+                # Linear angle, any axis perpendicular to the bonds:
+                bond = coordinates[atoms[2]] - origin
+                axis = np.cross(bond, [1.0, 0.0, 0.0])
+                if np.linalg.norm(axis) < 1e-8:
+                    axis = np.cross(bond, [0.0, 1.0, 0.0])
+        else:
+            # Dihedrals are turned with the right-hand rule around atom2 --> atom3:
+            origin = coordinates[atoms[2]]
+            axis = origin - coordinates[atoms[1]]
+            change = (change + 180.0) % 360.0 - 180.0
+
+        coordinates[moved] = rotate(coordinates[moved], origin, axis, change)
+
+    def geometry(self, index):
+        """
+        :return: numpy array (n_atoms, 3) with the coordinates set to their values at grid index
+        """
+        coordinates = self.coordinates.copy()
+        for coordinate, value in zip(self.grid_coordinates, self.values(index)):
+            self.set_coordinate(coordinates, coordinate, value)
+        return coordinates
+
+    def formatted_xyz(self, index):
+        """
+        :return: list of xyz lines for input files at grid index (same format as AtomBond.formatted_xyz)
+        """
+        return format_input_lines(self.elements, self.geometry(index), self._geometry_format)
+
+    def restraints(self, index):
+        """
+        :return: list of ModRedundant lines freezing every coordinate at its value at grid index
+        """
+        return [coordinate.restraint(value) for coordinate, value in zip(self.grid_coordinates, self.values(index))]
+
+    def filename(self, index):
+        """
+        :return: filename (without extension) of grid index, fex. grid_03_12
+        """
+        digits = [len(str(n - 1)) for n in self.shape]
+        return self.name + "".join(f"_{i:0{width}d}" for i, width in zip(index, digits))
+
+    def write_files(self, directory, make_content, extension=".com"):
+        """
+        Write one input file for every grid point, and a manifest (see MANIFEST_FORMAT) with filename, grid index and
+        coordinate values of every file, as tab separated columns with names in the first line.
+        :param make_content: function (filename, xyz lines, restraint lines) --> file content (str)
+        :return: path of manifest
+        """
+        manifest_path = os.path.join(directory, MANIFEST_FORMAT.format(name=self.name))
+        header = ["filename"] + [f"i_{coordinate.name}" for coordinate in self.grid_coordinates]
+        header += [coordinate.name for coordinate in self.grid_coordinates]
+
+        with open(manifest_path, "w") as manifest:
+            manifest.write("\t".join(header) + "\n")
+
+            for index in self.points():
+                filename = self.filename(index)
+                content = make_content(filename, self.formatted_xyz(index), self.restraints(index))
+                with open(os.path.join(directory, filename + extension), "w") as f:
+                    f.write(content)
+
+                row = [filename] + [str(i) for i in index] + [f"{value:.6f}" for value in self.values(index)]
+                manifest.write("\t".join(row) + "\n")
+
+        return manifest_path
+
+
+def read_manifest(manifest_path):
+    """
+    :param manifest_path: manifest written by GridScan.write_files
+    :return: coordinate names, filenames, grid indices (n_files, n_coordinates), coordinate values (n_files,
+    n_coordinates)
+    """
+    with open(manifest_path) as f:
+        header = f.readline().rstrip("\n").split("\t")
+        rows = [line.rstrip("\n").split("\t") for line in f if line.strip()]
+
+    n_coordinates = (len(header) - 1) // 2
+    names = header[1 + n_coordinates:]
+    filenames = [row[0] for row in rows]
+    indices = np.array([row[1:1 + n_coordinates] for row in rows], dtype=np.int64).reshape(-1, n_coordinates)
+    values = np.array([row[1 + n_coordinates:] for row in rows], dtype=np.float64).reshape(-1, n_coordinates)
+    return names, filenames, indices, values
+
+
+def collect_grid_energies(manifest_path, extension=".out", read_output=None):
+    """
+    Final SCF Done energy of every finished grid point, as an array with the shape of the grid. Output files are found
+    next to the manifest, with the filename of the input file.
+    :param read_output: function reading the summary of an output file, filepath --> OutputReader (fex. from
+    ParseCache). Default: OutputReader.read_summary
+    :return: dict {coordinate name: numpy array with values}, numpy array with energies (Hartree, grid shape), NaN
+    where the output is missing or has no energy
+    """
+    names, filenames, indices, values = read_manifest(manifest_path)
+    directory = os.path.dirname(manifest_path)
+
+    shape = tuple(indices.max(axis=0) + 1) if len(indices) else (0,) * len(names)
+    axes = {name: np.full(n, np.nan) for name, n in zip(names, shape)}
+    for column, name in enumerate(names):
+        axes[name][indices[:, column]] = values[:, column]
+
+    energies = np.full(shape, np.nan)
+    for filename, index in zip(filenames, indices):
+        filepath = os.path.join(directory, filename + extension)
+        if not os.path.isfile(filepath):
+            continue
+        output_reader = read_output(filepath) if read_output else OutputReader(filepath).read_summary()
+        energy = output_reader.g_outdata.get("SCF Done")
+        if energy:
+            energies[tuple(index)] = energy
+
+    return axes, energies
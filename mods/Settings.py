@@ -20,6 +20,8 @@ class Settings:
         self._pymolpath = None
         self._pymol_at_launch = None
         self._UI_mode = None
+        self._import_workers = None
+        self._one_orientation = None
 
         # DFT settings
         self._functional = None
@@ -60,6 +62,14 @@ class Settings:
     def UI_mode(self):
         return self._UI_mode
 
+    @property
+    def import_workers(self):
+        return self._import_workers
+
+    @property
+    def one_orientation(self):
+        return self._one_orientation
+
     @property
     def basis(self):
         return self._basis
@@ -124,6 +134,14 @@ class Settings:
     def UI_mode(self, value):
         self._UI_mode = value
 
+    @import_workers.setter
+    def import_workers(self, value):
+        self._import_workers = value
+
+    @one_orientation.setter
+    def one_orientation(self, value):
+        self._one_orientation = value
+
     @functional.setter
     def functional(self, value):
         self._functional = value
@@ -225,6 +243,8 @@ class Settings:
         self.pymolpath = None
         self.pymol_at_launch = True
         self.UI_mode = True
+        # Number of processes reading files in parallel (None: number of CPUs)
+        self.import_workers = None
 
         # DFT settings
         self.functional = "B3LYP"
@@ -291,6 +311,10 @@ class Settings:
         ]:
             self._load_custom_settings(settings, key)
 
+        # Not in settings files from older versions of REACT:
+        self.import_workers = settings.pop("import_workers", None)
+        self.one_orientation = settings.pop("one_orientation", False)
+
     def _load_custom_settings(self, settings, key):
         try:
             item = settings.pop(key)
@@ -339,6 +363,8 @@ class Settings:
         settings["pymolpath"] = self.pymolpath
         settings["pymol_at_launch"] = self.pymol_at_launch
         settings["UI_mode"] = self.UI_mode
+        settings["import_workers"] = self.import_workers
+        settings["one_orientation"] = self.one_orientation
         settings["functional"] = self.functional
         settings["basis"] = self.basis
         settings["basis_diff"] = self.basis_diff
@@ -0,0 +1,127 @@
+import sys
+import time
+
+# Command line option of REACT.py printing the startup report:
+STARTUP_REPORT_OPTION = "--startup-report"
+
+
+class _TimedLoader:
+    """
+    Loader timing exec_module of the loader it wraps, everything else is passed on to that loader
+    """
+
+    def __init__(self, loader, report):
+        self._loader = loader
+        self._report = report
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # The module keeps its own loader:
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+
+        self._report.import_started(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._report.import_finished(module.__name__)
+
+
+class StartupReport:
+    """
+    Time of every module imported, and of the steps of starting REACT (see self.mark), printed like python -X importtime
+    but sorted by time and without running python with other options:
+
+        python REACT.py --startup-report
+
+    Modules are timed by wrapping the loaders found by the other finders of sys.meta_path, from self.start until
+    self.stop. Times are from self.start, so the start of the interpreter itself is not included.
+    """
+
+    def __init__(self):
+        self.start_time = None
+        self.marks = list()
+        # {module: [self time, cumulative time]} (seconds), and stack of modules being imported [name, start, children]:
+        self.imports = dict()
+        self._import_stack = list()
+
+    @classmethod
+    def from_argv(cls, argv):
+        """
+        :param argv: sys.argv, STARTUP_REPORT_OPTION is removed from it
+        :return: started StartupReport if argv has STARTUP_REPORT_OPTION, else None
+        """
+        if STARTUP_REPORT_OPTION not in argv:
+            return None
+        argv.remove(STARTUP_REPORT_OPTION)
+        report = cls()
+        report.start()
+        return report
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        sys.meta_path.insert(0, self)
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        """
+        Finder of sys.meta_path: spec of the next finder, with its loader timed
+        """
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def import_started(self, name):
+        self._import_stack.append([name, time.perf_counter(), 0.0])
+
+    def import_finished(self, name):
+        name, start, children = self._import_stack.pop()
+        cumulative = time.perf_counter() - start
+        self.imports[name] = [cumulative - children, cumulative]
+        if self._import_stack:
+            self._import_stack[-1][2] += cumulative
+
+    def mark(self, step):
+        """
+        :param step: name of step finished now, fex. "imports" or "main window"
+        """
+        self.marks.append((step, time.perf_counter() - self.start_time))
+
+    def report_lines(self, top=25):
+        """
+        :param top: number of modules, slowest cumulative import first
+        :return: list of lines (str)
+        """
+        lines = ["Startup (s from start of REACT.py):"]
+        lines += ["%8.3f  %s" % (seconds, step) for step, seconds in self.marks]
+
+        total = sum(self_time for self_time, _ in self.imports.values())
+        lines.append("")
+        lines.append(f"Imports: {len(self.imports)} modules, {total:.3f} s")
+        lines.append("%10s | %10s | %s" % ("self [us]", "cumulative", "imported package"))
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        for name, (self_time, cumulative) in slowest:
+            lines.append("%10d | %10d | %s" % (self_time * 1e6, cumulative * 1e6, name))
+        return lines
+
+    def print_report(self, top=25, file=None):
+        """
+        Stop timing imports and print the report (to stderr)
+        """
+        self.stop()
+        print("\n".join(self.report_lines(top)), file=file or sys.stderr)
@@ -1,5 +1,67 @@
-from mods.GaussianFile import OutputFile, InputFile, FrequenciesOut
+from mods.GaussianFile import OutputFile, InputFile, FrequenciesOut, OutputReader
+from mods.ParseCache import cached_summary
 from mods.MoleculeFile import PDBFile, XYZFile, Geometries
+from concurrent.futures.process import BrokenProcessPool
+import copy
+
+# File types --> sublass assignment
+# TODO we need (in time) a better way to figure out what filetype is loaded. "inp" fex could be other than gaussian
+FILE_TYPES = {"com": InputFile,
+              "inp": InputFile,
+              "out": OutputFile,
+              "pdb": PDBFile,
+              "xyz": XYZFile}
+
+# One frame of a multi-frame xyz file is stored in State.files as filepath#frame (see frame_key):
+FRAME_SEPARATOR = "#"
+
+
+def frame_key(filepath, frame):
+    """
+    :param frame: frame number from 0 (see XYZFile)
+    :return: key of one frame of xyz file in State.files, with the frame number from 1 (fex. conformers.xyz#1)
+    """
+    return "%s%s%d" % (filepath, FRAME_SEPARATOR, frame + 1)
+
+
+def split_frame(key):
+    """
+    :param key: key in State.files, a filepath or one frame of an xyz file (see frame_key)
+    :return: filepath, frame number from 0 (None if the key is the whole file)
+    """
+    filepath, separator, frame = key.rpartition(FRAME_SEPARATOR)
+    if separator and frame.isdigit() and FILE_TYPES.get(filepath.split(".")[-1]) is XYZFile:
+        return filepath, int(frame) - 1
+    return key, None
+
+
+def file_type(key):
+    """
+    :param key: key in State.files (see split_frame)
+    :return: class of file object, see FILE_TYPES
+    """
+    return FILE_TYPES[split_frame(key)[0].split(".")[-1]]
+
+
+def read_file(filepath, cache_dir=None, content_hash=None):
+    """
+    Read file in a worker process (see State.add_files). Output files are returned as the arrays of OutputReader (only
+    the summary, see State.add_file), which are much smaller to send back to the main process than the file object.
+    With a parse cache, output files are hashed and looked up in the cache here too (see ParseCache.cached_summary).
+    :param filepath: key in State.files (see split_frame)
+    :param cache_dir: directory of ParseCache, or None
+    :param content_hash: hash of output file known by the ParseCache index, None to hash the file
+    :return: dict {name: numpy array} for output files (tuple from cached_summary with cache_dir), else file object
+    """
+    if file_type(filepath) is OutputFile:
+        if cache_dir:
+            return cached_summary(cache_dir, filepath, content_hash)
+        return OutputReader(filepath).read_summary().get_arrays()
+
+    filepath, frame = split_frame(filepath)
+    if frame is not None:
+        return XYZFile(filepath=filepath, frame=frame)
+    return FILE_TYPES[filepath.split(".")[-1]](filepath=filepath)
 
 
 class State:
@@ -8,13 +70,7 @@ class State:
     """
     def __init__(self, parent):
         self.parent = parent
-        # File types --> sublass assignment
-        # TODO we need (in time) a better way to figure out what filetype is loaded. "inp" fex could be other than gaussian
-        self.file_types = {"com": InputFile,
-                           "inp": InputFile,
-                           "out": OutputFile,
-                           "pdb": PDBFile,
-                           "xyz": XYZFile}
+        self.file_types = FILE_TYPES
 
         # filepath (key) : File object (value)
         self.files = {}
@@ -22,20 +78,162 @@ class State:
     def add_file(self, filepath):
         """
         Creates GaussianFile instance for each uploaded file-path.
+        :param filepath: path to file, or one frame of a multi-frame xyz file (fex. one conformer of an ensemble) as
+        filepath#frame, then only this frame is read (see frame_key)
+        """
+        self.files[filepath] = self.make_file(filepath)
+        return None
+
+    def make_file(self, filepath):
+        """
+        :param filepath: key in self.files, see add_file
+        :return: file object for filepath
         """
         # Check file type for correct GaussianFile subclass assignment:
+        filepath, frame = split_frame(filepath)
         filename = filepath.split("/")[-1]
         filetype = filename.split(".")[-1]
 
-        self.files[filepath] = self.file_types[filetype](filepath=filepath)
+        # Only the summary of output files are read here (energy, convergence etc.), geometries and normal modes when
+        # first used (see OutputFile.load_output). Both are read from parse cache when unchanged since last time.
+        if self.file_types[filetype] is OutputFile:
+            output_reader = self.read_output(filepath, summary_only=True)
+            return self.make_output_file(filepath, output_reader)
+        elif frame is not None:
+            return XYZFile(filepath=filepath, frame=frame)
+        return self.file_types[filetype](filepath=filepath)
 
-        # Check if OutFile has frequencies, and make it a FrequenciesOut object instead:
-        if isinstance(self.files[filepath], OutputFile):
+    def add_files(self, filepaths, executor=None, cancel=None, output_readers=None, errors=None):
+        """
+        Creates file objects for all filepaths, read in parallel by executor (fex. ProcessPoolExecutor). Output files are
+        also hashed and looked up in the parse cache by executor. Files are added in the order of filepaths.
+        :param filepaths: list of filepaths
+        :param executor: concurrent.futures.Executor, None to read files one by one in this thread
+        :param cancel: threading.Event, no more files are added when set
+        :param output_readers: {filepath: OutputReader} already read (fex. from a project snapshot), not read again
+        :param errors: list, (filepath, exception) is appended for every file that could not be read. These files are
+        not added, and the next files are still added.
+        :return: generator, yields each filepath when it has been added
+        """
+        if output_readers is None:
+            output_readers = dict()
+        if errors is None:
+            errors = list()
 
-            if self.files[filepath].frequencies:
-                self.files[filepath] = FrequenciesOut(filepath)
+        # filepath : Future
+        futures = dict()
+        for filepath in filepaths if executor else ():
+            if cancel and cancel.is_set():
+                break
+            if filepath in output_readers:
+                continue
 
-        return None
+            # Only hashes already in the index, files are hashed by executor:
+            args = (filepath,)
+            if file_type(filepath) is OutputFile and self.parse_cache:
+                args = (filepath, self.parse_cache.cache_dir, self.parse_cache.known_hash(filepath))
+            try:
+                futures[filepath] = executor.submit(read_file, *args)
+            except (BrokenProcessPool, RuntimeError):
+                # Read the rest in this thread (see self.file_from_result)
+                break
+
+        try:
+            for filepath in filepaths:
+                if cancel and cancel.is_set():
+                    return
+
+                try:
+                    file_object = self.file_from_result(
+                        filepath, futures.get(filepath), output_readers.get(filepath)
+                    )
+                except Exception as error:
+                    errors.append((filepath, error))
+                    continue
+
+                # Cancelled while the file was read:
+                if cancel and cancel.is_set():
+                    return
+
+                self.files[filepath] = file_object
+                yield filepath
+        finally:
+            # Files not added when cancelled (or generator closed) are not read:
+            for future in futures.values():
+                future.cancel()
+
+    def file_from_result(self, filepath, future=None, output_reader=None):
+        """
+        File object from the result of read_file, or read in this thread without future (or if the process pool is
+        broken).
+        :param future: Future of read_file for filepath
+        :param output_reader: OutputReader already read for filepath
+        :return: file object
+        """
+        if output_reader is not None:
+            return self.make_output_file(filepath, output_reader)
+
+        try:
+            if future is None:
+                return self.make_file(filepath)
+            result = future.result()
+        except BrokenProcessPool:
+            return self.make_file(filepath)
+
+        if isinstance(result, tuple):
+            # Looked up in (or read for) the parse cache:
+            return self.make_output_file(filepath, self.parse_cache.add_result(filepath, result))
+        if isinstance(result, dict):
+            return self.make_output_file(filepath, OutputReader.from_arrays(filepath, result))
+        return result
+
+    def make_output_file(self, filepath, output_reader=None):
+        """
+        :param output_reader: OutputReader already read for filepath
+        :return: OutputFile, or FrequenciesOut if the output file has frequencies (without reading file again)
+        """
+        output_file = OutputFile(
+            filepath=filepath,
+            output_reader=output_reader,
+            one_orientation=self.one_orientation,
+            read_output=self.read_output,
+        )
+
+        if output_file.frequencies:
+            output_file = FrequenciesOut(
+                filepath,
+                output_reader=output_file.output_reader,
+                one_orientation=self.one_orientation,
+                read_output=self.read_output,
+            )
+
+        return output_file
+
+    def read_output(self, filepath, summary_only=False):
+        """
+        :param summary_only: OutputReader without geometries and normal modes (see OutputReader.read_summary)
+        :return: OutputReader for output file, from parse cache if available
+        """
+        if self.parse_cache:
+            return self.parse_cache.get_output_reader(filepath, summary_only)
+        if summary_only:
+            return OutputReader(filepath).read_summary()
+        return OutputReader(filepath).read()
+
+    @property
+    def parse_cache(self):
+        """
+        :return: ParseCache of REACT (None if not available)
+        """
+        return getattr(self.parent, "parse_cache", None)
+
+    @property
+    def one_orientation(self):
+        """
+        :return: True if output files keep geometries of one orientation only (setting "one_orientation", see
+        OutputReader.get_trajectory)
+        """
+        return bool(getattr(getattr(self.parent, "settings", None), "one_orientation", False))
 
     def del_files(self, files_to_del):
         """
@@ -85,9 +283,35 @@ class State:
 
     def update_fileobject(self, filepath):
         """
-        Updates a GaussianFile object in the event a file has been edited.        
+        Updates a file object in the event a file has been edited, or has grown (running job). Output files only read
+        the lines appended since last time.
+        :return: True if the file object has been updated
         """
-        self.files[filepath].update_fileobject()
+        file_object = self.updated_fileobject(filepath)
+        if file_object is None:
+            return False
+
+        self.files[filepath] = file_object
+        return True
+
+    def updated_fileobject(self, filepath):
+        """
+        New file object for a file that has been edited or has grown, without changing self.files (fex. in a worker
+        thread, the new file object is put in self.files by the GUI thread). Output files only read the lines appended
+        since last time.
+        :return: new file object, None if the file has not changed
+        """
+        file_object = self.files[filepath]
+
+        if not isinstance(file_object, OutputFile):
+            return self.make_file(filepath)
+
+        # The reader of file_object is still used until the new file object replaces it, a copy reads the new lines:
+        output_reader = copy.deepcopy(file_object.output_reader)
+        if not output_reader.update():
+            return None
+
+        return self.make_output_file(filepath, output_reader)
 
     def get_xyz_formatted(self, molecule):
         """
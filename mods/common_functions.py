@@ -1,7 +1,6 @@
-from PyQt5.QtWidgets import QColorDialog
 import random
-import numpy as np
 import json
+from mods.MoleculeFile import PDBFile
 
 unicode_symbols = {"delta": "\u03B4", "Delta": "\u0394"}
 
@@ -19,6 +18,9 @@ def select_color(parent=None, return_hex=True):
     :return_hex: Return hex color code
     :return: Hex Color Code (hex=True), else RGB tuple will be returned (r,g,b)
     """
+    # Qt only when used, so that this module can be imported without Qt (fex. by EnergyAnalysis):
+    from PyQt5.QtWidgets import QColorDialog
+
     color = QColorDialog.getColor(parent=parent)
     if return_hex:
         return color
@@ -122,38 +124,11 @@ def write_file(list_stuff, path):
 
 def find_ligands_pdbfile(pdbfile):
     """
-    Reads through a PDB file and identifies residue_names that har not amino acids or similar. Used for highlighting
-    ligands in pymol.
-    :param pdbfile: path to pdb file.
+    Identifies residue_names that har not amino acids or similar. Used for highlighting ligands in pymol.
+    :param pdbfile: path to pdb file, or PDBFile (residue index of PDBFile is used, file is not read again)
     :return: resnames (list of non-protein residue names)
     """
-    residues = list()
-
-    res_ignore = ["GLY", "HIS", "HID", "HIP", "HIE", "ALA", "VAL", "ILE", "CYS", "MET", "TYR", "ASP", "GLU", "ARG",
-                  "LYS", "PHE", "TRP", "ASN", "GLN", "SER", "AR+", "LY+", "GL-", "AS-", "PRO", "LEU", "THR"]
-    # N-terminals (Q-style)
-    res_ignore += ["N%s" % x for x in res_ignore]
-    # C-terminals (Q-style)
-    res_ignore += ["C%s" % x for x in res_ignore]
-    # ions etc.
-    res_ignore += ["CL-", "CLA", "HOH", "WAT", "Cl-", "SOD", "Na+", "NA+"]
-
-    with open(pdbfile, "r") as pdb:
-        for line in pdb:
-            if line.startswith("ATOM") or line.startswith("HETATM"):
-                res = line[17:21].strip()
-                if res not in res_ignore:
-                    if res not in residues:
-                        residues.append(res)
-
-    return residues
+    if not isinstance(pdbfile, PDBFile):
+        pdbfile = PDBFile(filepath=pdbfile)
 
-
-def atom_distance(a1, a2):
-    """
-    :param a1: [x,y,z]
-    :param a2: [x,y,z]
-    :return: radois (float)
-    """
-    return np.sqrt((float(a2[0]) - float(a1[0]))**2 + (float(a2[1]) - float(a1[1]))**2 + (float(a2[2]) -
-                                                                                          float(a1[2]))**2)
+    return pdbfile.residue_index.ligand_names